@@ -0,0 +1,42 @@
+"""Add generated weight_kg column to exercise_logs
+
+Revision ID: 5f28c0d6a913
+Revises: e3b7a41c9d20
+Create Date: 2026-10-19 13:21:47.905318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f28c0d6a913'
+down_revision: Union[str, None] = 'e3b7a41c9d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A stored generated column is computed for every existing row when it
+    # is added (rewriting each partition), so no separate backfill is needed
+    op.add_column('exercise_logs', sa.Column(
+        'weight_kg',
+        sa.Float(),
+        sa.Computed("CASE WHEN weight_unit = 'lbs' THEN weight / 2.20462 ELSE weight END", persisted=True),
+        nullable=True,
+    ))
+    op.create_index(
+        'ix_exercise_logs_user_exercise_weight_kg',
+        'exercise_logs',
+        ['user_id', 'exercise_id', 'weight_kg'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_exercise_logs_user_exercise_weight_kg', table_name='exercise_logs')
+    op.drop_column('exercise_logs', 'weight_kg')
@@ -0,0 +1,46 @@
+"""Add password_reset_tokens table keyed by token digest
+
+Revision ID: 9c1d4e7a2b6f
+Revises: b60e319b2c7a
+Create Date: 2026-10-19 10:40:12.381942
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1d4e7a2b6f'
+down_revision: Union[str, None] = 'b60e319b2c7a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('password_reset_tokens',
+    sa.Column('token_hash', sa.String(length=64), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('expires_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('token_hash')
+    )
+    op.create_index(op.f('ix_password_reset_tokens_user_id'), 'password_reset_tokens', ['user_id'], unique=False)
+    op.create_index(op.f('ix_password_reset_tokens_expires_at'), 'password_reset_tokens', ['expires_at'], unique=False)
+
+    # Raw tokens were stored in plain text on users; outstanding links are
+    # simply invalidated rather than migrated.
+    op.drop_column('users', 'reset_token_expires')
+    op.drop_column('users', 'reset_token')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('users', sa.Column('reset_token', sa.String(), nullable=True))
+    op.add_column('users', sa.Column('reset_token_expires', sa.TIMESTAMP(timezone=True), nullable=True))
+    op.drop_index(op.f('ix_password_reset_tokens_expires_at'), table_name='password_reset_tokens')
+    op.drop_index(op.f('ix_password_reset_tokens_user_id'), table_name='password_reset_tokens')
+    op.drop_table('password_reset_tokens')
@@ -0,0 +1,53 @@
+"""Add log summary columns to exercises
+
+Revision ID: a4d9e2f71b58
+Revises: 5f28c0d6a913
+Create Date: 2026-10-19 14:02:18.663190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d9e2f71b58'
+down_revision: Union[str, None] = '5f28c0d6a913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('exercises', sa.Column('log_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('exercises', sa.Column('last_logged_at', sa.DateTime(), nullable=True))
+    op.add_column('exercises', sa.Column('best_weight_kg', sa.Float(), nullable=True))
+    op.add_column('exercises', sa.Column('best_weight_date', sa.DateTime(), nullable=True))
+
+    # Backfill from the existing logs, in one pass per aggregate
+    op.execute("""
+        UPDATE exercises SET log_count = s.log_count, last_logged_at = s.last_logged_at
+        FROM (
+            SELECT exercise_id, user_id, count(*) AS log_count, max(date) AS last_logged_at
+            FROM exercise_logs GROUP BY exercise_id, user_id
+        ) AS s
+        WHERE s.exercise_id = exercises.id AND s.user_id = exercises.user_id
+    """)
+    op.execute("""
+        UPDATE exercises SET best_weight_kg = b.weight_kg, best_weight_date = b.date
+        FROM (
+            SELECT DISTINCT ON (exercise_id, user_id) exercise_id, user_id, weight_kg, date
+            FROM exercise_logs WHERE weight_kg IS NOT NULL
+            ORDER BY exercise_id, user_id, weight_kg DESC, date
+        ) AS b
+        WHERE b.exercise_id = exercises.id AND b.user_id = exercises.user_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('exercises', 'best_weight_date')
+    op.drop_column('exercises', 'best_weight_kg')
+    op.drop_column('exercises', 'last_logged_at')
+    op.drop_column('exercises', 'log_count')
@@ -0,0 +1,51 @@
+"""Add personal_records table
+
+Revision ID: c81f5a3e90d4
+Revises: a4d9e2f71b58
+Create Date: 2026-10-19 16:41:07.215384
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81f5a3e90d4'
+down_revision: Union[str, None] = 'a4d9e2f71b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'personal_records',
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('exercise_id', sa.UUID(), nullable=False),
+        sa.Column('rep_max', sa.Integer(), nullable=False),
+        sa.Column('weight_kg', sa.Float(), nullable=False),
+        sa.Column('achieved_at', sa.DateTime(), nullable=False),
+        sa.Column('log_id', sa.UUID(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['exercise_id'], ['exercises.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'exercise_id', 'rep_max'),
+    )
+
+    # Backfill the best log per rep max, ties going to the earliest
+    op.execute("""
+        INSERT INTO personal_records (user_id, exercise_id, rep_max, weight_kg, achieved_at, log_id)
+        SELECT DISTINCT ON (l.user_id, l.exercise_id, r.rep_max)
+            l.user_id, l.exercise_id, r.rep_max, l.weight_kg, l.date, l.id
+        FROM exercise_logs AS l
+        JOIN (VALUES (1), (5), (10)) AS r (rep_max) ON l.reps >= r.rep_max
+        WHERE l.weight_kg IS NOT NULL
+        ORDER BY l.user_id, l.exercise_id, r.rep_max, l.weight_kg DESC, l.date
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('personal_records')
@@ -0,0 +1,81 @@
+"""Partition exercise_logs by month of date
+
+Revision ID: e3b7a41c9d20
+Revises: 9c1d4e7a2b6f
+Create Date: 2026-10-19 12:05:31.482716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.partitions import ensure_partitions
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b7a41c9d20'
+down_revision: Union[str, None] = '9c1d4e7a2b6f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # An existing table cannot be converted in place: copy it into a new
+    # partitioned table with the same columns
+    op.execute("ALTER TABLE exercise_logs RENAME TO exercise_logs_unpartitioned")
+    op.execute(
+        "ALTER TABLE exercise_logs_unpartitioned "
+        "RENAME CONSTRAINT exercise_logs_pkey TO exercise_logs_unpartitioned_pkey"
+    )
+    op.execute("DROP INDEX IF EXISTS ix_exercise_logs_id")
+
+    # The partition key must be NOT NULL and part of the primary key
+    op.execute(
+        "UPDATE exercise_logs_unpartitioned SET date = COALESCE(created_at, now()) "
+        "WHERE date IS NULL"
+    )
+    op.execute(
+        "CREATE TABLE exercise_logs (LIKE exercise_logs_unpartitioned INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (date)"
+    )
+    op.alter_column('exercise_logs', 'date', existing_type=sa.DateTime(), nullable=False)
+    op.create_primary_key('exercise_logs_pkey', 'exercise_logs', ['id', 'date'])
+
+    # One partition per month from the oldest log through the coming months
+    bind = op.get_bind()
+    first = bind.scalar(sa.text("SELECT min(date) FROM exercise_logs_unpartitioned"))
+    ensure_partitions(bind, first=first.date() if first else None)
+
+    op.execute("INSERT INTO exercise_logs SELECT * FROM exercise_logs_unpartitioned")
+    op.drop_table('exercise_logs_unpartitioned')
+
+    op.create_foreign_key(
+        'exercise_logs_exercise_id_fkey', 'exercise_logs', 'exercises', ['exercise_id'], ['id']
+    )
+    op.create_foreign_key('exercise_logs_user_id_fkey', 'exercise_logs', 'users', ['user_id'], ['id'])
+    op.create_index(
+        'ix_exercise_logs_user_exercise_date',
+        'exercise_logs',
+        ['user_id', 'exercise_id', 'date'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Partitions detached for archiving are left alone
+    op.execute(
+        "CREATE TABLE exercise_logs_unpartitioned (LIKE exercise_logs INCLUDING DEFAULTS)"
+    )
+    op.execute("INSERT INTO exercise_logs_unpartitioned SELECT * FROM exercise_logs")
+    op.drop_table('exercise_logs')
+    op.execute("ALTER TABLE exercise_logs_unpartitioned RENAME TO exercise_logs")
+    op.alter_column('exercise_logs', 'date', existing_type=sa.DateTime(), nullable=True)
+    op.create_primary_key('exercise_logs_pkey', 'exercise_logs', ['id'])
+    op.create_foreign_key(
+        'exercise_logs_exercise_id_fkey', 'exercise_logs', 'exercises', ['exercise_id'], ['id']
+    )
+    op.create_foreign_key('exercise_logs_user_id_fkey', 'exercise_logs', 'users', ['user_id'], ['id'])
+    op.create_index(op.f('ix_exercise_logs_id'), 'exercise_logs', ['id'], unique=False)
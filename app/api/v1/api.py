@@ -1,4 +1,5 @@
 from fastapi import APIRouter
+from app.core.timing import TimedRoute
 from app.api.v1.endpoints import (
     users,
     auth,
@@ -8,7 +9,7 @@ from app.api.v1.endpoints import (
     progress
 )
 
-api_router = APIRouter()
+api_router = APIRouter(route_class=TimedRoute)
 
 # Include all endpoint routers
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -1,8 +1,5 @@
 # app/api/v1/endpoints/auth.py
 
-from datetime import datetime, timedelta, timezone
-import secrets
-
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -19,16 +16,24 @@ from app.core.security import (
     create_access_token,
     get_current_user,
 )
+from app.core.timing import TimedRoute
 from app.utils.email import send_password_reset_email
+from app.utils.password_reset import consume_reset_token, issue_reset_token
+from app.utils.rate_limiter import auth_rate_limiter, rate_limit
 from app.core.config import settings
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
+
+# Unauthenticated endpoints doing bcrypt work or sending email share a
+# strict per-client budget so they cannot be used to exhaust CPU.
+auth_rate_limit = Depends(rate_limit(limiter=auth_rate_limiter, scope="auth"))
 
 
 @router.post(
     "/register",
     response_model=UserResponse,
     status_code=status.HTTP_201_CREATED,
+    dependencies=[auth_rate_limit],
 )
 def register_new_user(
     user_in: UserCreate,
@@ -59,7 +64,7 @@ def register_new_user(
     return db_user
 
 
-@router.post("/login", response_model=Token)
+@router.post("/login", response_model=Token, dependencies=[auth_rate_limit])
 def login_for_access_token(
     db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
 ):
@@ -73,7 +78,7 @@ def login_for_access_token(
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token = create_access_token(subject=user.id)
+    access_token = create_access_token(subject=user.id, role=user.role.value)
     return {"access_token": access_token, "token_type": "bearer"}
 
 
@@ -88,6 +93,7 @@ def test_token(current_user: UserModel = Depends(get_current_user)):
 @router.post(
     "/forgot-password",
     status_code=status.HTTP_200_OK,
+    dependencies=[auth_rate_limit],
 )
 def forgot_password(
     request: PasswordReset,
@@ -103,10 +109,8 @@ def forgot_password(
             detail="User not found",
         )
 
-    # Generate token & expiry
-    token = secrets.token_urlsafe(32)
-    user.reset_token = token
-    user.reset_token_expires = datetime.now(timezone.utc) + timedelta(hours=1)
+    # Generate token; only its digest is persisted
+    token = issue_reset_token(db, user.id)
     db.commit()
 
     # Send email (await if your send function is async)
@@ -117,29 +121,23 @@ def forgot_password(
 @router.post(
     "/reset-password",
     status_code=status.HTTP_200_OK,
+    dependencies=[auth_rate_limit],
 )
 def reset_password(
     request: PasswordResetConfirm,
     db: Session = Depends(get_db),
 ):
-    result = db.execute(
-        select(UserModel).filter(UserModel.reset_token == request.token)
-    )
-    user = result.scalars().first()
-
-    if (
-        not user
-        or user.reset_token_expires is None
-        or user.reset_token_expires < datetime.now(timezone.utc)
-    ):
+    # Indexed lookup-and-consume: the token can only ever be used once
+    user_id = consume_reset_token(db, request.token)
+    user = db.get(UserModel, user_id) if user_id else None
+    if not user:
+        db.rollback()
         raise HTTPException(
             status.HTTP_400_BAD_REQUEST,
             detail="Invalid or expired token",
         )
 
     user.password = get_password_hash(request.new_password)
-    user.reset_token = None
-    user.reset_token_expires = None
     db.commit()
 
     return {"message": "Password has been reset successfully"}
@@ -1,84 +1,118 @@
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Response
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import status
 
-from app.db.session import get_db
-from app.models.exercise import Exercise as ExerciseModel
+from app.db.queries import EXERCISE_LOGS, OWNED_EXERCISE_ID, USER_LOGS_PAGE
+from app.db.session import get_async_db
 from app.models.exercise_log import ExerciseLog as ExerciseLogModel
 from app.models.user import User as UserModel
 from app.schemas.exercise_log import (
     ExerciseLogRead,
     ExerciseLogCreate,
+    ExerciseLogCreated,
     ExerciseLogUpdate,
 )
+from app.core.responses import (
+    NEGOTIATED_RESPONSES,
+    ResponseFormat,
+    negotiate_response_format,
+    rows_response,
+)
 from app.core.security import get_current_user
+from app.core.timing import TimedRoute
+from app.utils.exercise_summary import log_added, log_changed, log_removed
+from app.utils.personal_records import record_added, record_removed, records_changed
 
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
-@router.get("/", response_model=list[ExerciseLogRead])
-def read_exercise_logs(
-    db: Session = Depends(get_db),
+@router.get("/", response_model=list[ExerciseLogRead], responses=NEGOTIATED_RESPONSES)
+async def read_exercise_logs(
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
     limit: int = 100,
     current_user: UserModel = Depends(get_current_user),
+    response_format: ResponseFormat = Depends(negotiate_response_format),
 ):
     """
     Retrieve exercise logs for the current user.
+
+    Send `Accept: application/msgpack` for MessagePack, and `shape=columnar`
+    for one array per field.
     """
     if not current_user:
         raise HTTPException(status_code=401, detail="Not authenticated")
-    logs = db.query(ExerciseLogModel).filter(ExerciseLogModel.user_id == current_user.id).offset(skip).limit(limit).all()
-    return logs
+    rows = await db.execute(
+        USER_LOGS_PAGE, {"user_id": current_user.id, "skip": skip, "limit": limit}
+    )
+    return rows_response(rows, response_format)
 
 
-@router.post("/", response_model=ExerciseLogRead, status_code=status.HTTP_201_CREATED)
-def create_exercise_log(
+@router.post("/", response_model=ExerciseLogCreated, status_code=status.HTTP_201_CREATED)
+async def create_exercise_log(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     log_in: ExerciseLogCreate,
     current_user: UserModel = Depends(get_current_user),
 ):
     """
-    Create new exercise log.
+    Create new exercise log. `new_pr` is true if it now holds a personal
+    record, by beating it or by tying it from an earlier date, and
+    `new_records` lists those rep maxes.
     """
     # First, verify that the exercise exists and belongs to the current user.
-    exercise = db.query(ExerciseModel).filter(ExerciseModel.id == log_in.exercise_id, ExerciseModel.user_id == current_user.id).first()
+    exercise = await db.scalar(
+        OWNED_EXERCISE_ID, {"exercise_id": log_in.exercise_id, "user_id": current_user.id}
+    )
     if not exercise:
         raise HTTPException(status_code=404, detail="Exercise not found")
 
     db_obj = ExerciseLogModel(**log_in.model_dump(), user_id=current_user.id)
     db.add(db_obj)
-    db.commit()
-    db.refresh(db_obj)
-    return db_obj
-
-
-@router.get("/exercise/{exercise_id}", response_model=list[ExerciseLogRead])
-def read_exercise_logs_for_exercise(
+    await log_added(db, db_obj)
+    new_records = await record_added(db, db_obj)
+    await db.commit()
+    await db.refresh(db_obj)
+    return ExerciseLogCreated(
+        **ExerciseLogRead.model_validate(db_obj).model_dump(),
+        new_pr=bool(new_records),
+        new_records=new_records,
+    )
+
+
+@router.get(
+    "/exercise/{exercise_id}",
+    response_model=list[ExerciseLogRead],
+    responses=NEGOTIATED_RESPONSES,
+)
+async def read_exercise_logs_for_exercise(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     exercise_id: UUID,
     current_user: UserModel = Depends(get_current_user),
+    response_format: ResponseFormat = Depends(negotiate_response_format),
 ):
     """
-    Retrieve all exercise logs for a specific exercise.
+    Retrieve all exercise logs for a specific exercise, in the same formats
+    as the log listing.
     """
     # Verify the exercise exists and belongs to the user to prevent data leakage
-    exercise = db.query(ExerciseModel).filter(ExerciseModel.id == exercise_id, ExerciseModel.user_id == current_user.id).first()
+    exercise = await db.scalar(
+        OWNED_EXERCISE_ID, {"exercise_id": exercise_id, "user_id": current_user.id}
+    )
     if not exercise:
         raise HTTPException(status_code=404, detail="Exercise not found or not owned by user")
 
-    logs = db.query(ExerciseLogModel).filter(ExerciseLogModel.exercise_id == exercise_id).all()
-    return logs
+    rows = await db.execute(EXERCISE_LOGS, {"exercise_id": exercise_id})
+    return rows_response(rows, response_format)
 
 
 @router.put("/{log_id}", response_model=ExerciseLogRead)
-def update_exercise_log(
+async def update_exercise_log(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     log_id: UUID,
     log_in: ExerciseLogUpdate,
     current_user: UserModel = Depends(get_current_user),
@@ -86,7 +120,7 @@ def update_exercise_log(
     """
     Update an exercise log.
     """
-    log = db.get(ExerciseLogModel, log_id)
+    log = await db.get(ExerciseLogModel, log_id)
     if not log:
         raise HTTPException(status_code=404, detail="Exercise log not found")
     if log.user_id != current_user.id:
@@ -97,22 +131,26 @@ def update_exercise_log(
         setattr(log, field, value)
 
     db.add(log)
-    db.commit()
-    db.refresh(log)
+    if update_data.keys() & {"weight", "weight_unit", "date"}:
+        await log_changed(db, log.exercise_id)
+    if update_data.keys() & {"weight", "weight_unit", "reps", "date"}:
+        await records_changed(db, log.user_id, log.exercise_id)
+    await db.commit()
+    await db.refresh(log)
     return log
 
 
 @router.get("/{log_id}", response_model=ExerciseLogRead)
-def read_exercise_log(
+async def read_exercise_log(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     log_id: UUID,
     current_user: UserModel = Depends(get_current_user),
 ):
     """
     Get exercise log by ID.
     """
-    log = db.get(ExerciseLogModel, log_id)
+    log = await db.get(ExerciseLogModel, log_id)
     if not log:
         raise HTTPException(status_code=404, detail="Exercise log not found")
     if log.user_id != current_user.id:
@@ -121,21 +159,23 @@ def read_exercise_log(
 
 
 @router.delete("/{log_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_exercise_log(
+async def delete_exercise_log(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     log_id: UUID,
     current_user: UserModel = Depends(get_current_user),
 ):
     """
     Delete an exercise log.
     """
-    log = db.get(ExerciseLogModel, log_id)
+    log = await db.get(ExerciseLogModel, log_id)
     if not log:
         raise HTTPException(status_code=404, detail="Exercise log not found")
     if log.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
-    db.delete(log)
-    db.commit()
+    await db.delete(log)
+    await log_removed(db, log)
+    await record_removed(db, log)
+    await db.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
@@ -1,73 +1,60 @@
 # app/api/v1/exercises.py
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from uuid import UUID
 
-from app.db.session import get_db
+from app.db.queries import OWNED_EXERCISE, OWNED_WORKOUT_EXERCISES, OWNED_WORKOUT_ID
+from app.db.session import get_async_db
 from app.models.exercise import Exercise as ExerciseModel
-from app.models.workout import Workout as WorkoutModel
 from app.models.user import User as UserModel
 from app.schemas.exercise import Exercise, ExerciseCreate, ExerciseUpdate
 from app.core.security import get_current_user
+from app.core.timing import TimedRoute
 
-router = APIRouter(tags=["exercises"])
+router = APIRouter(tags=["exercises"], route_class=TimedRoute)
 
 
 @router.post("/", response_model=Exercise, status_code=status.HTTP_201_CREATED)
-def create_exercise_for_workout(
+async def create_exercise_for_workout(
     exercise: ExerciseCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user),
 ):
-    result = db.execute(
-        select(WorkoutModel).filter(
-            WorkoutModel.id == exercise.workout_id,
-            WorkoutModel.user_id == current_user.id,
-        )
+    workout = await db.scalar(
+        OWNED_WORKOUT_ID, {"workout_id": exercise.workout_id, "user_id": current_user.id}
     )
-    if not result.scalars().first():
+    if not workout:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workout not found")
 
     db_exercise = ExerciseModel(**exercise.model_dump(), user_id=current_user.id)
     db.add(db_exercise)
-    db.commit()
-    db.refresh(db_exercise)
+    await db.commit()
+    await db.refresh(db_exercise)
     return db_exercise
 
 
 @router.get("/by-workout/{workout_id}", response_model=List[Exercise])
-def read_exercises_for_workout(
+async def read_exercises_for_workout(
     workout_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user),
 ):
-    result = db.execute(
-        select(ExerciseModel)
-        .join(WorkoutModel)
-        .filter(
-            ExerciseModel.workout_id == workout_id,
-            WorkoutModel.user_id == current_user.id,
-        )
+    result = await db.execute(
+        OWNED_WORKOUT_EXERCISES, {"workout_id": workout_id, "user_id": current_user.id}
     )
     return result.scalars().all()
 
 
 @router.get("/{exercise_id}", response_model=Exercise)
-def read_exercise(
+async def read_exercise(
     exercise_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user),
 ):
-    result = db.execute(
-        select(ExerciseModel)
-        .join(WorkoutModel)
-        .filter(
-            ExerciseModel.id == exercise_id,
-            WorkoutModel.user_id == current_user.id,
-        )
+    result = await db.execute(
+        OWNED_EXERCISE, {"exercise_id": exercise_id, "user_id": current_user.id}
     )
     exercise = result.scalars().first()
     if exercise is None:
@@ -76,13 +63,13 @@ def read_exercise(
 
 
 @router.put("/{exercise_id}", response_model=Exercise)
-def update_exercise(
+async def update_exercise(
     exercise_id: UUID,
     exercise_in: ExerciseUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user),
 ):
-    db_exercise = db.get(ExerciseModel, exercise_id)
+    db_exercise = await db.get(ExerciseModel, exercise_id)
     if not db_exercise or db_exercise.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exercise not found")
 
@@ -91,21 +78,21 @@ def update_exercise(
         setattr(db_exercise, field, value)
 
     db.add(db_exercise)
-    db.commit()
-    db.refresh(db_exercise)
+    await db.commit()
+    await db.refresh(db_exercise)
     return db_exercise
 
 
 @router.delete("/{exercise_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_exercise(
+async def delete_exercise(
     exercise_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user),
 ):
-    db_exercise = db.get(ExerciseModel, exercise_id)
+    db_exercise = await db.get(ExerciseModel, exercise_id)
     if not db_exercise or db_exercise.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exercise not found")
 
-    db.delete(db_exercise)
-    db.commit()
+    await db.delete(db_exercise)
+    await db.commit()
     return None
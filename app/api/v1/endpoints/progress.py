@@ -1,29 +1,54 @@
 # app/api/v1/progress.py
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func, cast, Date
-from typing import List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from typing import List, Tuple
 from datetime import date, timedelta
 from uuid import UUID
 from collections import defaultdict
 
-from app.db.session import get_db
+from app.db.queries import (
+    EXERCISE_RECORDS,
+    LOGS_IN_RANGE,
+    OWNED_EXERCISE,
+    OWNED_WORKOUT_ID,
+    SESSION_METRICS,
+    USER_RECORDS,
+    WORKOUT_EXERCISES,
+    log_range,
+)
+from app.db.session import get_async_db
 from app.models.exercise_log import ExerciseLog
-from app.models.exercise import Exercise
 from app.models.user import User
-from app.models.workout import Workout
 from app.schemas.progress import (
     ChartDataPoint,
     DateRangePreset,
     WeeklyProgressMetrics,
     ExerciseProgress,
+    PersonalRecordRead,
+    ProgressMetric,
+    TrendMethod,
 )
 from app.schemas.weight_unit import WeightUnit
+from app.core.responses import (
+    DEFAULT_FORMAT,
+    NEGOTIATED_RESPONSES,
+    ResponseFormat,
+    negotiate_response_format,
+    to_columnar,
+)
 from app.core.security import get_current_user
+from app.core.timing import TimedRoute, timed
+from app.utils.trend import fit_trend
 from app.utils.weight_converter import convert_weight
+from app.utils.rate_limiter import rate_limit
+
+router = APIRouter(route_class=TimedRoute)
 
-router = APIRouter()
+# Trends of at least this many points are fitted in the threadpool rather
+# than blocking the event loop; the robust methods cost milliseconds from here
+THREAD_MINIMUM_POINTS = 64
 
 
 def get_date_range_from_preset(preset: DateRangePreset) -> Tuple[date, date]:
@@ -43,16 +68,16 @@ def get_date_range_from_preset(preset: DateRangePreset) -> Tuple[date, date]:
 
 
 def calculate_weekly_progress(
-    data_points: List[ChartDataPoint], target_unit: WeightUnit
+    data_points: List[ChartDataPoint], target_unit: WeightUnit | None
 ) -> WeeklyProgressMetrics:
-    """Calculate weekly progress metrics from data points."""
+    """Calculate weekly progress metrics from the values of data points."""
     if len(data_points) < 2:
         return WeeklyProgressMetrics(number_of_weeks=1 if data_points else 0, weight_unit=target_unit)
 
     sorted_points = sorted(data_points, key=lambda x: x.date)
     
-    start_weight = sorted_points[0].weight
-    end_weight = sorted_points[-1].weight
+    start_weight = sorted_points[0].value
+    end_weight = sorted_points[-1].value
     
     days_diff = (sorted_points[-1].date - sorted_points[0].date).days
     num_weeks = (days_diff // 7) + 1
@@ -71,12 +96,59 @@ def calculate_weekly_progress(
     )
 
 
+def progress_content(progress: ExerciseProgress, columnar: bool) -> dict:
+    """Plain-data form of a progress response for the negotiated renderers."""
+    content = progress.model_dump(exclude={"data_points"} if columnar else None)
+    if columnar:
+        content["data_points"] = to_columnar(progress.data_points, ChartDataPoint)
+    return content
+
+
+@router.get(
+    "/records",
+    response_model=List[PersonalRecordRead],
+    tags=["progress"],
+    dependencies=[Depends(rate_limit(cost=1))],
+)
+async def get_personal_records(
+    target_unit: WeightUnit,
+    exercise_id: UUID | None = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> List[PersonalRecordRead]:
+    """
+    Get the current user's personal records (1RM, 5RM and 10RM), for every
+    exercise or only `exercise_id`. Records are maintained as logs are
+    written, so this never reads the logs themselves.
+    """
+    if exercise_id is None:
+        result = await db.execute(USER_RECORDS, {"user_id": current_user.id})
+    else:
+        result = await db.execute(
+            EXERCISE_RECORDS, {"user_id": current_user.id, "exercise_id": exercise_id}
+        )
+    kg_to_target = convert_weight(1.0, WeightUnit.KG, target_unit)
+    return [
+        PersonalRecordRead(
+            exercise_id=record.exercise_id,
+            rep_max=record.rep_max,
+            weight=record.weight_kg * kg_to_target,
+            weight_unit=target_unit,
+            achieved_at=record.achieved_at,
+            log_id=record.log_id,
+        )
+        for record in result.scalars()
+    ]
+
+
 @router.get(
     "/exercise/{exercise_id}",
     response_model=ExerciseProgress,
+    responses=NEGOTIATED_RESPONSES,
     tags=["progress"],
+    dependencies=[Depends(rate_limit(cost=5))],
 )
-def get_exercise_progress(
+async def get_exercise_progress(
     exercise_id: UUID,
     target_unit: WeightUnit,
     start_date: date | None = None,
@@ -85,18 +157,31 @@ def get_exercise_progress(
     include_personal_best: bool = True,
     include_weekly_progress: bool = True,
     date_range_preset: DateRangePreset | None = None,
+    metric: ProgressMetric = ProgressMetric.WEIGHT,
+    trend_method: TrendMethod = TrendMethod.OLS,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    response_format: ResponseFormat = Depends(negotiate_response_format),
 ) -> ExerciseProgress:
-    """Get progress data for a specific exercise."""
+    """
+    Get progress data for a specific exercise.
+
+    `metric` picks the charted and trended series: the weight of each log,
+    or per session the estimated one-rep max (`e1rm_epley`,
+    `e1rm_brzycki`), the tonnage (weight x reps x sets) or the intensity
+    (heaviest weight as a percentage of the best Epley e1RM in the range).
+    Session metrics are computed in SQL, one row per session.
+
+    `trend` is the slope of the series per day, estimated by `trend_method`:
+    least squares (`ols`), or the outlier-resistant `theil_sen` or `huber`,
+    with a 95% confidence interval in `trend_ci_low`/`trend_ci_high`.
+
+    Send `Accept: application/msgpack` for MessagePack, and `shape=columnar`
+    to receive `data_points` as one array per field.
+    """
     # Verify exercise exists and user has access
-    result = db.execute(
-        select(Exercise)
-        .join(Workout)
-        .filter(
-            Exercise.id == exercise_id,
-            Workout.user_id == current_user.id,
-        )
+    result = await db.execute(
+        OWNED_EXERCISE, {"exercise_id": exercise_id, "user_id": current_user.id}
     )
     exercise = result.scalars().first()
     if not exercise:
@@ -124,104 +209,127 @@ def get_exercise_progress(
             # If only start_date is provided, default end_date to today
             end_date = date.today()
 
-    # Query for logs
-    log_query = (
-        select(ExerciseLog)
-        .where(
-            ExerciseLog.exercise_id == exercise.id,
-            ExerciseLog.user_id == current_user.id,
-            cast(ExerciseLog.date, Date).between(start_date, end_date)
-        )
-        .order_by(ExerciseLog.date.asc())
-    )
-    logs = db.execute(log_query).scalars().all()
-    if not logs:
+    # Query for logs, or for the sessions of the requested metric
+    params = {"exercise_id": exercise.id, "user_id": current_user.id, **log_range(start_date, end_date)}
+    if metric == ProgressMetric.WEIGHT:
+        rows = (await db.execute(LOGS_IN_RANGE, params)).scalars().all()
+    else:
+        rows = [
+            session
+            for session in (await db.execute(SESSION_METRICS, params)).all()
+            if getattr(session, metric.value) is not None
+        ]
+    if not rows:
         raise HTTPException(status_code=404, detail="No logs found for this exercise in the given date range.")
 
-    # Process logs to create data points and find personal best
-    data_points: list[ChartDataPoint] = []
-    personal_best: Optional[float] = None
-    personal_best_date: Optional[date] = None
+    # Python-side analytics, reported as the Server-Timing "compute" phase
+    with timed("compute"):
+        # Logs are compared by the stored weight_kg; a weight is converted
+        # to target_unit only when it is output, and kept as logged if it is
+        # already in that unit
+        kg_to_target = convert_weight(1.0, WeightUnit.KG, target_unit)
 
-    for log in logs:
-        weight_in_target = convert_weight(
-            log.weight, from_unit=log.weight_unit, to_unit=target_unit
-        )
-        data_points.append(
-            ChartDataPoint(
-                date=log.date.date(),
-                weight=weight_in_target,
-                weight_unit=log.weight_unit,
-                reps=log.reps,
-                sets=log.sets
-            )
-        )
-        if personal_best is None or weight_in_target > personal_best:
-            personal_best = weight_in_target
-            personal_best_date = log.date.date()
-
-    response = ExerciseProgress(
-        exercise_id=exercise_id,
-        exercise_name=exercise.name,
-        data_points=data_points,
-        personal_best=personal_best,
-        personal_best_date=personal_best_date,
-        target_unit=target_unit,
-    )
+        def in_target_unit(log: ExerciseLog) -> float:
+            if log.weight_unit.value == target_unit.value:
+                return log.weight
+            return log.weight_kg * kg_to_target
 
-    if include_trend:
-        # Simple linear regression trend calculation
-        n = len(data_points)
-        x_vals = [(dp.date - data_points[0].date).days for dp in data_points]
-        y_vals = [dp.weight for dp in data_points]
-        sum_x = sum(x_vals)
-        sum_y = sum(y_vals)
-        sum_xy = sum(x * y for x, y in zip(x_vals, y_vals))
-        sum_xx = sum(x * x for x in x_vals)
-        slope = (
-            (n * sum_xy - sum_x * sum_y) / (n * sum_xx - sum_x**2)
-            if (n * sum_xx - sum_x**2) != 0
-            else 0
+        if metric == ProgressMetric.WEIGHT:
+            data_points = [
+                ChartDataPoint(
+                    date=log.date.date(),
+                    weight=in_target_unit(log),
+                    weight_unit=log.weight_unit,
+                    reps=log.reps,
+                    sets=log.sets,
+                    value=in_target_unit(log),
+                )
+                for log in rows
+            ]
+            # The first of equally heavy logs, as before
+            best = max(rows, key=lambda log: log.weight_kg)
+            personal_best = in_target_unit(best)
+            personal_best_date = best.date.date()
+        else:
+            # Intensity is a percentage; the other session metrics are in kg
+            scale = 1.0 if metric == ProgressMetric.INTENSITY else kg_to_target
+            data_points = [
+                ChartDataPoint(
+                    date=session.date,
+                    weight=session.top_kg * kg_to_target,
+                    weight_unit=target_unit,
+                    reps=session.reps,
+                    sets=session.sets,
+                    value=getattr(session, metric.value) * scale,
+                )
+                for session in rows
+            ]
+            best = max(data_points, key=lambda point: point.value)
+            personal_best = best.value
+            personal_best_date = best.date
+
+        response = ExerciseProgress(
+            exercise_id=exercise_id,
+            exercise_name=exercise.name,
+            data_points=data_points,
+            personal_best=personal_best,
+            personal_best_date=personal_best_date,
+            target_unit=target_unit,
+            metric=metric,
         )
-        response.trend = slope
 
-    if include_weekly_progress:
-        response.weekly_progress = calculate_weekly_progress(data_points, target_unit)
+        if include_trend:
+            x_vals = [(dp.date - data_points[0].date).days for dp in data_points]
+            y_vals = [dp.value for dp in data_points]
+            if len(x_vals) >= THREAD_MINIMUM_POINTS:
+                trend = await run_in_threadpool(fit_trend, x_vals, y_vals, trend_method.value)
+            else:
+                trend = fit_trend(x_vals, y_vals, trend_method.value)
+            response.trend = trend.slope
+            response.trend_method = trend_method
+            response.trend_ci_low = trend.ci_low
+            response.trend_ci_high = trend.ci_high
+
+        if include_weekly_progress:
+            response.weekly_progress = calculate_weekly_progress(
+                data_points, None if metric == ProgressMetric.INTENSITY else target_unit
+            )
 
-    return response
+    if response_format.is_default:
+        return response
+    return response_format.render(progress_content(response, response_format.columnar))
 
 
 @router.get(
     "/workout/{workout_id}",
     response_model=List[ExerciseProgress],
+    responses=NEGOTIATED_RESPONSES,
     tags=["progress"],
+    dependencies=[Depends(rate_limit(cost=15))],
 )
-def get_workout_progress(
+async def get_workout_progress(
     workout_id: UUID,
     target_unit: WeightUnit,
     start_date: date | None = None,
     end_date: date | None = None,
     include_trend: bool = True,
     include_personal_best: bool = True,
+    metric: ProgressMetric = ProgressMetric.WEIGHT,
+    trend_method: TrendMethod = TrendMethod.OLS,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    response_format: ResponseFormat = Depends(negotiate_response_format),
 ) -> List[ExerciseProgress]:
-    """Get progress data for all exercises in a workout."""
+    """Get progress data for all exercises in a workout, in the same formats as a single exercise."""
     # Verify workout exists and user has access
-    result = db.execute(
-        select(Workout).filter(
-            Workout.id == workout_id,
-            Workout.user_id == current_user.id,
-        )
+    workout = await db.scalar(
+        OWNED_WORKOUT_ID, {"workout_id": workout_id, "user_id": current_user.id}
     )
-    workout = result.scalars().first()
     if not workout:
         raise HTTPException(status_code=404, detail="Workout not found")
 
     # Fetch all exercises in the workout
-    exercises_result = db.execute(
-        select(Exercise).filter(Exercise.workout_id == workout_id)
-    )
+    exercises_result = await db.execute(WORKOUT_EXERCISES, {"workout_id": workout_id})
     exercises = exercises_result.scalars().all()
     if not exercises:
         raise HTTPException(status_code=404, detail="No exercises found in workout")
@@ -230,7 +338,7 @@ def get_workout_progress(
     progress_data: List[ExerciseProgress] = []
     for exercise in exercises:
         try:
-            progress = get_exercise_progress(
+            progress = await get_exercise_progress(
                 exercise_id=exercise.id,
                 target_unit=target_unit,
                 start_date=start_date,
@@ -238,8 +346,11 @@ def get_workout_progress(
                 include_trend=include_trend,
                 include_personal_best=include_personal_best,
                 date_range_preset=None,
+                metric=metric,
+                trend_method=trend_method,
                 current_user=current_user,
                 db=db,
+                response_format=DEFAULT_FORMAT,
             )
             progress_data.append(progress)
         except HTTPException as exc:
@@ -252,4 +363,8 @@ def get_workout_progress(
             detail="No progress data found for any exercises",
         )
 
-    return progress_data
+    if response_format.is_default:
+        return progress_data
+    return response_format.render(
+        [progress_content(progress, response_format.columnar) for progress in progress_data]
+    )
@@ -1,77 +1,83 @@
 # app/api/v1/users.py
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
 from typing import List
 from uuid import UUID
 
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.user import User as UserModel
 from app.schemas.user import UserCreate, UserResponse, UserUpdate
 from app.core.security import get_password_hash, get_current_user
+from app.core.timing import TimedRoute
 from app.models.enums import UserRole
 
-router = APIRouter(tags=["users"])
+router = APIRouter(tags=["users"], route_class=TimedRoute)
 
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.execute(select(UserModel).filter(UserModel.email == user.email)).scalars().first()
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = (await db.execute(select(UserModel).filter(UserModel.email == user.email))).scalars().first()
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(user.password)
+    # bcrypt is CPU-bound; keep it off the event loop
+    hashed_password = await run_in_threadpool(get_password_hash, user.password)
     db_user = UserModel(**user.model_dump(exclude={"password"}), password=hashed_password)
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
     return db_user
 
 
 @router.get("/", response_model=List[UserResponse])
-def read_users(
+async def read_users(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     if not current_user.role == UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
-    users = db.execute(select(UserModel).offset(skip).limit(limit)).scalars().all()
+    users = (await db.execute(select(UserModel).offset(skip).limit(limit))).scalars().all()
     return users
 
 
 @router.get("/me", response_model=UserResponse)
-def read_current_user(
+async def read_current_user(
     current_user: UserModel = Depends(get_current_user),
 ):
     return current_user
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-def read_user(user_id: UUID, db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+async def read_user(
+    user_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user),
+):
     if user_id != current_user.id and not current_user.role == UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
     
-    user = db.get(UserModel, user_id)
+    user = await db.get(UserModel, user_id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 
 @router.put("/{user_id}", response_model=UserResponse)
-def update_user(
+async def update_user(
     user_id: UUID,
     user_in: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     if user_id != current_user.id and not current_user.role == UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
 
-    db_user = db.get(UserModel, user_id)
+    db_user = await db.get(UserModel, user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -80,24 +86,23 @@ def update_user(
         setattr(db_user, field, value)
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
     return db_user
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(
+async def delete_user(
     user_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     if user_id != current_user.id and not current_user.role == UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
 
-    db_user = db.get(UserModel, user_id)
+    db_user = await db.get(UserModel, user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    db.delete(db_user)
-    db.commit()
+    await db.delete(db_user)
+    await db.commit()
     return None
@@ -0,0 +1,257 @@
+# app/core/compression.py
+
+import functools
+import zlib
+from typing import Iterable, Mapping, Optional, Protocol
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional codec
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional codec
+    zstandard = None
+
+# Bodies at least this large are compressed in the threadpool rather than
+# blocking the event loop
+THREAD_MINIMUM_SIZE = 128 * 1024
+
+COMPRESSIBLE_TYPES = frozenset([
+    "application/json",
+    "application/javascript",
+    "application/msgpack",
+    "application/xml",
+    "image/svg+xml",
+])
+
+
+class StreamCompressor(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+    def finish(self) -> bytes: ...
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        # Sync flush so each chunk reaches the client as soon as it is produced
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def _gzip(data: bytes, level: int) -> bytes:
+    return zlib.compress(data, level, wbits=31)
+
+
+def _brotli(data: bytes, level: int) -> bytes:
+    return brotli.compress(data, quality=level)
+
+
+def _zstd(data: bytes, level: int) -> bytes:
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+# Server preference when the client accepts several encodings equally
+CODECS = {
+    name: codec
+    for name, codec, available in (
+        ("zstd", (_zstd, _ZstdStream), zstandard is not None),
+        ("br", (_brotli, _BrotliStream), brotli is not None),
+        ("gzip", (_gzip, _GzipStream), True),
+    )
+    if available
+}
+
+
+@functools.lru_cache(maxsize=256)
+def negotiate_encoding(accept_encoding: str, supported: tuple[str, ...] = tuple(CODECS)) -> Optional[str]:
+    """
+    Pick a content coding from an Accept-Encoding header: highest q-value
+    first, then server preference. Returns None for identity.
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in supported:
+        q = weights.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _is_compressible(headers: Headers) -> bool:
+    media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+    if media_type == "text/event-stream":
+        return False
+    return (
+        media_type.startswith("text/")
+        or media_type in COMPRESSIBLE_TYPES
+        or media_type.endswith(("+json", "+xml"))
+    )
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI response compression with zstd, brotli and gzip negotiated
+    from Accept-Encoding.
+
+    Complete bodies smaller than `minimum_size` are sent as is. Streaming
+    responses are compressed chunk by chunk, flushing after each chunk, so
+    every chunk reaches the client as soon as the app produces it.
+    Responses for `immutable_paths` (e.g. the OpenAPI document) are
+    compressed once at the `static_levels` and the bytes are reused for as
+    long as the rendered body stays the same.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1000,
+        levels: Optional[Mapping[str, int]] = None,
+        static_levels: Optional[Mapping[str, int]] = None,
+        immutable_paths: Iterable[str] = (),
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        # Dynamic responses favour speed; cached payloads favour size
+        self.levels = {"zstd": 3, "br": 4, "gzip": 6, **(levels or {})}
+        self.static_levels = {"zstd": 19, "br": 11, "gzip": 9, **(static_levels or {})}
+        self.immutable_paths = frozenset(immutable_paths)
+        # (path, encoding) -> (uncompressed body, compressed body)
+        self._cache: dict[tuple[str, str], tuple[bytes, bytes]] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept_encoding) if accept_encoding else None
+
+        start_message: Optional[Message] = None
+        stream: Optional[StreamCompressor] = None
+        passthrough = False
+
+        async def send_complete(start: Message, message: Message, body: bytes) -> None:
+            nonlocal passthrough
+            passthrough = True
+            headers = MutableHeaders(raw=start["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is not None and len(body) >= self.minimum_size:
+                body = await self._compress(scope["path"], encoding, body)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+            message["body"] = body
+            await send(start)
+            await send(message)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, stream, passthrough
+            message_type = message["type"]
+            if message_type == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                compressible = (
+                    encoding is not None
+                    and message["status"] != 206
+                    and "content-encoding" not in headers
+                    and _is_compressible(headers)
+                )
+                if not compressible:
+                    if _is_compressible(headers):
+                        MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+                    passthrough = True
+                    await send(message)
+                    return
+                # Held back until the body shows whether and how to compress
+                start_message = message
+                return
+            if passthrough or message_type != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if stream is None:
+                if not more_body:
+                    await send_complete(start_message, message, body)
+                    return
+                headers = MutableHeaders(raw=start_message["headers"])
+                headers.add_vary_header("Accept-Encoding")
+                headers["Content-Encoding"] = encoding
+                del headers["Content-Length"]
+                stream = CODECS[encoding][1](self.levels[encoding])
+                await send(start_message)
+
+            message["body"] = stream.compress(body) if body else b""
+            if not more_body:
+                message["body"] += stream.finish()
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _compress(self, path: str, encoding: str, body: bytes) -> bytes:
+        compress = CODECS[encoding][0]
+        if path not in self.immutable_paths:
+            level = self.levels[encoding]
+            if len(body) >= THREAD_MINIMUM_SIZE:
+                return await run_in_threadpool(compress, body, level)
+            return compress(body, level)
+
+        cached = self._cache.get((path, encoding))
+        if cached is not None and cached[0] == body:
+            return cached[1]
+        compressed = await run_in_threadpool(compress, body, self.static_levels[encoding])
+        self._cache[(path, encoding)] = (body, compressed)
+        return compressed
@@ -1,10 +1,12 @@
 # app/core/config.py
 
+import os
+import tempfile
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Annotated, Any, List, Dict, Literal, Optional
 
-from pydantic import AnyHttpUrl, PostgresDsn
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import AnyHttpUrl, PostgresDsn, field_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 from sqlalchemy.engine.url import make_url
 
 # Compute project root (two levels up from this file)
@@ -43,11 +45,66 @@ class Settings(BaseSettings):
     # Database settings
     DATABASE_URL: PostgresDsn
 
+    # Optional read replicas (comma-separated). GET requests are served from
+    # them in turn, except for users who wrote within the last
+    # DB_READ_YOUR_WRITES_SECONDS; unhealthy replicas are skipped until a
+    # health check, every DB_REPLICA_HEALTH_INTERVAL seconds, passes again.
+    DATABASE_REPLICA_URLS: Annotated[List[PostgresDsn], NoDecode] = []
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+    DB_REPLICA_HEALTH_INTERVAL: float = 10.0
+
+    @field_validator("DATABASE_REPLICA_URLS", mode="before")
+    @classmethod
+    def split_replica_urls(cls, value: Any) -> Any:
+        if isinstance(value, str):
+            return [url.strip() for url in value.split(",") if url.strip()]
+        return value
+
+    # Connection pooling. "pooled" keeps up to DB_POOL_SIZE + DB_MAX_OVERFLOW
+    # connections per process. "serverless" opens one connection per session
+    # (NullPool) so idle function instances hold none; it is the default on
+    # Vercel. "pgbouncer" is serverless behind a transaction pooler (e.g.
+    # Supabase on port 6543), with asyncpg prepared statements disabled.
+    DB_POOL_MODE: Literal["pooled", "serverless", "pgbouncer"] = (
+        "serverless" if os.environ.get("VERCEL") else "pooled"
+    )
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    # Replace connections older than this many seconds (-1 never), before
+    # proxies or the server drop them
+    DB_POOL_RECYCLE: int = 1800
+    # Ping a connection on checkout only after it sat idle in the pool this
+    # many seconds; 0 pings on every checkout, -1 never
+    DB_POOL_PRE_PING_IDLE: float = 30.0
+
     @property
     def BACKEND_CORS_ORIGINS(self) -> List[str]:
         # Cast AnyHttpUrl back to plain strings for CORS middleware
         return [str(self.FRONTEND_URL), str(self.ADMIN_URL)]
 
+    # Query auditing: count statements per request and flag repeated ones
+    # (N+1 patterns). "dev" audits every request, "sample" a random fraction.
+    QUERY_AUDIT_MODE: Literal["off", "dev", "sample"] = "off"
+    QUERY_AUDIT_SAMPLE_RATE: float = 0.01
+    QUERY_AUDIT_REPEAT_THRESHOLD: int = 5
+
+    # On-demand profiling of single requests by admins (X-Profile header or
+    # ?profile= query flag); profiles are written to PROFILE_DIR
+    PROFILING_ENABLED: bool = True
+    PROFILE_DIR: str = str(Path(tempfile.gettempdir()) / "gym-app-profiles")
+    PROFILE_INTERVAL: float = 0.001
+
+    # Bearer token the Prometheus scraper sends to GET /metrics; the
+    # endpoint answers 404 while it is unset
+    METRICS_TOKEN: Optional[str] = None
+
+    # Response compression (zstd and brotli are used when installed)
+    COMPRESSION_MINIMUM_SIZE: int = 1000
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_BROTLI_LEVEL: int = 4
+    COMPRESSION_GZIP_LEVEL: int = 6
+
     # Security headers
     SECURITY_HEADERS: Dict[str, str] = {
         "X-Content-Type-Options": "nosniff",
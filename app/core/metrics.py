@@ -0,0 +1,362 @@
+# app/core/metrics.py
+
+import hmac
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Callable, Iterable, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+CONNECT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Label used for requests that did not match any route, so scanners probing
+# random paths cannot create unbounded series
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, int) or value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Metric(ABC):
+    """
+    Base class for collectors.
+
+    Series are stored in plain dicts keyed by the tuple of label values.
+    Most metrics are only updated on the event loop thread (the middleware
+    and async dependencies), so they take no lock, and the only
+    per-observation allocation is the label tuple. Metrics that are also
+    updated from other threads, such as sync engine pool events running
+    in threadpool workers, are created with `threadsafe=True`. They then
+    take a lock for each update and for each scrape.
+    """
+
+    type = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        threadsafe: bool = False,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock() if threadsafe else nullcontext()
+
+    @abstractmethod
+    def samples(self) -> Iterable[str]:
+        """The exposition lines of every series."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        threadsafe: bool = False,
+    ):
+        super().__init__(name, documentation, labelnames, threadsafe)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: tuple = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(Metric):
+    """
+    Gauge that is either set directly or read from callbacks at scrape time.
+    A labelled gauge reads each series from its own callback, added with
+    `set_function`.
+    """
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Optional[Callable[[], Optional[float]]] = None,
+        labelnames: Sequence[str] = (),
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._value = 0.0
+        self._callbacks: dict[tuple, Callable[[], Optional[float]]] = {}
+        if callback is not None:
+            self.set_function(callback)
+
+    def inc(self, amount: float = 1) -> None:
+        self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self._value -= amount
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def set_function(self, callback: Callable[[], Optional[float]], labels: tuple = ()) -> None:
+        """Read the series with these label values from `callback` at scrape time."""
+        self._callbacks[labels] = callback
+
+    def value(self, labels: tuple = ()) -> Optional[float]:
+        callback = self._callbacks.get(labels)
+        return callback() if callback is not None else self._value
+
+    def samples(self) -> Iterable[str]:
+        labelled = list(self._callbacks) or [()]
+        for labels in labelled:
+            value = self.value(labels)
+            if value is not None:
+                yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    """
+    Fixed-bucket histogram. Each series is a list of per-bucket counts (the
+    last slot is +Inf) plus a running sum; counts are only made cumulative
+    when rendered.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        threadsafe: bool = False,
+    ):
+        super().__init__(name, documentation, labelnames, threadsafe)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bucket] += 1
+            series[1] += value
+
+    def count(self, labels: tuple = ()) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series is not None else 0
+
+    def samples(self) -> Iterable[str]:
+        # Copy each series so its buckets, sum and count agree
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            label_str = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_str} {_format_value(total)}"
+            yield f"{self.name}_count{label_str} {cumulative}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code.",
+    ("method", "route", "status"),
+))
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds",
+    "Time until the response body was sent, by method and route template.",
+    ("method", "route"),
+))
+REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight",
+    "Requests currently being processed.",
+))
+QUERIES_PER_REQUEST = REGISTRY.register(Histogram(
+    "db_queries_per_request",
+    "SQL statements executed per request, by route template.",
+    ("route",),
+    buckets=QUERY_COUNT_BUCKETS,
+))
+RATE_LIMIT_REJECTIONS = REGISTRY.register(Counter(
+    "rate_limit_rejections_total",
+    "Requests rejected with 429, by limiter scope.",
+    ("scope",),
+))
+DB_SESSIONS = REGISTRY.register(Counter(
+    "db_session_requests_total",
+    "Requests that declared a database session, by route template and whether they used it.",
+    ("route", "used"),
+))
+DB_CONNECT_LATENCY = REGISTRY.register(Histogram(
+    "db_connect_duration_seconds",
+    "Time to open a new database connection, by engine.",
+    ("engine",),
+    buckets=CONNECT_BUCKETS,
+    threadsafe=True,
+))
+DB_PRE_PINGS = REGISTRY.register(Counter(
+    "db_pool_pre_pings_total",
+    "Pings of connections that sat idle in the pool, by engine and result.",
+    ("engine", "result"),
+    threadsafe=True,
+))
+
+
+def scrape_authorized(authorization: Optional[str], token: Optional[str]) -> bool:
+    """Whether an Authorization header carries the scrape bearer `token`."""
+    if not token or not authorization:
+        return False
+    scheme, _, credentials = authorization.partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(
+        credentials.strip().encode(), token.encode()
+    )
+
+
+def route_template(scope: dict) -> str:
+    """The matched route's path template (e.g. /api/v1/workouts/{workout_id})."""
+    # Routes from included routers keep their unprefixed path; FastAPI
+    # records the full, prefixed template in its effective route context.
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    if context is not None and getattr(context, "path", None):
+        return context.path
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+def record_request(
+    method: str,
+    route: str,
+    status: Optional[int],
+    duration: float,
+    queries: int,
+    sessions: int = 0,
+    sessions_opened: int = 0,
+) -> None:
+    REQUESTS.inc((method, route, str(status or 500)))
+    REQUEST_LATENCY.observe(duration, (method, route))
+    QUERIES_PER_REQUEST.observe(queries, (route,))
+    if sessions:
+        DB_SESSIONS.inc((route, "true" if sessions_opened else "false"))
+
+
+def _threadpool_tokens(attribute: str) -> Optional[float]:
+    # anyio's default limiter bounds the threadpool that sync endpoints and
+    # dependencies run in; it is only reachable from inside the event loop.
+    from anyio import to_thread
+
+    try:
+        return getattr(to_thread.current_default_thread_limiter(), attribute)
+    except RuntimeError:
+        return None
+
+
+REGISTRY.register(Gauge(
+    "threadpool_borrowed_tokens",
+    "Worker threads in use by sync endpoints and dependencies.",
+    callback=lambda: _threadpool_tokens("borrowed_tokens"),
+))
+REGISTRY.register(Gauge(
+    "threadpool_total_tokens",
+    "Size of the worker threadpool.",
+    callback=lambda: _threadpool_tokens("total_tokens"),
+))
+
+
+DB_POOL_SIZE = REGISTRY.register(Gauge(
+    "db_pool_size",
+    "Configured number of persistent connections in the pool, by engine.",
+    labelnames=("engine",),
+))
+DB_POOL_CHECKED_OUT = REGISTRY.register(Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool, by engine.",
+    labelnames=("engine",),
+))
+DB_POOL_OVERFLOW = REGISTRY.register(Gauge(
+    "db_pool_overflow",
+    "Connections opened beyond the pool size (negative while the pool is not full), by engine.",
+    labelnames=("engine",),
+))
+
+
+def register_pool_metrics(engine: Engine, name: str = "sync") -> None:
+    """
+    Time new connections and expose the pool state, read at scrape time, as
+    the db_pool_* gauges, all labelled with `engine=name`.
+    """
+
+    @event.listens_for(engine, "do_connect")
+    def _do_connect(dialect, connection_record, cargs, cparams):
+        start = time.perf_counter()
+        try:
+            return dialect.connect(*cargs, **cparams)
+        finally:
+            DB_CONNECT_LATENCY.observe(time.perf_counter() - start, (name,))
+
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        # e.g. NullPool keeps no connections around
+        return
+    DB_POOL_SIZE.set_function(pool.size, (name,))
+    DB_POOL_CHECKED_OUT.set_function(pool.checkedout, (name,))
+    DB_POOL_OVERFLOW.set_function(pool.overflow, (name,))
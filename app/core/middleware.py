@@ -1,43 +1,143 @@
 # app/core/middleware.py
 
+import logging
 import time
 import uuid
+from typing import Awaitable, Callable, Mapping, Optional
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from .config import settings
+from .metrics import REQUESTS_IN_FLIGHT, record_request, route_template
+from .profiling import (
+    SamplingProfiler,
+    is_admin_request,
+    profile_filename,
+    requested_profile_format,
+)
+from .query_audit import end_query_audit, report_query_audit, should_audit, start_query_audit
+from .timing import end_request_timings, start_request_timings
 
+logger = logging.getLogger("app.timing")
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    """Middleware to add a unique request ID to each request and response."""
 
-    async def dispatch(self, request: Request, call_next) -> Response:
-        request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
-        response = await call_next(request)
-        response.headers["X-Request-ID"] = request_id
-        return response
+class RequestContextMiddleware:
+    """
+    Pure ASGI middleware that assigns a request ID, times the request and
+    injects security headers.
+
+    Timing is broken down by phase (see app.core.timing) and reported in a
+    Server-Timing header plus one structured log record per request. Counts,
+    latency and queries per request are also recorded in app.core.metrics,
+    labelled by the matched route template. Requests selected by the query
+    audit mode (see app.core.query_audit) are checked for N+1 patterns, and
+    admins can have a single request profiled (see app.core.profiling).
 
+    Replaces separate BaseHTTPMiddleware layers for the same jobs: instead of
+    wrapping every response object, it edits the header list of the
+    `http.response.start` message in place, so streaming responses pass
+    straight through and no extra task is spawned per request.
+    """
 
-class TimingMiddleware(BaseHTTPMiddleware):
-    """Middleware to track request timing using a high-resolution clock."""
+    def __init__(
+        self,
+        app: ASGIApp,
+        security_headers: Optional[Mapping[str, str]] = None,
+        profile_authorizer: Callable[[Scope], Awaitable[bool]] = is_admin_request,
+    ):
+        self.app = app
+        self.profile_authorizer = profile_authorizer
+        headers = settings.SECURITY_HEADERS if security_headers is None else security_headers
+        # Encoded once at startup rather than per response
+        self.security_headers = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in headers.items()
+        ]
+        # Headers this middleware owns; any value set by the app is replaced
+        self.owned_headers = frozenset(
+            [b"x-request-id", b"x-process-time", b"server-timing", b"x-profile"]
+            + [name for name, _ in self.security_headers]
+        )
 
-    async def dispatch(self, request: Request, call_next) -> Response:
-        start = time.perf_counter()
-        response = await call_next(request)
-        elapsed = time.perf_counter() - start
-        # four decimal places of precision
-        response.headers["X-Process-Time"] = f"{elapsed:.4f}"
-        return response
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
+        request_id = str(uuid.uuid4())
+        # Exposed to handlers as request.state.request_id
+        scope.setdefault("state", {})["request_id"] = request_id
+        profiler = None
+        if settings.PROFILING_ENABLED:
+            # Only a header/query check on ordinary requests
+            profile_format = requested_profile_format(scope)
+            if profile_format is not None and await self.profile_authorizer(scope):
+                profiler = SamplingProfiler(settings.PROFILE_INTERVAL)
+        timings, token = start_request_timings()
+        REQUESTS_IN_FLIGHT.inc()
+        audit, audit_token = start_query_audit() if should_audit() else (None, None)
+        status_code = None
+        elapsed = 0.0
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Middleware to inject security headers into every response."""
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, elapsed
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed = timings.mark_response_start()
+                owned = self.owned_headers
+                headers = [h for h in message.get("headers", ()) if h[0].lower() not in owned]
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                # four decimal places of precision
+                headers.append((b"x-process-time", f"{elapsed:.4f}".encode("latin-1")))
+                headers.append((b"server-timing", timings.server_timing(elapsed).encode("latin-1")))
+                headers.extend(self.security_headers)
+                if profiler is not None:
+                    headers.append(
+                        (b"x-profile", profile_filename(request_id, profile_format).encode("latin-1"))
+                    )
+                message["headers"] = headers
+            await send(message)
 
-    async def dispatch(self, request: Request, call_next) -> Response:
-        response = await call_next(request)
-        for header, value in settings.SECURITY_HEADERS.items():
-            response.headers[header] = value
-        return response
+        if profiler is not None:
+            profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if profiler is not None:
+                profiler.stop()
+            end_request_timings(token)
+            REQUESTS_IN_FLIGHT.dec()
+            route = route_template(scope)
+            record_request(
+                scope["method"],
+                route,
+                status_code,
+                time.perf_counter() - timings.start,
+                timings.db_count,
+                timings.sessions,
+                timings.sessions_opened,
+            )
+            if audit is not None:
+                end_query_audit(audit_token)
+                endpoint = getattr(scope.get("route"), "name", None)
+                report_query_audit(audit, scope["method"], route, endpoint)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "%s %s %s",
+                    scope["method"],
+                    scope["path"],
+                    status_code,
+                    extra={
+                        "request_id": request_id,
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status_code": status_code,
+                        **timings.log_fields(elapsed),
+                    },
+                )
+            if profiler is not None:
+                path = await run_in_threadpool(
+                    profiler.save, settings.PROFILE_DIR, request_id, profile_format
+                )
+                logger.info("Saved profile of %s %s to %s", scope["method"], scope["path"], path)
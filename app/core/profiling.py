@@ -0,0 +1,198 @@
+# app/core/profiling.py
+
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qsl
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from starlette.types import Scope
+
+from app.db.session import AsyncSessionLocal
+from app.models.enums import UserRole
+from app.models.user import User
+
+from .config import settings
+from .security import decode_access_token, user_id_from_payload
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_FORMATS = ("speedscope", "collapsed")
+
+# Leaf functions of threads that are parked rather than working: the event
+# loop waiting for I/O and idle threadpool workers
+_IDLE_FRAMES = frozenset([
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+])
+
+Frame = tuple[str, str, int]
+
+
+def requested_profile_format(scope: Scope) -> Optional[str]:
+    """
+    The profile format asked for with an `X-Profile` header or `profile`
+    query parameter ("1" selects speedscope), or None if not requested.
+    """
+    value = None
+    if b"profile=" in scope.get("query_string", b""):
+        value = dict(parse_qsl(scope["query_string"].decode("latin-1"))).get("profile")
+    if value is None:
+        for name, raw in scope["headers"]:
+            if name == PROFILE_HEADER:
+                value = raw.decode("latin-1")
+                break
+    if value is None:
+        return None
+    value = value.strip().lower()
+    if value in PROFILE_FORMATS:
+        return value
+    return "speedscope" if value in ("1", "true", "yes") else None
+
+
+async def is_admin_request(scope: Scope) -> bool:
+    """
+    Whether the request carries a valid access token for an admin user. Only
+    tokens with an admin `role` claim are checked against the database, so
+    other profile requests never open a session.
+    """
+    authorization = next(
+        (value for name, value in scope["headers"] if name == b"authorization"), b""
+    ).decode("latin-1")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        payload = decode_access_token(token)
+        user_id = user_id_from_payload(payload)
+    except HTTPException:
+        return False
+    if payload.get("role") != UserRole.ADMIN.value:
+        return False
+    # The role may have been revoked since the token was issued
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(User.role).where(User.id == user_id)) == UserRole.ADMIN
+
+
+def profile_filename(request_id: str, fmt: str) -> str:
+    return f"{request_id}.collapsed.txt" if fmt == "collapsed" else f"{request_id}.speedscope.json"
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of every thread in the process from a background
+    thread while one request runs. The event loop and the threadpool running
+    sync endpoints each show up as their own profile; idle threads are
+    skipped. Concurrent requests share those threads, so profile on a
+    quiet worker when possible.
+    """
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.samples: dict[int, list[tuple[tuple[Frame, ...], float]]] = {}
+        self.thread_names: dict[int, str] = {}
+        self._frames: dict[object, Frame] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            weight, last = now - last, now
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = self._stack(frame)
+                if (os.path.basename(stack[-1][1]), stack[-1][0]) in _IDLE_FRAMES:
+                    continue
+                self.samples.setdefault(ident, []).append((stack, weight))
+
+    def _stack(self, frame) -> tuple[Frame, ...]:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            entry = self._frames.get(code)
+            if entry is None:
+                entry = self._frames[code] = (code.co_name, code.co_filename, code.co_firstlineno)
+            stack.append(entry)
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def _thread_name(self, ident: int) -> str:
+        return self.thread_names.get(ident, f"thread-{ident}")
+
+    def to_speedscope(self, name: str) -> dict:
+        """Render as a speedscope (https://www.speedscope.app) sampled profile."""
+        frames: list[dict] = []
+        index: dict[Frame, int] = {}
+        profiles = []
+        for ident, entries in self.samples.items():
+            samples, weights = [], []
+            for stack, weight in entries:
+                indices = []
+                for frame in stack:
+                    position = index.get(frame)
+                    if position is None:
+                        position = index[frame] = len(frames)
+                        frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                    indices.append(position)
+                samples.append(indices)
+                weights.append(weight)
+            profiles.append({
+                "type": "sampled",
+                "name": self._thread_name(ident),
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": settings.APP_NAME,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def to_collapsed(self) -> str:
+        """Render as collapsed stacks (flamegraph.pl / speedscope), weighted in microseconds."""
+        totals: dict[str, float] = {}
+        for ident, entries in self.samples.items():
+            thread = self._thread_name(ident).replace(";", ":")
+            for stack, weight in entries:
+                key = ";".join(
+                    [thread] + [f"{name} ({os.path.basename(file)}:{line})" for name, file, line in stack]
+                )
+                totals[key] = totals.get(key, 0.0) + weight
+        return "".join(
+            f"{key} {max(1, round(weight * 1e6))}\n" for key, weight in totals.items()
+        )
+
+    def save(self, directory: str, request_id: str, fmt: str) -> Path:
+        """Write the profile to `directory`, named after the request ID."""
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        path = path / profile_filename(request_id, fmt)
+        if fmt == "collapsed":
+            path.write_text(self.to_collapsed())
+        else:
+            path.write_text(json.dumps(self.to_speedscope(request_id)))
+        return path
@@ -0,0 +1,145 @@
+# app/core/query_audit.py
+
+import functools
+import logging
+import random
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+
+logger = logging.getLogger("app.query_audit")
+
+_NORMALIZERS = (
+    # String literals
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    # Bound parameters: pyformat, named (but not ::casts), numeric and qmark
+    (re.compile(r"%\(\w+\)s|%s|(?<!:):\w+|\$\d+"), "?"),
+    # Numeric literals (identifiers such as id_1 are left alone)
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    # IN lists of any length, including expanded bind parameters
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?)"),
+    (re.compile(r"\s+"), " "),
+)
+
+
+@functools.lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """
+    Normalise a SQL statement so that executions differing only in literal
+    or parameter values share one fingerprint.
+    """
+    for pattern, replacement in _NORMALIZERS:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+class QueryAudit:
+    """Statements executed during one request, grouped by fingerprint."""
+
+    __slots__ = ("counts", "total")
+
+    def __init__(self) -> None:
+        self.counts: dict[str, int] = {}
+        self.total = 0
+
+    def record(self, statement: str) -> None:
+        key = fingerprint(statement)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.total += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Fingerprints that ran more than `threshold` times, most frequent first."""
+        return sorted(
+            ((key, count) for key, count in self.counts.items() if count > threshold),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+
+    def summary(self, limit: int = 5) -> str:
+        top = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return "\n".join(f"  {count} x {key}" for key, count in top)
+
+
+_current_audit: ContextVar[Optional[QueryAudit]] = ContextVar("query_audit", default=None)
+
+
+def should_audit() -> bool:
+    """Whether the request about to start should be audited."""
+    mode = settings.QUERY_AUDIT_MODE
+    if mode == "off":
+        return False
+    return mode == "dev" or random.random() < settings.QUERY_AUDIT_SAMPLE_RATE
+
+
+def start_query_audit() -> tuple[QueryAudit, Any]:
+    audit = QueryAudit()
+    return audit, _current_audit.set(audit)
+
+
+def end_query_audit(token: Any) -> None:
+    _current_audit.reset(token)
+
+
+def install_query_audit(engine: Engine) -> None:
+    """Record statements into the current request's audit, when there is one."""
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        audit = _current_audit.get()
+        if audit is not None:
+            audit.record(statement)
+
+
+def report_query_audit(audit: QueryAudit, method: str, route: str, endpoint: Optional[str]) -> None:
+    """Log fingerprints repeated often enough to suggest an N+1 pattern."""
+    threshold = settings.QUERY_AUDIT_REPEAT_THRESHOLD
+    for key, count in audit.repeated(threshold):
+        logger.warning(
+            "Possible N+1 in %s (%s %s): %d executions of %s",
+            endpoint, method, route, count, key,
+            extra={
+                "endpoint": endpoint,
+                "method": method,
+                "route": route,
+                "fingerprint": key,
+                "executions": count,
+                "total_queries": audit.total,
+            },
+        )
+
+
+@contextmanager
+def count_queries(target: Union[Engine, type[Engine]] = Engine) -> Iterator[QueryAudit]:
+    """
+    Count every statement executed on `target` inside the block, from any
+    thread. Defaults to all engines.
+    """
+    audit = QueryAudit()
+
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        audit.record(statement)
+
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+    try:
+        yield audit
+    finally:
+        event.remove(target, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def assert_max_queries(
+    budget: int, target: Union[Engine, type[Engine]] = Engine
+) -> Iterator[QueryAudit]:
+    """Fail with an AssertionError if the block executes more than `budget` statements."""
+    with count_queries(target) as audit:
+        yield audit
+    if audit.total > budget:
+        raise AssertionError(
+            f"Executed {audit.total} queries, budget is {budget}. Most frequent:\n{audit.summary()}"
+        )
@@ -0,0 +1,151 @@
+# app/core/responses.py
+
+from dataclasses import dataclass
+from datetime import date
+from enum import Enum
+from typing import Any, Literal, Sequence
+from uuid import UUID
+
+import msgpack
+import orjson
+from fastapi import Query, Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+from sqlalchemy.engine import Result
+from sqlalchemy.orm import InstrumentedAttribute
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+# Documents the alternative representation in OpenAPI for negotiated routes
+NEGOTIATED_RESPONSES: dict = {200: {"content": {"application/msgpack": {}}}}
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson, for content that is already plain
+    data (dicts, lists, UUIDs, datetimes, enums) rather than pydantic models.
+
+    Routes with a `response_model` don't need it: FastAPI already dumps
+    those straight to JSON bytes through pydantic-core.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _msgpack_default(value: Any) -> Any:
+    # Same string forms as the JSON representation
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Cannot serialise {type(value).__name__} to MessagePack")
+
+
+class MsgPackResponse(Response):
+    media_type = "application/msgpack"
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, default=_msgpack_default)
+
+
+def _media_type_weights(accept: str) -> dict[str, float]:
+    weights: dict[str, float] = {}
+    for item in accept.split(","):
+        media_type, _, params = item.partition(";")
+        media_type = media_type.strip().lower()
+        if not media_type:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[media_type] = q
+    return weights
+
+
+def prefers_msgpack(accept: str) -> bool:
+    """
+    Whether an Accept header ranks MessagePack above JSON. Only explicit
+    MessagePack types count, so wildcards (browsers, curl) keep getting JSON.
+    """
+    if "msgpack" not in accept:
+        return False
+    weights = _media_type_weights(accept)
+    msgpack_q = max(weights.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES)
+    json_q = weights.get(
+        "application/json", weights.get("application/*", weights.get("*/*", 0.0))
+    )
+    return msgpack_q > json_q
+
+
+@dataclass(frozen=True)
+class ResponseFormat:
+    """Representation negotiated for one response."""
+
+    msgpack: bool = False
+    columnar: bool = False
+
+    @property
+    def is_default(self) -> bool:
+        return not (self.msgpack or self.columnar)
+
+    def render(self, content: Any, status_code: int = 200) -> Response:
+        response_class = MsgPackResponse if self.msgpack else ORJSONResponse
+        return response_class(content, status_code=status_code, headers={"Vary": "Accept"})
+
+
+DEFAULT_FORMAT = ResponseFormat()
+
+
+def negotiate_response_format(
+    request: Request,
+    shape: Literal["rows", "columnar"] = Query(
+        "rows",
+        description='"columnar" returns lists of records as one array per field, '
+        'e.g. {"date": [...], "weight": [...]}',
+    ),
+) -> ResponseFormat:
+    """Dependency: MessagePack by Accept header, columnar layout by `shape`."""
+    return ResponseFormat(
+        msgpack=prefers_msgpack(request.headers.get("accept", "")),
+        columnar=shape == "columnar",
+    )
+
+
+def to_columnar(records: Sequence[BaseModel], model: type[BaseModel]) -> dict[str, list]:
+    """Turn a list of models into one list per field of `model`."""
+    return {name: [getattr(record, name) for record in records] for name in model.model_fields}
+
+
+def schema_columns(model: type, schema: type[BaseModel]) -> list[InstrumentedAttribute]:
+    """
+    The model's columns for each field of `schema`, in field order, so a
+    query selecting them yields rows shaped exactly like the schema.
+    """
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def rows_response(
+    result: Result, response_format: ResponseFormat = DEFAULT_FORMAT, status_code: int = 200
+) -> Response:
+    """
+    Serialise trusted SQL rows without building ORM objects or validating
+    them into pydantic models. Only use with columns from `schema_columns`,
+    so the output matches the route's declared response model.
+    """
+    keys = list(result.keys())
+    rows = result.all()
+    if response_format.columnar:
+        # Transposes the row tuples in C
+        columns = zip(*rows) if rows else [()] * len(keys)
+        content: Any = {key: list(column) for key, column in zip(keys, columns)}
+    else:
+        content = [dict(zip(keys, row)) for row in rows]
+    return response_format.render(content, status_code=status_code)
@@ -8,10 +8,11 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt, ExpiredSignatureError
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .config import settings
-from app.db.session import get_db
+from .timing import timed
+from app.db.session import AsyncSessionLocal, get_async_db
 from app.models.user import User
 
 # Password hashing
@@ -34,11 +35,14 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def create_access_token(
     subject: Any,
     expires_delta: Optional[timedelta] = None,
+    role: Optional[str] = None,
 ) -> str:
     """
     Create a JWT access token.
     - `sub` claim set to the provided subject (e.g. user ID).
     - `iat` (issued at) and `exp` (expiration) are included.
+    - `role` claim set to the user's role, if given. It is only a hint for
+      cheap checks; authorisation still reads the role from the database.
     """
     now = datetime.now(timezone.utc)
     expire = now + (
@@ -51,6 +55,8 @@ def create_access_token(
         "exp": expire,
         "sub": str(subject),
     }
+    if role is not None:
+        payload["role"] = role
     return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
@@ -83,30 +89,42 @@ def decode_access_token(token: str) -> dict[str, Any]:
         raise credentials_exception
 
 
-def get_current_user(
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> User:
     """
     FastAPI dependency: returns the User instance for the given JWT token,
     or raises 401/404 as appropriate.
     """
-    payload = decode_access_token(token)
+    with timed("auth"):
+        user_id = user_id_from_token(token)
+        user = await db.get(User, user_id)
+        if user is None and "replica" in db.info:
+            # The user may have registered moments ago, before the replica
+            # caught up; only the primary can tell them apart from unknown ones
+            async with AsyncSessionLocal() as primary:
+                user = await primary.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+
+def user_id_from_token(token: str) -> UUID:
+    """The user ID in a valid access token's subject, or raises 401."""
+    return user_id_from_payload(decode_access_token(token))
+
+
+def user_id_from_payload(payload: dict[str, Any]) -> UUID:
+    """The user ID in a decoded access token's subject, or raises 401."""
     raw_sub = payload.get("sub")
     if not raw_sub:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload"
         )
     try:
-        user_id = UUID(raw_sub)
+        return UUID(raw_sub)
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload"
         )
-
-    user = db.get(User, user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user
-
-
@@ -0,0 +1,160 @@
+# app/core/timing.py
+
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class RequestTimings:
+    """
+    Per-request time breakdown, in seconds.
+
+    A single mutable instance is shared through a ContextVar. Sync endpoints
+    and dependencies run in a threadpool with a copy of the request context,
+    so they see (and update) the same object as the middleware.
+    """
+
+    __slots__ = (
+        "start", "db", "db_count", "auth", "compute", "render", "endpoint_done",
+        "sessions", "sessions_opened",
+    )
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.db = 0.0
+        self.db_count = 0
+        self.auth = 0.0
+        self.compute = 0.0
+        self.render = 0.0
+        self.endpoint_done: Optional[float] = None
+        # Lazy database sessions declared by dependencies, and how many of
+        # them were actually used (see app.db.lazy)
+        self.sessions = 0
+        self.sessions_opened = 0
+
+    def mark_response_start(self) -> float:
+        """Close the render phase and return the total elapsed time."""
+        now = time.perf_counter()
+        if self.endpoint_done is not None:
+            self.render = now - self.endpoint_done
+        return now - self.start
+
+    def server_timing(self, total: float) -> str:
+        """Render a standard Server-Timing header value (durations in ms)."""
+        return (
+            f'db;dur={self.db * 1000:.2f};desc="{self.db_count} queries", '
+            f"auth;dur={self.auth * 1000:.2f}, "
+            f"compute;dur={self.compute * 1000:.2f}, "
+            f"render;dur={self.render * 1000:.2f}, "
+            f"total;dur={total * 1000:.2f}"
+        )
+
+    def log_fields(self, total: float) -> dict[str, Any]:
+        """Structured log fields (durations in ms)."""
+        return {
+            "db": round(self.db * 1000, 2),
+            "db_count": self.db_count,
+            "auth": round(self.auth * 1000, 2),
+            "compute": round(self.compute * 1000, 2),
+            "render": round(self.render * 1000, 2),
+            "total": round(total * 1000, 2),
+        }
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def start_request_timings() -> tuple[RequestTimings, Any]:
+    """Begin timing a request; returns the timings and a token for `end_request_timings`."""
+    timings = RequestTimings()
+    return timings, _current_timings.set(timings)
+
+
+def end_request_timings(token: Any) -> None:
+    _current_timings.reset(token)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current_timings.get()
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """
+    Add the time spent in the block to `phase` ("auth" or "compute") of the
+    current request. A no-op outside of a request.
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(timings, phase, getattr(timings, phase) + time.perf_counter() - start)
+
+
+def install_query_timing(engine: Engine) -> None:
+    """Accumulate SQL execution time and statement count into the current request."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start"].pop()
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.db += time.perf_counter() - start
+            timings.db_count += 1
+
+
+def _mark_endpoint_done() -> None:
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.endpoint_done = time.perf_counter()
+
+
+def _track_endpoint(call: Callable[..., Any]) -> Callable[..., Any]:
+    if inspect.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def async_wrapper(*args, **kwargs):
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                _mark_endpoint_done()
+        return async_wrapper
+
+    @functools.wraps(call)
+    def sync_wrapper(*args, **kwargs):
+        try:
+            return call(*args, **kwargs)
+        finally:
+            _mark_endpoint_done()
+    return sync_wrapper
+
+
+class TimedRoute(APIRoute):
+    """
+    Route class that records when the endpoint function returns, so the time
+    until the response starts (response_model validation, encoding and
+    rendering) is reported as the "render" phase.
+    """
+
+    def get_route_handler(self) -> Callable:
+        # The signature has already been analysed; only the call is wrapped
+        if not getattr(self.dependant.call, "_timed", False):
+            self.dependant.call = _track_endpoint(self.dependant.call)
+            self.dependant.call._timed = True
+        return super().get_route_handler()
@@ -0,0 +1,102 @@
+# app/db/lazy.py
+
+import inspect
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.timing import current_timings
+
+
+def _count_session(opened: bool) -> None:
+    timings = current_timings()
+    if timings is not None:
+        if opened:
+            timings.sessions_opened += 1
+        else:
+            timings.sessions += 1
+
+
+class LazySession:
+    """
+    Stands in for a Session and only creates it on first use, so requests
+    that fail validation or authentication before touching the database
+    never build a session or check out a connection.
+    """
+
+    __slots__ = ("_factory", "_session")
+
+    def __init__(self, factory: sessionmaker[Session]):
+        self._factory = factory
+        self._session: Optional[Session] = None
+        _count_session(opened=False)
+
+    @property
+    def opened(self) -> bool:
+        return self._session is not None
+
+    def __getattr__(self, name: str):
+        if self._session is None:
+            self._session = self._factory()
+            _count_session(opened=True)
+        return getattr(self._session, name)
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+
+
+class LazyAsyncSession:
+    """
+    Async counterpart of LazySession. The factory may be chosen per request
+    (e.g. a read replica) by `choose`, which is only awaited on first use
+    through a coroutine method such as `execute` or `get`. Synchronous first
+    use (`add`, `info`, ...) cannot wait for it and opens a `primary`
+    session: writes and bookkeeping belong there anyway.
+    """
+
+    __slots__ = ("_primary", "_choose", "_session")
+
+    def __init__(
+        self,
+        primary: async_sessionmaker[AsyncSession],
+        choose: Optional[Callable[[], Awaitable[async_sessionmaker[AsyncSession]]]] = None,
+    ):
+        self._primary = primary
+        self._choose = choose
+        self._session: Optional[AsyncSession] = None
+        _count_session(opened=False)
+
+    @property
+    def opened(self) -> bool:
+        return self._session is not None
+
+    @property
+    def session(self) -> Optional[AsyncSession]:
+        """The underlying session, or None if it was never used."""
+        return self._session
+
+    def _open(self, factory: async_sessionmaker[AsyncSession]) -> AsyncSession:
+        self._session = factory()
+        _count_session(opened=True)
+        return self._session
+
+    async def _open_chosen(self) -> AsyncSession:
+        factory = await self._choose() if self._choose is not None else self._primary
+        # A synchronous access may have opened a session while choosing
+        return self._session if self._session is not None else self._open(factory)
+
+    def __getattr__(self, name: str):
+        if self._session is not None:
+            return getattr(self._session, name)
+        if inspect.iscoroutinefunction(getattr(AsyncSession, name, None)):
+            async def deferred(*args, **kwargs):
+                session = await self._open_chosen()
+                return await getattr(session, name)(*args, **kwargs)
+            return deferred
+        return getattr(self._open(self._primary), name)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
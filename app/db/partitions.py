@@ -0,0 +1,171 @@
+# app/db/partitions.py
+"""
+Monthly range partitions of `exercise_logs` by `date` (Postgres only).
+
+Each month lives in its own table, `exercise_logs_pYYYY_MM`, so queries
+bounded by `date` scan only the months they cover. Vacuum and index
+maintenance work on one month at a time, and an old month can be detached
+in one statement instead of deleting its rows. Rows outside every monthly
+partition (e.g. backdated logs) land in `exercise_logs_default`.
+
+Partitions are created ahead of time by `scripts/maintain_partitions.py`;
+run it at least monthly.
+"""
+from datetime import date, datetime, time
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+PARTITIONED_TABLE = "exercise_logs"
+DEFAULT_PARTITION = f"{PARTITIONED_TABLE}_default"
+
+# Months created ahead of the current one
+MONTHS_AHEAD = 3
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARTITIONED_TABLE}_p{month:%Y_%m}"
+
+
+def _bounds(month: date) -> Tuple[datetime, datetime]:
+    return datetime.combine(month, time.min), datetime.combine(add_months(month, 1), time.min)
+
+
+def _exists(conn: Connection, table: str) -> bool:
+    return conn.scalar(text("SELECT to_regclass(:table) IS NOT NULL"), {"table": table})
+
+
+def _stored_columns(conn: Connection) -> str:
+    """The partitioned table's columns, without generated ones, as a SQL list."""
+    return conn.scalar(
+        text(
+            "SELECT string_agg(quote_ident(column_name), ', ' ORDER BY ordinal_position) "
+            "FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = :table "
+            "AND is_generated = 'NEVER'"
+        ),
+        {"table": PARTITIONED_TABLE},
+    )
+
+
+def create_default_partition(conn: Connection) -> None:
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARTITIONED_TABLE} DEFAULT"
+    ))
+
+
+def create_partition(conn: Connection, month: date) -> bool:
+    """
+    Create the partition for `month` unless it exists. Rows for that month
+    already in the default partition are moved into it. Returns whether a
+    partition was created.
+    """
+    name = partition_name(month)
+    if _exists(conn, name):
+        return False
+    start, end = _bounds(month)
+    bounds = {"start": start, "end": end}
+    in_default = _exists(conn, DEFAULT_PARTITION) and conn.scalar(
+        text(
+            f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+            "WHERE date >= :start AND date < :end)"
+        ),
+        bounds,
+    )
+    # Partition bounds must be literals
+    values = f"FROM ('{start.isoformat(' ')}') TO ('{end.isoformat(' ')}')"
+    if not in_default:
+        conn.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {PARTITIONED_TABLE} FOR VALUES {values}"
+        ))
+        return True
+
+    # A partition cannot be created while the default one holds rows in its
+    # range: build it standalone, move the rows over, then attach it. The
+    # copy keeps generated columns (weight_kg) generated, as ATTACH requires,
+    # so the rows are moved by their stored columns only.
+    conn.execute(text(
+        f"CREATE TABLE {name} (LIKE {PARTITIONED_TABLE} "
+        "INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED)"
+    ))
+    columns = _stored_columns(conn)
+    conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            f"WHERE date >= :start AND date < :end RETURNING {columns}) "
+            f"INSERT INTO {name} ({columns}) SELECT {columns} FROM moved"
+        ),
+        bounds,
+    )
+    conn.execute(text(f"ALTER TABLE {PARTITIONED_TABLE} ATTACH PARTITION {name} FOR VALUES {values}"))
+    return True
+
+
+def ensure_partitions(
+    conn: Connection,
+    months_ahead: int = MONTHS_AHEAD,
+    first: Optional[date] = None,
+    today: Optional[date] = None,
+) -> List[str]:
+    """
+    Create the default partition and monthly partitions from `first`
+    (default: this month) through `months_ahead` months from now. Returns
+    the names of the partitions created.
+    """
+    create_default_partition(conn)
+    current = month_start(today or date.today())
+    month = month_start(first) if first else current
+    last = add_months(current, months_ahead)
+    created = []
+    while month <= last:
+        if create_partition(conn, month):
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+def monthly_partitions(conn: Connection) -> List[Tuple[str, date]]:
+    """The attached monthly partitions as (name, month), oldest first."""
+    names = conn.scalars(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table"
+        ),
+        {"table": PARTITIONED_TABLE},
+    )
+    prefix = f"{PARTITIONED_TABLE}_p"
+    months = [
+        (name, datetime.strptime(name[len(prefix):], "%Y_%m").date())
+        for name in names
+        if name.startswith(prefix)
+    ]
+    return sorted(months, key=lambda partition: partition[1])
+
+
+def detach_partitions_before(conn: Connection, cutoff: date, drop: bool = False) -> List[str]:
+    """
+    Detach every monthly partition entirely before `cutoff`. Detached
+    partitions stay as ordinary tables, ready to be dumped and archived,
+    unless `drop` is set. Returns the names of the partitions detached.
+    """
+    detached = []
+    for name, month in monthly_partitions(conn):
+        if add_months(month, 1) > cutoff:
+            break
+        conn.execute(text(f"ALTER TABLE {PARTITIONED_TABLE} DETACH PARTITION {name}"))
+        if drop:
+            conn.execute(text(f"DROP TABLE {name}"))
+        detached.append(name)
+    return detached
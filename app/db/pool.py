@@ -0,0 +1,86 @@
+# app/db/pool.py
+
+import time
+import uuid
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.metrics import DB_PRE_PINGS
+
+# connection_record.info key: when the connection was last returned to the pool
+_CHECKED_IN_AT = "checked_in_at"
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def engine_options(asyncpg: bool = False) -> dict[str, Any]:
+    """
+    Keyword arguments for create_engine / create_async_engine from the
+    DB_POOL_* settings.
+    """
+    if settings.DB_POOL_MODE == "pooled":
+        return {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            # Otherwise pinging is left to install_idle_pre_ping
+            "pool_pre_ping": settings.DB_POOL_PRE_PING_IDLE == 0,
+        }
+
+    # Connections are opened per session and closed with it, so there is
+    # nothing to size, recycle or ping
+    options: dict[str, Any] = {"poolclass": NullPool}
+    if settings.DB_POOL_MODE == "pgbouncer" and asyncpg:
+        # A transaction pooler hands each transaction to whichever server
+        # connection is free, so statements prepared on one may be missing
+        # (or already taken) on the next: disable asyncpg's statement caches
+        # and give the unnamed statements it still prepares unique names
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+    return options
+
+
+def install_idle_pre_ping(engine: Engine, idle: float, name: str) -> None:
+    """
+    Ping pooled connections on checkout only once they have been idle for
+    more than `idle` seconds. Connections in steady use skip the round trip
+    that `pool_pre_ping` adds to every checkout, while ones left long enough
+    to have been dropped by a proxy or failover are tested first; a failed
+    ping makes the pool replace the connection and retry.
+    """
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        connection_record.info.pop(_CHECKED_IN_AT, None)
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        connection_record.info[_CHECKED_IN_AT] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get(_CHECKED_IN_AT)
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle:
+            return
+        try:
+            engine.dialect.do_ping(dbapi_connection)
+        except Exception as error:
+            DB_PRE_PINGS.inc((name, "failed"))
+            raise exc.DisconnectionError("Pre-ping of idle connection failed") from error
+        DB_PRE_PINGS.inc((name, "ok"))
+
+
+def configure_pool(engine: Engine, name: str) -> None:
+    """Apply the idle pre-ping policy to a pooled engine."""
+    if settings.DB_POOL_MODE == "pooled" and settings.DB_POOL_PRE_PING_IDLE > 0:
+        install_idle_pre_ping(engine, settings.DB_POOL_PRE_PING_IDLE, name)
@@ -0,0 +1,141 @@
+# app/db/queries.py
+"""
+Statements for the hottest queries, built once at import time with bound
+parameters instead of being rebuilt with `select(...).filter(...)` on every
+request. Execute them with a parameter dict, e.g.
+
+    await db.scalar(OWNED_EXERCISE_ID, {"exercise_id": ..., "user_id": ...})
+
+Reusing one statement object keeps its cache key memoised, so SQLAlchemy
+goes straight to the compiled form in the engine's compiled cache. asyncpg
+additionally prepares each statement on the server once per connection.
+"""
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import DateTime, Integer, bindparam, func, select
+from sqlalchemy.orm import selectinload
+
+from app.core.responses import schema_columns
+from app.models.exercise import Exercise
+from app.models.exercise_log import ExerciseLog
+from app.models.personal_record import PersonalRecord
+from app.models.workout import Workout
+from app.schemas.exercise_log import ExerciseLogRead
+from app.utils.training_metrics import (
+    BRZYCKI_E1RM,
+    EPLEY_E1RM,
+    SESSION_DAY,
+    SETS_OR_ONE,
+    TONNAGE,
+)
+
+# List endpoints select exactly the ExerciseLogRead columns and serialise
+# the rows directly, skipping ORM loading and response model validation
+LOG_READ_COLUMNS = schema_columns(ExerciseLog, ExerciseLogRead)
+
+# Ownership checks
+OWNED_EXERCISE_ID = select(Exercise.id).where(
+    Exercise.id == bindparam("exercise_id"),
+    Exercise.user_id == bindparam("user_id"),
+)
+OWNED_EXERCISE = (
+    select(Exercise)
+    .join(Workout)
+    .where(Exercise.id == bindparam("exercise_id"), Workout.user_id == bindparam("user_id"))
+)
+OWNED_WORKOUT_ID = select(Workout.id).where(
+    Workout.id == bindparam("workout_id"),
+    Workout.user_id == bindparam("user_id"),
+)
+
+# Workouts, with the exercises their responses include
+USER_WORKOUTS = (
+    select(Workout)
+    .where(Workout.user_id == bindparam("user_id"))
+    .options(selectinload(Workout.exercises))
+)
+OWNED_WORKOUT = (
+    select(Workout)
+    .where(Workout.id == bindparam("workout_id"), Workout.user_id == bindparam("user_id"))
+    .options(selectinload(Workout.exercises))
+)
+
+WORKOUT_EXERCISES = select(Exercise).where(Exercise.workout_id == bindparam("workout_id"))
+OWNED_WORKOUT_EXERCISES = (
+    select(Exercise)
+    .join(Workout)
+    .where(Exercise.workout_id == bindparam("workout_id"), Workout.user_id == bindparam("user_id"))
+)
+
+# Log listings (rows shaped like ExerciseLogRead)
+USER_LOGS_PAGE = (
+    select(*LOG_READ_COLUMNS)
+    .where(ExerciseLog.user_id == bindparam("user_id"))
+    .offset(bindparam("skip", type_=Integer))
+    .limit(bindparam("limit", type_=Integer))
+)
+EXERCISE_LOGS = select(*LOG_READ_COLUMNS).where(
+    ExerciseLog.exercise_id == bindparam("exercise_id")
+)
+
+# Progress: one user's logs of an exercise from `start` (inclusive) to `end`
+# (exclusive), oldest first. The bare column is compared, not
+# CAST(date AS DATE), so Postgres can prune the monthly partitions outside
+# the range (app.db.partitions). Build the bounds with log_range().
+LOGS_IN_RANGE = (
+    select(ExerciseLog)
+    .where(
+        ExerciseLog.exercise_id == bindparam("exercise_id"),
+        ExerciseLog.user_id == bindparam("user_id"),
+        ExerciseLog.date >= bindparam("start", type_=DateTime),
+        ExerciseLog.date < bindparam("end", type_=DateTime),
+    )
+    .order_by(ExerciseLog.date.asc())
+)
+# Progress: per-session metrics of the same logs (app.utils.training_metrics),
+# one row per calendar day, in kg. Logs without a weight or reps are left out.
+_sessions = (
+    select(
+        SESSION_DAY.label("date"),
+        func.max(ExerciseLog.weight_kg).label("top_kg"),
+        func.sum(ExerciseLog.reps * SETS_OR_ONE).label("reps"),
+        func.sum(SETS_OR_ONE).label("sets"),
+        func.max(EPLEY_E1RM).label("e1rm_epley"),
+        func.max(BRZYCKI_E1RM).label("e1rm_brzycki"),
+        func.sum(TONNAGE).label("tonnage"),
+    )
+    .where(
+        LOGS_IN_RANGE.whereclause,
+        ExerciseLog.weight_kg.is_not(None),
+        ExerciseLog.reps.is_not(None),
+    )
+    .group_by(SESSION_DAY)
+    .subquery()
+)
+SESSION_METRICS = select(
+    _sessions,
+    (100.0 * _sessions.c.top_kg / func.max(_sessions.c.e1rm_epley).over()).label("intensity"),
+).order_by(_sessions.c.date.asc())
+
+# Progress: a user's personal records, read from personal_records alone
+USER_RECORDS = (
+    select(PersonalRecord)
+    .where(PersonalRecord.user_id == bindparam("user_id"))
+    .order_by(PersonalRecord.exercise_id, PersonalRecord.rep_max)
+)
+EXERCISE_RECORDS = (
+    select(PersonalRecord)
+    .where(
+        PersonalRecord.user_id == bindparam("user_id"),
+        PersonalRecord.exercise_id == bindparam("exercise_id"),
+    )
+    .order_by(PersonalRecord.rep_max)
+)
+
+
+def log_range(start_date: date, end_date: date) -> dict:
+    """LOGS_IN_RANGE bounds covering the days `start_date` to `end_date`, inclusive."""
+    return {
+        "start": datetime.combine(start_date, time.min),
+        "end": datetime.combine(end_date + timedelta(days=1), time.min),
+    }
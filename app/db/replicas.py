@@ -0,0 +1,200 @@
+# app/db/replicas.py
+
+import asyncio
+import functools
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional, Sequence
+from uuid import UUID
+
+import redis.asyncio as redis
+from fastapi import HTTPException, Request
+from redis.exceptions import RedisError
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.db.lazy import LazyAsyncSession
+
+logger = logging.getLogger(__name__)
+
+# Requests with these methods only read, so they may be served by a replica
+READ_METHODS = frozenset(["GET", "HEAD"])
+
+
+class Replica:
+    """One read replica: its engine, session factory and health."""
+
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.sessionmaker = async_sessionmaker(
+            engine, autoflush=False, expire_on_commit=False, info={"replica": name}
+        )
+        self.healthy = True
+
+    async def check(self) -> bool:
+        """Run a trivial query and record whether the replica answered."""
+        try:
+            async with self.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        except (exc.SQLAlchemyError, OSError) as error:
+            if self.healthy:
+                logger.warning("Read replica %s is unavailable: %s", self.name, error)
+            self.healthy = False
+        else:
+            if not self.healthy:
+                logger.info("Read replica %s is available again", self.name)
+            self.healthy = True
+        return self.healthy
+
+
+class PrimaryPins:
+    """
+    Users pinned to the primary for `seconds` after a write, so they read
+    their own writes while the replicas catch up.
+
+    Pins are kept in process and, once `client` is set, in Redis so every
+    worker honours them. If Redis cannot be reached, users are treated as
+    pinned: the primary is always consistent.
+    """
+
+    def __init__(
+        self,
+        seconds: float,
+        client: redis.Redis | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.seconds = seconds
+        self.client = client
+        self.clock = clock
+        self._local: dict[UUID, float] = {}
+        self._prune_at = 1024
+
+    @staticmethod
+    def _key(user_id: UUID) -> str:
+        return f"db-primary-pin:{user_id}"
+
+    async def pin(self, user_id: UUID) -> None:
+        now = self.clock()
+        self._local[user_id] = now + self.seconds
+        # Expired pins are dropped while pinning, so the dict stays bounded
+        # by the number of users writing within one window
+        if len(self._local) > self._prune_at:
+            self._local = {key: until for key, until in self._local.items() if until > now}
+            self._prune_at = max(1024, 2 * len(self._local))
+        if self.client is not None:
+            try:
+                await self.client.set(self._key(user_id), 1, px=max(1, int(self.seconds * 1000)))
+            except RedisError as error:
+                logger.warning("Could not share primary pin for %s: %s", user_id, error)
+
+    async def is_pinned(self, user_id: UUID) -> bool:
+        if self._local.get(user_id, 0.0) > self.clock():
+            return True
+        if self.client is None:
+            return False
+        try:
+            return bool(await self.client.exists(self._key(user_id)))
+        except RedisError:
+            return True
+
+
+class ReplicaRouter:
+    """
+    Routes sessions of read-only requests to healthy replicas in turn and
+    everything else, including reads by recently pinned users, to the
+    primary.
+    """
+
+    def __init__(self, replicas: Sequence[Replica], pins: PrimaryPins):
+        self.replicas = list(replicas)
+        self.pins = pins
+        self._next = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def choose(self) -> Optional[Replica]:
+        """The next healthy replica in round-robin order, or None."""
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[self._next % len(self.replicas)]
+            self._next += 1
+            if replica.healthy:
+                return replica
+        return None
+
+    async def check_health(self) -> None:
+        await asyncio.gather(*(replica.check() for replica in self.replicas))
+
+    async def run_health_checks(self, interval: float) -> None:
+        """Re-check every replica every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            await self.check_health()
+
+    async def _sessionmaker_for(
+        self, request: Request, user_id: Optional[UUID], primary: async_sessionmaker[AsyncSession]
+    ) -> async_sessionmaker[AsyncSession]:
+        if request.method not in READ_METHODS:
+            if user_id is not None:
+                # Pinned before the write as well as after it, so a read
+                # racing the response is already routed to the primary
+                await self.pins.pin(user_id)
+            return primary
+        if user_id is not None and await self.pins.is_pinned(user_id):
+            return primary
+        replica = self.choose()
+        return replica.sessionmaker if replica is not None else primary
+
+    @asynccontextmanager
+    async def session(
+        self, request: Request, primary: async_sessionmaker[AsyncSession]
+    ) -> AsyncIterator[LazyAsyncSession]:
+        """
+        A lazily opened session for `request`: from a replica for reads,
+        from `primary` otherwise. Writes pin the requesting user to the
+        primary. Nothing is routed or pinned if the session is never used.
+        """
+        if not self.replicas:
+            db = LazyAsyncSession(primary)
+            try:
+                yield db
+            finally:
+                await db.close()
+            return
+
+        user_id = _request_user_id(request)
+        db = LazyAsyncSession(
+            primary, functools.partial(self._sessionmaker_for, request, user_id, primary)
+        )
+        try:
+            yield db
+        except (exc.InterfaceError, exc.OperationalError, OSError):
+            replica = self._replica_of(db.session)
+            if replica is not None:
+                # Take the replica out of rotation until a health check passes
+                replica.healthy = False
+            raise
+        else:
+            if db.opened and user_id is not None and request.method not in READ_METHODS:
+                await self.pins.pin(user_id)
+        finally:
+            await db.close()
+
+    def _replica_of(self, session: Optional[AsyncSession]) -> Optional[Replica]:
+        name = session.info.get("replica") if session is not None else None
+        return next((replica for replica in self.replicas if replica.name == name), None)
+
+
+def _request_user_id(request: Request) -> Optional[UUID]:
+    # Imported here: app.core.security depends on app.db.session
+    from app.core.security import user_id_from_token
+
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return user_id_from_token(token)
+    except HTTPException:
+        return None
@@ -1,27 +1,93 @@
 # app/db/session.py
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine.url import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.engine.url import make_url
+from fastapi import Request
 from app.core.config import settings
+from app.core.query_audit import install_query_audit
+from app.core.timing import install_query_timing
+from app.db.lazy import LazySession
+from app.db.pool import configure_pool, engine_options
+from app.db.replicas import PrimaryPins, Replica, ReplicaRouter
 
 # Make the database URL compatible with psycopg2
 db_url = make_url(str(settings.DATABASE_URL))
 db_url = db_url.set(drivername="postgresql+psycopg2")
 
-# Create a synchronous engine
-engine = create_engine(db_url, pool_pre_ping=True)
+
+def async_database_url(url: URL) -> URL:
+    """
+    The asyncpg form of a Postgres URL. asyncpg takes `ssl` rather than
+    libpq's `sslmode` (e.g. `?sslmode=require` from Supabase).
+    """
+    query = dict(url.query)
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return url.set(drivername="postgresql+asyncpg", query=query)
+
+
+# Synchronous engine, for Alembic, scripts and the remaining sync endpoints.
+# Pool size and pre-ping policy come from the DB_POOL_* settings.
+engine = create_engine(db_url, **engine_options())
+
+# Async engine for the request path: async endpoints wait on the database
+# without holding one of the threadpool's worker threads
+async_engine = create_async_engine(async_database_url(db_url), **engine_options(asyncpg=True))
+
+# Optional read replicas for GET requests, named replica0, replica1, ...
+replica_router = ReplicaRouter(
+    [
+        Replica(
+            f"replica{index}",
+            create_async_engine(
+                async_database_url(make_url(str(url))), **engine_options(asyncpg=True)
+            ),
+        )
+        for index, url in enumerate(settings.DATABASE_REPLICA_URLS)
+    ],
+    PrimaryPins(settings.DB_READ_YOUR_WRITES_SECONDS),
+)
+
+# Feed per-request SQL time and statement counts into Server-Timing, and
+# fingerprint statements of audited requests to flag N+1 patterns
+for _name, _engine in (
+    ("sync", engine),
+    ("async", async_engine.sync_engine),
+    *((replica.name, replica.engine.sync_engine) for replica in replica_router.replicas),
+):
+    configure_pool(_engine, _name)
+    install_query_timing(_engine)
+    install_query_audit(_engine)
 
 # Create a sessionmaker
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Attributes are kept after commit: an async session cannot lazily reload
+# them while the response model is being serialised
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 def get_db():
     """
-    Dependency to get a DB session.
+    Dependency to get a DB session, created on first use.
     Ensures the session is always closed after the request.
     """
-    db = SessionLocal()
+    db = LazySession(SessionLocal)
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db(request: Request):
+    """
+    Dependency to get an async DB session, for `async def` endpoints.
+    The session is only opened on first use; GET requests then use a read
+    replica when any are configured.
+    Ensures the session is always closed after the request.
+    """
+    async with replica_router.session(request, AsyncSessionLocal) as db:
+        yield db
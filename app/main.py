@@ -1,12 +1,44 @@
 # app/main.py
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from typing import Optional
+
+from fastapi import FastAPI, Header, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 
+from .core.compression import CompressionMiddleware
 from .core.config import settings
-from .core.middleware import RequestIDMiddleware, SecurityHeadersMiddleware, TimingMiddleware
+from .core.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    REGISTRY,
+    register_pool_metrics,
+    scrape_authorized,
+)
+from .core.middleware import RequestContextMiddleware
 from .api.v1.api import api_router
+from .db.session import async_engine, engine, replica_router
+from .utils.rate_limiter import RateLimitMiddleware, close_rate_limiters, redis_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    health_checks = None
+    if replica_router:
+        health_checks = asyncio.create_task(
+            replica_router.run_health_checks(settings.DB_REPLICA_HEALTH_INTERVAL)
+        )
+    yield
+    if health_checks is not None:
+        health_checks.cancel()
+        with suppress(asyncio.CancelledError):
+            await health_checks
+    await close_rate_limiters()
+    # asyncpg connections belong to the event loop that opened them
+    await async_engine.dispose()
+    for replica in replica_router.replicas:
+        await replica.engine.dispose()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -15,8 +47,14 @@ app = FastAPI(
     docs_url=f"{settings.API_V1_STR}/docs",
     redoc_url=f"{settings.API_V1_STR}/redoc",
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
+# Starlette runs the most recently added middleware first, so rate limiting
+# is registered before CORS: preflights are answered without being charged,
+# and 429 responses still carry CORS headers.
+app.add_middleware(RateLimitMiddleware)
+
 # 1. CORS first—so preflight requests are handled immediately
 app.add_middleware(
     CORSMiddleware,
@@ -27,17 +65,34 @@ app.add_middleware(
     max_age=3600,
 )
 
-# 2. GZip compression
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# 2. Compression: zstd / brotli / gzip by Accept-Encoding; the OpenAPI
+#    document never changes at runtime, so its compressed bytes are cached
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    levels={
+        "zstd": settings.COMPRESSION_ZSTD_LEVEL,
+        "br": settings.COMPRESSION_BROTLI_LEVEL,
+        "gzip": settings.COMPRESSION_GZIP_LEVEL,
+    },
+    immutable_paths=[app.openapi_url],
+)
 
-# 3. Custom middleware
-app.add_middleware(RequestIDMiddleware)
-app.add_middleware(TimingMiddleware)
-app.add_middleware(SecurityHeadersMiddleware)
+# 3. Request ID, timing and security headers in a single pure ASGI layer
+app.add_middleware(RequestContextMiddleware)
 
 # 4. Versioned API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+register_pool_metrics(engine)
+register_pool_metrics(async_engine.sync_engine, name="async")
+for replica in replica_router.replicas:
+    register_pool_metrics(replica.engine.sync_engine, name=replica.name)
+
+if replica_router:
+    # Share read-your-writes pins between workers through Redis
+    replica_router.pins.client = redis_client
+
 
 @app.get("/", tags=["Root"])
 async def root():
@@ -59,5 +114,21 @@ async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(authorization: Optional[str] = Header(None)):
+    """
+    Prometheus scrape endpoint, for requests with the METRICS_TOKEN bearer token.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not scrape_authorized(authorization, settings.METRICS_TOKEN):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 # Explicitly export the ASGI app for Uvicorn / Vercel
 __all__ = ["app"]
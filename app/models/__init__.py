@@ -3,5 +3,7 @@ from .user import User
 from .workout import Workout
 from .exercise import Exercise
 from .exercise_log import ExerciseLog
+from .password_reset_token import PasswordResetToken
+from .personal_record import PersonalRecord
 
-__all__ = ["Base", "User", "Workout", "Exercise", "ExerciseLog"] 
\ No newline at end of file
+__all__ = ["Base", "User", "Workout", "Exercise", "ExerciseLog", "PasswordResetToken", "PersonalRecord"]
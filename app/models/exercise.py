@@ -1,21 +1,31 @@
 from __future__ import annotations
+import datetime
 import uuid
+from typing import Optional
 
 import sqlalchemy as sa
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
 from app.models.exercise_log import ExerciseLog
+from app.utils.ids import uuid7
 
 
 class Exercise(Base):
     __tablename__ = "exercises"
 
-    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid7)
     name: Mapped[str]
     workout_id: Mapped[uuid.UUID] = mapped_column(sa.ForeignKey("workouts.id"))
     user_id: Mapped[uuid.UUID] = mapped_column(sa.ForeignKey("users.id"))
 
+    # Summary of the exercise's logs, kept up to date by the log endpoints
+    # (app.utils.exercise_summary) so listings need no log scans
+    log_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    last_logged_at: Mapped[Optional[datetime.datetime]]
+    best_weight_kg: Mapped[Optional[float]]
+    best_weight_date: Mapped[Optional[datetime.datetime]]
+
     workout: Mapped["Workout"] = relationship(back_populates="exercises")
     logs: Mapped[list["ExerciseLog"]] = relationship(
         back_populates="exercise", cascade="all, delete-orphan"
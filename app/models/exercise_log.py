@@ -2,20 +2,35 @@ from __future__ import annotations
 import uuid
 from typing import Optional
 
-from sqlalchemy import Float, Integer, ForeignKey, Enum, DateTime, func
-from sqlalchemy.orm import relationship, Mapped, mapped_column
+from sqlalchemy import Computed, Float, Index, Integer, ForeignKey, Enum, DateTime, event, func
+from sqlalchemy.orm import declared_attr, relationship, Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID
 
+from app.db.partitions import ensure_partitions
+from app.utils.ids import uuid7
+from app.utils.weight_converter import LBS_PER_KG
 from .base import Base
 from .enums import WeightUnit
 
 class ExerciseLog(Base):
     __tablename__ = "exercise_logs"
+    # Range-partitioned by month of `date` on Postgres (app.db.partitions).
+    # The partition key must be part of the primary key; rows are still
+    # identified by `id` alone.
+    __table_args__ = (
+        Index("ix_exercise_logs_user_exercise_date", "user_id", "exercise_id", "date"),
+        Index("ix_exercise_logs_user_exercise_weight_kg", "user_id", "exercise_id", "weight_kg"),
+        {"postgresql_partition_by": "RANGE (date)"},
+    )
+
+    @declared_attr.directive
+    def __mapper_args__(cls):
+        return {"primary_key": [cls.__table__.c.id]}
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4
+        default=uuid7
     )
     exercise_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -27,6 +42,7 @@ class ExerciseLog(Base):
     )
     date: Mapped[DateTime] = mapped_column(
         DateTime,
+        primary_key=True,
         server_default=func.now()
     )
     weight: Mapped[Optional[float]] = mapped_column(
@@ -41,6 +57,17 @@ class ExerciseLog(Base):
         ),
         nullable=False
     )
+    # `weight` in kg, kept by the database so indexes and aggregates can
+    # compare logs across units
+    weight_kg: Mapped[Optional[float]] = mapped_column(
+        Float,
+        Computed(
+            f"CASE WHEN weight_unit = '{WeightUnit.LBS.value}' "
+            f"THEN weight / {LBS_PER_KG} ELSE weight END",
+            persisted=True
+        ),
+        nullable=True
+    )
     reps: Mapped[Optional[int]] = mapped_column(
         Integer,
         nullable=True
@@ -62,3 +89,11 @@ class ExerciseLog(Base):
     exercise: Mapped["Exercise"] = relationship(
         "Exercise", back_populates="logs"
     )
+
+
+@event.listens_for(ExerciseLog.__table__, "after_create")
+def _create_partitions(target, connection, **kw):
+    # Tables created from the models (tests, reset_database) need partitions
+    # before any row can be inserted
+    if connection.dialect.name == "postgresql":
+        ensure_partitions(connection)
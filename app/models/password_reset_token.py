@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import datetime
+import uuid
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class PasswordResetToken(Base):
+    __tablename__ = "password_reset_tokens"
+
+    # SHA-256 hex digest of the emailed token; the raw token is never stored.
+    token_hash: Mapped[str] = mapped_column(sa.String(64), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        sa.ForeignKey("users.id", ondelete="CASCADE"), index=True
+    )
+    expires_at: Mapped[datetime.datetime] = mapped_column(
+        sa.TIMESTAMP(timezone=True), index=True
+    )
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        sa.TIMESTAMP(timezone=True), server_default=sa.func.now()
+    )
+
+    def __repr__(self) -> str:
+        return f"<PasswordResetToken(user_id={self.user_id}, expires_at={self.expires_at})>"
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import datetime
+import uuid
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+# Tracked rep maxes: the heaviest weight lifted for at least this many reps
+REP_MAXES = (1, 5, 10)
+
+
+class PersonalRecord(Base):
+    __tablename__ = "personal_records"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    exercise_id: Mapped[uuid.UUID] = mapped_column(
+        sa.ForeignKey("exercises.id", ondelete="CASCADE"), primary_key=True
+    )
+    rep_max: Mapped[int] = mapped_column(primary_key=True)
+    weight_kg: Mapped[float]
+    achieved_at: Mapped[datetime.datetime]
+    # No foreign key to exercise_logs (id, date): partition maintenance
+    # moves rows out of the default partition and detaches old months,
+    # which a cascading key would turn into record deletes and a plain one
+    # would block. Deleting a log through the API recalculates the records
+    # it held; the keys above cascade exercise and user deletes.
+    log_id: Mapped[uuid.UUID]
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        server_default=sa.func.now(), onupdate=sa.func.now()
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<PersonalRecord(exercise_id={self.exercise_id}, rep_max={self.rep_max}, "
+            f"weight_kg={self.weight_kg})>"
+        )
@@ -3,17 +3,17 @@ from __future__ import annotations
 import datetime
 import uuid
 
-import sqlalchemy as sa
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
 from app.models.enums import UserRole, Gender
+from app.utils.ids import uuid7
 
 
 class User(Base):
     __tablename__ = "users"
 
-    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid7)
     email: Mapped[str] = mapped_column(unique=True, index=True)
     password: Mapped[str]
     first_name: Mapped[str]
@@ -23,10 +23,6 @@ class User(Base):
     role: Mapped[UserRole] = mapped_column(default=UserRole.USER)
     is_verified: Mapped[bool] = mapped_column(default=False)
     verification_token: Mapped[str | None]
-    reset_token: Mapped[str | None]
-    reset_token_expires: Mapped[datetime.datetime | None] = mapped_column(
-        sa.TIMESTAMP(timezone=True)
-    )
 
     workouts: Mapped[list["Workout"]] = relationship(
         back_populates="user", cascade="all, delete-orphan"
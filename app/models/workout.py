@@ -7,12 +7,13 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
 from app.models.exercise import Exercise
+from app.utils.ids import uuid7
 
 
 class Workout(Base):
     __tablename__ = "workouts"
 
-    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid7)
     name: Mapped[str]
     user_id: Mapped[uuid.UUID] = mapped_column(sa.ForeignKey("users.id"))
     user: Mapped["User"] = relationship(back_populates="workouts")
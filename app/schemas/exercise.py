@@ -1,4 +1,5 @@
 from pydantic import BaseModel, field_validator, ConfigDict
+from datetime import datetime
 from typing import Optional
 import uuid
 
@@ -25,7 +26,10 @@ class ExerciseInDBBase(ExerciseBase):
     model_config = ConfigDict(from_attributes=True)
 
 class Exercise(ExerciseInDBBase):
-    pass
+    log_count: int = 0
+    last_logged_at: Optional[datetime] = None
+    best_weight_kg: Optional[float] = None
+    best_weight_date: Optional[datetime] = None
 
 class ExerciseInDB(ExerciseInDBBase):
     pass
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 from datetime import datetime, date as date_type
 from ..schemas.weight_unit import WeightUnit
@@ -44,3 +44,12 @@ class ExerciseLogRead(ExerciseLogBase):
 
     # BaseModel.Config is deprecated in Pydantic v2; use model_config
     model_config = ConfigDict(from_attributes=True, use_enum_values=True)
+
+
+class ExerciseLogCreated(ExerciseLogRead):
+    """
+    A newly created ExerciseLog, with the personal records it now holds.
+    A log that ties a record only takes it if it is dated earlier.
+    """
+    new_pr: bool = False
+    new_records: List[int] = Field(default_factory=list, description="Rep maxes (1, 5, 10) the log now holds the record for")
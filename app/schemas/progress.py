@@ -1,6 +1,6 @@
 from pydantic import BaseModel, model_validator, ConfigDict
 from typing import Optional, List
-from datetime import date
+from datetime import date, datetime
 from enum import Enum
 from uuid import UUID
 
@@ -8,13 +8,16 @@ from .weight_unit import WeightUnit
 
 class ChartDataPoint(BaseModel):
     """
-    Single data point for exercise charting.
+    Single data point for exercise charting. `value` is the point on the
+    requested metric's series; for metrics other than weight, each point is
+    a session and `reps`/`sets` are its totals.
     """
     date: date
     weight: float
     weight_unit: WeightUnit
     reps: int
     sets: int
+    value: Optional[float] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -25,6 +28,20 @@ class DateRangePreset(str, Enum):
     LAST_12_MONTHS = "last_12_months"
     CUSTOM = "custom"
 
+class ProgressMetric(str, Enum):
+    """Series a progress response charts and trends."""
+    WEIGHT = "weight"
+    E1RM_EPLEY = "e1rm_epley"
+    E1RM_BRZYCKI = "e1rm_brzycki"
+    TONNAGE = "tonnage"
+    INTENSITY = "intensity"
+
+class TrendMethod(str, Enum):
+    """Estimator of the trend slope (see app.utils.trend)."""
+    OLS = "ols"
+    THEIL_SEN = "theil_sen"
+    HUBER = "huber"
+
 class WeeklyProgressMetrics(BaseModel):
     """Metrics for weekly weight-lifting progress."""
     start_weight: Optional[float] = None
@@ -41,11 +58,24 @@ class ExerciseProgress(BaseModel):
     personal_best: Optional[float] = None
     personal_best_date: Optional[date] = None
     trend: Optional[float] = None
+    trend_method: TrendMethod = TrendMethod.OLS
+    trend_ci_low: Optional[float] = None
+    trend_ci_high: Optional[float] = None
     weekly_progress: Optional[WeeklyProgressMetrics] = None
     target_unit: WeightUnit
+    metric: ProgressMetric = ProgressMetric.WEIGHT
 
     model_config = ConfigDict(from_attributes=True)
 
+class PersonalRecordRead(BaseModel):
+    """The heaviest weight lifted for at least `rep_max` reps of an exercise."""
+    exercise_id: UUID
+    rep_max: int
+    weight: float
+    weight_unit: WeightUnit
+    achieved_at: datetime
+    log_id: UUID
+
 class ProgressQueryParams(BaseModel):
     """
     Query parameters for retrieving exercise progress.
@@ -57,6 +87,8 @@ class ProgressQueryParams(BaseModel):
     include_personal_best: bool = True
     date_range_preset: Optional[DateRangePreset] = None
     include_weekly_progress: bool = True
+    metric: ProgressMetric = ProgressMetric.WEIGHT
+    trend_method: TrendMethod = TrendMethod.OLS
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -0,0 +1,168 @@
+# app/utils/exercise_summary.py
+"""
+Per-exercise summary columns (`log_count`, `last_logged_at`,
+`best_weight_kg`, `best_weight_date`), maintained in the same transaction as
+the log writes that change them.
+
+Adding a log updates the summary in place with a single UPDATE. Deleting a
+log only decrements the count, unless that log was the latest or the best,
+and editing a log recalculates the summary from the exercise's logs. Each
+of these statements uses the (user_id, exercise_id, ...) indexes. Use
+`scripts/check_exercise_summaries.py` to find and repair drift, e.g. after
+bulk imports that bypass the API.
+
+The best weight is the heaviest `weight_kg`. Ties go to the earliest log.
+"""
+from datetime import date, datetime, time
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import (
+    DateTime,
+    Float,
+    and_,
+    bindparam,
+    case,
+    func,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.exercise import Exercise
+from app.models.exercise_log import ExerciseLog
+from app.utils.weight_converter import to_kg
+
+_logged_at = bindparam("logged_at", type_=DateTime)
+_weight_kg = bindparam("weight_kg", type_=Float)
+
+_is_new_best = and_(
+    _weight_kg.is_not(None),
+    or_(
+        Exercise.best_weight_kg.is_(None),
+        _weight_kg > Exercise.best_weight_kg,
+        and_(_weight_kg == Exercise.best_weight_kg, _logged_at < Exercise.best_weight_date),
+    ),
+)
+
+# Fold one new log into the summary
+LOG_ADDED = (
+    update(Exercise)
+    .where(Exercise.id == bindparam("exercise_id"))
+    .values(
+        log_count=Exercise.log_count + 1,
+        last_logged_at=case(
+            (or_(Exercise.last_logged_at.is_(None), _logged_at > Exercise.last_logged_at), _logged_at),
+            else_=Exercise.last_logged_at,
+        ),
+        best_weight_kg=case((_is_new_best, _weight_kg), else_=Exercise.best_weight_kg),
+        best_weight_date=case((_is_new_best, _logged_at), else_=Exercise.best_weight_date),
+    )
+    .execution_options(synchronize_session=False)
+)
+
+# Remove one log from the count, if it was neither the latest nor the best;
+# otherwise no row matches and the summary must be recalculated
+LOG_REMOVED = (
+    update(Exercise)
+    .where(
+        Exercise.id == bindparam("exercise_id"),
+        Exercise.last_logged_at > _logged_at,
+        or_(_weight_kg.is_(None), Exercise.best_weight_kg > _weight_kg),
+    )
+    .values(log_count=Exercise.log_count - 1)
+    .execution_options(synchronize_session=False)
+)
+
+
+def _logs_of_exercise():
+    return and_(ExerciseLog.user_id == Exercise.user_id, ExerciseLog.exercise_id == Exercise.id)
+
+
+def _best_log():
+    return (
+        select(ExerciseLog.weight_kg, ExerciseLog.date)
+        .where(_logs_of_exercise(), ExerciseLog.weight_kg.is_not(None))
+        .order_by(ExerciseLog.weight_kg.desc(), ExerciseLog.date.asc())
+        .limit(1)
+    )
+
+
+def summary_columns():
+    """The summary of each Exercise row, computed from its logs as correlated subqueries."""
+    logs = _logs_of_exercise()
+    best = _best_log()
+    return {
+        "log_count": select(func.count()).where(logs).scalar_subquery(),
+        "last_logged_at": select(func.max(ExerciseLog.date)).where(logs).scalar_subquery(),
+        "best_weight_kg": best.with_only_columns(ExerciseLog.weight_kg).scalar_subquery(),
+        "best_weight_date": best.with_only_columns(ExerciseLog.date).scalar_subquery(),
+    }
+
+
+def recalculate(*where):
+    """An UPDATE resetting the summary of the matching exercises from their logs."""
+    return (
+        update(Exercise)
+        .where(*where)
+        .values(**summary_columns())
+        .execution_options(synchronize_session=False)
+    )
+
+
+RECALCULATE = recalculate(Exercise.id == bindparam("exercise_id"))
+
+
+def as_datetime(value: date) -> datetime:
+    """A log date as stored: dates are midnight."""
+    return value if isinstance(value, datetime) else datetime.combine(value, time.min)
+
+
+def _summary_params(log: ExerciseLog) -> dict:
+    return {
+        "exercise_id": log.exercise_id,
+        "logged_at": as_datetime(log.date),
+        "weight_kg": to_kg(log.weight, log.weight_unit),
+    }
+
+
+async def log_added(db: AsyncSession, log: ExerciseLog) -> None:
+    """Count a new log in its exercise's summary. The caller commits."""
+    await db.execute(LOG_ADDED, _summary_params(log))
+
+
+async def log_changed(db: AsyncSession, exercise_id: UUID) -> None:
+    """Recalculate a summary after one of its logs was edited. The caller commits."""
+    await db.flush()
+    await db.execute(RECALCULATE, {"exercise_id": exercise_id})
+
+
+async def log_removed(db: AsyncSession, log: ExerciseLog) -> None:
+    """
+    Take a deleted log out of its exercise's summary, recalculating it if
+    the log was the latest or the best. Call after `db.delete(log)`; the
+    caller commits.
+    """
+    params = _summary_params(log)
+    await db.flush()
+    if (await db.execute(LOG_REMOVED, params)).rowcount == 0:
+        await db.execute(RECALCULATE, {"exercise_id": params["exercise_id"]})
+
+
+def find_drifted_summaries(db: Session, repair: bool = False) -> List[UUID]:
+    """
+    Return the ids of exercises whose stored summary differs from their logs,
+    and with `repair`, recalculate those summaries and commit.
+    """
+    drifted = or_(*(
+        getattr(Exercise, column).is_distinct_from(expected)
+        for column, expected in summary_columns().items()
+    ))
+    ids = list(db.scalars(select(Exercise.id).where(drifted)))
+    if repair and ids:
+        db.execute(recalculate(Exercise.id.in_(ids)))
+        db.commit()
+    return ids
+
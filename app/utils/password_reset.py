@@ -0,0 +1,66 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.models.password_reset_token import PasswordResetToken
+
+# How long an emailed reset link stays valid
+RESET_TOKEN_TTL = timedelta(hours=1)
+
+
+def hash_reset_token(token: str) -> str:
+    """Return the SHA-256 hex digest under which a reset token is stored."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def issue_reset_token(db: Session, user_id: UUID) -> str:
+    """
+    Create a new reset token for the user and return the raw value to email.
+    Any previously issued tokens for the user are invalidated.
+    The caller is responsible for committing the session.
+    """
+    token = secrets.token_urlsafe(32)
+    db.execute(delete(PasswordResetToken).where(PasswordResetToken.user_id == user_id))
+    db.add(
+        PasswordResetToken(
+            token_hash=hash_reset_token(token),
+            user_id=user_id,
+            expires_at=datetime.now(timezone.utc) + RESET_TOKEN_TTL,
+        )
+    )
+    return token
+
+
+def consume_reset_token(db: Session, token: str) -> Optional[UUID]:
+    """
+    Look up and delete an unexpired reset token in a single statement.
+    Returns the owning user's ID, or None if the token is unknown or expired.
+    The caller is responsible for committing the session.
+    """
+    stmt = (
+        delete(PasswordResetToken)
+        .where(
+            PasswordResetToken.token_hash == hash_reset_token(token),
+            PasswordResetToken.expires_at > datetime.now(timezone.utc),
+        )
+        .returning(PasswordResetToken.user_id)
+    )
+    return db.execute(stmt).scalar_one_or_none()
+
+
+def purge_expired_reset_tokens(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Bulk-delete every expired reset token, commit, and return the number removed.
+    Intended to be run periodically (see scripts/purge_reset_tokens.py).
+    """
+    cutoff = now or datetime.now(timezone.utc)
+    result = db.execute(
+        delete(PasswordResetToken).where(PasswordResetToken.expires_at <= cutoff)
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,141 @@
+# app/utils/personal_records.py
+"""
+Personal records per (user, exercise, rep max): the heaviest `weight_kg`
+lifted for at least 1, 5 and 10 reps (`REP_MAXES`), kept in the
+`personal_records` table so reading them never scans the logs.
+
+A record is held by the earliest log, by `date`, with the heaviest
+weight; logs on the same date go to the first one created. Adding a log
+upserts one row per rep max it qualifies for and only replaces a record
+the log now holds: one it beats, or one it ties from an earlier date (a
+backdated log). So the statement returns exactly the records the log
+took. Deleting a log that holds a record recalculates that exercise's
+records from its indexed logs, and so does editing a log's weight, reps
+or date, since the edit may also set a record.
+
+`log_id` has no foreign key (see `PersonalRecord`). Records of a deleted
+exercise or user are removed by the cascading foreign keys on
+`exercise_id` and `user_id`.
+"""
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import Integer, and_, bindparam, delete, exists, func, insert, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.exercise_log import ExerciseLog
+from app.models.personal_record import REP_MAXES, PersonalRecord
+from app.utils.exercise_summary import as_datetime
+from app.utils.weight_converter import to_kg
+
+_RECORD_COLUMNS = ["user_id", "exercise_id", "rep_max", "weight_kg", "achieved_at", "log_id"]
+
+
+def _upsert(dialect) -> object:
+    stmt = dialect.insert(PersonalRecord.__table__)
+    record = PersonalRecord.__table__.c
+    return stmt.on_conflict_do_update(
+        index_elements=["user_id", "exercise_id", "rep_max"],
+        set_={
+            "weight_kg": stmt.excluded.weight_kg,
+            "achieved_at": stmt.excluded.achieved_at,
+            "log_id": stmt.excluded.log_id,
+            "updated_at": func.now(),
+        },
+        where=or_(
+            record.weight_kg < stmt.excluded.weight_kg,
+            and_(
+                record.weight_kg == stmt.excluded.weight_kg,
+                stmt.excluded.achieved_at < record.achieved_at,
+            ),
+        ),
+    ).returning(record.rep_max)
+
+
+# Insert, beat or backdate a tied record; returns the rep max only if the row was written
+RECORD_UPSERTS = {"postgresql": _upsert(postgresql), "sqlite": _upsert(sqlite)}
+
+_rep_max = bindparam("rep_max", type_=Integer)
+
+# Rebuild one rep max of an exercise from its best qualifying log
+RECALCULATE_RECORD = insert(PersonalRecord.__table__).from_select(
+    _RECORD_COLUMNS,
+    select(
+        ExerciseLog.user_id,
+        ExerciseLog.exercise_id,
+        _rep_max,
+        ExerciseLog.weight_kg,
+        ExerciseLog.date,
+        ExerciseLog.id,
+    )
+    .where(
+        ExerciseLog.user_id == bindparam("user_id"),
+        ExerciseLog.exercise_id == bindparam("exercise_id"),
+        ExerciseLog.weight_kg.is_not(None),
+        ExerciseLog.reps >= _rep_max,
+    )
+    .order_by(ExerciseLog.weight_kg.desc(), ExerciseLog.date.asc(), ExerciseLog.id.asc())
+    .limit(1),
+)
+
+CLEAR_RECORDS = delete(PersonalRecord).where(
+    PersonalRecord.user_id == bindparam("user_id"),
+    PersonalRecord.exercise_id == bindparam("exercise_id"),
+)
+
+HOLDS_RECORD = select(
+    exists().where(
+        PersonalRecord.user_id == bindparam("user_id"),
+        PersonalRecord.exercise_id == bindparam("exercise_id"),
+        PersonalRecord.log_id == bindparam("log_id"),
+    )
+)
+
+
+async def record_added(db: AsyncSession, log: ExerciseLog) -> List[int]:
+    """
+    Fold a new log into its exercise's records and return the rep maxes it
+    now holds, e.g. `[1, 5]`. The first weighted log of an exercise sets
+    every rep max it qualifies for. A tie only counts if it is dated before
+    the current record. Flushes the log; the caller commits.
+    """
+    if log.weight is None or not log.reps:
+        return []
+    await db.flush()
+    weight_kg = to_kg(log.weight, log.weight_unit)
+    achieved_at = as_datetime(log.date)
+    rows = [
+        {
+            "user_id": log.user_id,
+            "exercise_id": log.exercise_id,
+            "rep_max": rep_max,
+            "weight_kg": weight_kg,
+            "achieved_at": achieved_at,
+            "log_id": log.id,
+        }
+        for rep_max in REP_MAXES
+        if log.reps >= rep_max
+    ]
+    upsert = RECORD_UPSERTS[db.get_bind().dialect.name]
+    return sorted(await db.scalars(upsert.values(rows)))
+
+
+async def records_changed(db: AsyncSession, user_id: UUID, exercise_id: UUID) -> None:
+    """Recalculate an exercise's records from its logs. The caller commits."""
+    await db.flush()
+    params = {"user_id": user_id, "exercise_id": exercise_id}
+    await db.execute(CLEAR_RECORDS, params)
+    for rep_max in REP_MAXES:
+        await db.execute(RECALCULATE_RECORD, {**params, "rep_max": rep_max})
+
+
+async def record_removed(db: AsyncSession, log: ExerciseLog) -> None:
+    """
+    Recalculate an exercise's records if a deleted log held one of them.
+    Call after `db.delete(log)`; the caller commits.
+    """
+    await db.flush()
+    params = {"user_id": log.user_id, "exercise_id": log.exercise_id}
+    if await db.scalar(HOLDS_RECORD, {**params, "log_id": log.id}):
+        await records_changed(db, **params)
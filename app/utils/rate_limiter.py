@@ -1,78 +1,633 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
 from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
+import asyncio
+import logging
+import math
 import time
-import redis
+import redis.asyncio as redis
+from redis.exceptions import RedisError
 import os
+from typing import Any, Callable, Sequence
 from dotenv import load_dotenv
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import RATE_LIMIT_REJECTIONS
+from app.core.security import decode_access_token
 
 load_dotenv()
 
-# Initialize Redis client
-redis_client = redis.Redis(
+logger = logging.getLogger(__name__)
+
+# Shared non-blocking connection pool for every limiter in this process
+redis_pool = redis.ConnectionPool(
     host=os.getenv("REDIS_HOST", "localhost"),
     port=int(os.getenv("REDIS_PORT", 6379)),
     db=0,
-    decode_responses=True
+    decode_responses=True,
+    max_connections=int(os.getenv("REDIS_MAX_CONNECTIONS", 50)),
 )
 
-class RateLimiter:
+# Initialize Redis client
+redis_client = redis.Redis(connection_pool=redis_pool)
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Outcome of a single rate limit check."""
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float
+    retry_after: float = 0.0
+    detail: str = "Too many requests"
+
+    def headers(self) -> dict[str, str]:
+        """Standard X-RateLimit-* headers, plus Retry-After when rejected."""
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(max(self.remaining, 0)),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(math.ceil(self.retry_after), 1))
+        return headers
+
+
+class RateLimitAlgorithm(ABC):
+    """
+    A rate limiting algorithm evaluated atomically inside Redis.
+
+    Each algorithm supplies a Lua `script`, builds the KEYS/ARGV for one
+    check, and turns the script's reply into a RateLimitResult. Keeping the
+    algorithm free of I/O lets RateLimiter own the connection and makes the
+    maths testable without a server.
+    """
+
+    name: str
+    script: str
+
+    @abstractmethod
+    def build_call(self, identity: str, now: float, cost: int) -> tuple[list[str], list[Any]]:
+        """Return the (keys, args) to run the script with."""
+
+    @abstractmethod
+    def parse_result(self, raw: Sequence[Any], now: float, cost: int) -> RateLimitResult:
+        """Convert the script's reply into a RateLimitResult."""
+
+
+class FixedWindowAlgorithm(RateLimitAlgorithm):
+    """
+    Per-minute, per-hour and per-day counters in aligned buckets.
+    Three keys per client; allows up to 2x bursts across window edges.
+    """
+
+    name = "fixed_window"
+
+    # Increment every window counter and set its TTL on first use.
+    # KEYS[i] is the counter for window i and ARGV[i] its length in seconds.
+    script = """
+local counts = {}
+for i, key in ipairs(KEYS) do
+    local count = redis.call('INCRBY', key, ARGV[#ARGV])
+    if count == tonumber(ARGV[#ARGV]) then
+        redis.call('EXPIRE', key, ARGV[i])
+    end
+    counts[i] = count
+end
+return counts
+"""
+
     def __init__(
         self,
         requests_per_minute: int = 60,
         requests_per_hour: int = 1000,
-        requests_per_day: int = 10000
+        requests_per_day: int = 10000,
     ):
-        self.requests_per_minute = requests_per_minute
-        self.requests_per_hour = requests_per_hour
-        self.requests_per_day = requests_per_day
-
-    async def check_rate_limit(self, request: Request) -> None:
-        client_ip = request.client.host
-        current_time = int(time.time())
-        
-        # Create keys for different time windows
-        minute_key = f"rate_limit:{client_ip}:minute:{current_time // 60}"
-        hour_key = f"rate_limit:{client_ip}:hour:{current_time // 3600}"
-        day_key = f"rate_limit:{client_ip}:day:{current_time // 86400}"
-
-        # Check and increment counters
-        minute_count = redis_client.incr(minute_key)
-        hour_count = redis_client.incr(hour_key)
-        day_count = redis_client.incr(day_key)
-
-        # Set expiration for keys
-        redis_client.expire(minute_key, 60)
-        redis_client.expire(hour_key, 3600)
-        redis_client.expire(day_key, 86400)
-
-        # Check limits
-        if minute_count > self.requests_per_minute:
-            raise HTTPException(
-                status_code=429,
-                detail="Too many requests per minute"
+        # (window name, window length in seconds, limit)
+        self.windows = (
+            ("minute", 60, requests_per_minute),
+            ("hour", 3600, requests_per_hour),
+            ("day", 86400, requests_per_day),
+        )
+
+    def build_call(self, identity: str, now: float, cost: int) -> tuple[list[str], list[Any]]:
+        current_time = int(now)
+        keys = [
+            f"rate_limit:{identity}:{name}:{current_time // seconds}"
+            for name, seconds, _ in self.windows
+        ]
+        return keys, [seconds for _, seconds, _ in self.windows] + [cost]
+
+    def parse_result(self, raw: Sequence[Any], now: float, cost: int) -> RateLimitResult:
+        results = []
+        for (name, seconds, limit), count in zip(self.windows, raw):
+            reset_after = seconds - (now % seconds)
+            results.append(
+                RateLimitResult(
+                    allowed=int(count) <= limit,
+                    limit=limit,
+                    remaining=limit - int(count),
+                    reset_after=reset_after,
+                    retry_after=reset_after,
+                    detail=f"Too many requests per {name}",
+                )
             )
-        if hour_count > self.requests_per_hour:
+        # Report the first exceeded window, otherwise the tightest one
+        for result in results:
+            if not result.allowed:
+                return result
+        return min(results, key=lambda r: r.remaining)
+
+
+class GCRAAlgorithm(RateLimitAlgorithm):
+    """
+    Generic Cell Rate Algorithm: a single key holding the client's
+    theoretical arrival time (TAT). O(1) state, no window-edge bursts.
+    """
+
+    name = "gcra"
+
+    # KEYS[1]: TAT key. ARGV: now (ms), emission interval (ms),
+    # burst tolerance (ms), cost. Returns {allowed, tat_after_ms}.
+    script = """
+local now = tonumber(ARGV[1])
+local emission = tonumber(ARGV[2])
+local tolerance = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local new_tat = tat + emission * cost
+if new_tat - tolerance > now then
+    return {0, string.format('%.3f', tat)}
+end
+local stored = string.format('%.3f', new_tat)
+redis.call('SET', KEYS[1], stored, 'PX', math.max(math.ceil(new_tat - now), 1))
+return {1, stored}
+"""
+
+    def __init__(self, limit: int = 60, period: float = 60.0):
+        self.limit = limit
+        self.period = period
+        self.emission_ms = period * 1000 / limit
+        # Allow the whole quota to be used back-to-back from idle
+        self.tolerance_ms = self.emission_ms * limit
+
+    def build_call(self, identity: str, now: float, cost: int) -> tuple[list[str], list[Any]]:
+        return (
+            [f"rate_limit:gcra:{identity}"],
+            [now * 1000, self.emission_ms, self.tolerance_ms, cost],
+        )
+
+    def parse_result(self, raw: Sequence[Any], now: float, cost: int) -> RateLimitResult:
+        allowed, tat_ms = int(raw[0]), float(raw[1])
+        now_ms = now * 1000
+        # Capacity left before the TAT would pass the burst tolerance
+        headroom_ms = now_ms + self.tolerance_ms - tat_ms
+        retry_after = 0.0
+        if not allowed:
+            retry_after = (tat_ms + self.emission_ms * cost - self.tolerance_ms - now_ms) / 1000
+        return RateLimitResult(
+            allowed=bool(allowed),
+            limit=self.limit,
+            remaining=int(headroom_ms // self.emission_ms),
+            reset_after=max(tat_ms - now_ms, 0) / 1000,
+            retry_after=retry_after,
+            detail="Too many requests",
+        )
+
+
+class SlidingWindowCounterAlgorithm(RateLimitAlgorithm):
+    """
+    Sliding window counter: weights the previous window's count by how
+    much of it still overlaps the sliding window. Two small keys per
+    client and a smooth limit without per-request logs.
+    """
+
+    name = "sliding_window"
+
+    # KEYS: current and previous window counters. ARGV: previous window
+    # weight, limit, cost, counter TTL. Returns {allowed, current, previous}.
+    script = """
+local weight = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local current = tonumber(redis.call('GET', KEYS[1])) or 0
+local previous = tonumber(redis.call('GET', KEYS[2])) or 0
+if previous * weight + current + cost > limit then
+    return {0, current, previous}
+end
+current = redis.call('INCRBY', KEYS[1], cost)
+if current == cost then
+    redis.call('EXPIRE', KEYS[1], ARGV[4])
+end
+return {1, current, previous}
+"""
+
+    def __init__(self, limit: int = 60, window: int = 60):
+        self.limit = limit
+        self.window = window
+
+    def _position(self, now: float) -> tuple[int, float]:
+        bucket = int(now // self.window)
+        elapsed = now - bucket * self.window
+        return bucket, elapsed
+
+    def build_call(self, identity: str, now: float, cost: int) -> tuple[list[str], list[Any]]:
+        bucket, elapsed = self._position(now)
+        weight = 1 - elapsed / self.window
+        keys = [
+            f"rate_limit:sliding:{identity}:{bucket}",
+            f"rate_limit:sliding:{identity}:{bucket - 1}",
+        ]
+        # Each counter must outlive the window after its own
+        return keys, [weight, self.limit, cost, self.window * 2]
+
+    def parse_result(self, raw: Sequence[Any], now: float, cost: int) -> RateLimitResult:
+        allowed, current, previous = int(raw[0]), int(raw[1]), int(raw[2])
+        _, elapsed = self._position(now)
+        weight = 1 - elapsed / self.window
+        estimate = previous * weight + current
+        until_window_end = self.window - elapsed
+        retry_after = 0.0
+        if not allowed:
+            excess = estimate + cost - self.limit
+            # The previous window's share decays linearly to zero by window end
+            decay_per_second = previous / self.window
+            retry_after = until_window_end
+            if decay_per_second > 0:
+                retry_after = min(excess / decay_per_second, until_window_end)
+        return RateLimitResult(
+            allowed=bool(allowed),
+            limit=self.limit,
+            remaining=int(math.floor(self.limit - estimate)),
+            reset_after=until_window_end,
+            retry_after=retry_after,
+            detail="Too many requests",
+        )
+
+
+def build_algorithm(
+    name: str,
+    requests_per_minute: int = 60,
+    requests_per_hour: int = 1000,
+    requests_per_day: int = 10000,
+) -> RateLimitAlgorithm:
+    """
+    Build an algorithm by name. GCRA and the sliding window enforce the
+    per-minute rate; only the fixed window also tracks hourly and daily caps.
+    """
+    if name == FixedWindowAlgorithm.name:
+        return FixedWindowAlgorithm(requests_per_minute, requests_per_hour, requests_per_day)
+    if name == GCRAAlgorithm.name:
+        return GCRAAlgorithm(limit=requests_per_minute, period=60)
+    if name == SlidingWindowCounterAlgorithm.name:
+        return SlidingWindowCounterAlgorithm(limit=requests_per_minute, window=60)
+    raise ValueError(f"Unknown rate limit algorithm: {name}")
+
+
+class BaseRateLimiter(ABC):
+    """Common request-level behaviour shared by all limiters."""
+
+    @abstractmethod
+    async def hit(self, identity: str, cost: int = 1) -> RateLimitResult:
+        """Consume `cost` units for `identity` and return the outcome."""
+
+    async def check_rate_limit(
+        self, request: Request, identity: str | None = None, cost: int = 1
+    ) -> RateLimitResult:
+        result = await self.hit(identity or request.client.host, cost)
+        if not result.allowed:
+            # Identities are namespaced as "<scope>:<caller>"
+            RATE_LIMIT_REJECTIONS.inc((identity.partition(":")[0] if identity else "default",))
             raise HTTPException(
                 status_code=429,
-                detail="Too many requests per hour"
+                detail=result.detail,
+                headers=result.headers(),
             )
-        if day_count > self.requests_per_day:
-            raise HTTPException(
-                status_code=429,
-                detail="Too many requests per day"
+        return result
+
+
+class RateLimiter(BaseRateLimiter):
+    """Authoritative limiter: one atomic Redis script call per check."""
+
+    def __init__(
+        self,
+        requests_per_minute: int = 60,
+        requests_per_hour: int = 1000,
+        requests_per_day: int = 10000,
+        client: redis.Redis | None = None,
+        algorithm: RateLimitAlgorithm | str = FixedWindowAlgorithm.name,
+        clock: Callable[[], float] = time.time,
+    ):
+        if isinstance(algorithm, str):
+            algorithm = build_algorithm(
+                algorithm, requests_per_minute, requests_per_hour, requests_per_day
+            )
+        self.algorithm = algorithm
+        self.redis = client if client is not None else redis_client
+        self.clock = clock
+        # EVALSHA with transparent EVAL fallback: one round trip per check
+        self._script = self.redis.register_script(algorithm.script)
+
+    async def hit(self, identity: str, cost: int = 1) -> RateLimitResult:
+        now = self.clock()
+        keys, args = self.algorithm.build_call(identity, now, cost)
+        raw = await self._script(keys=keys, args=args)
+        return self.algorithm.parse_result(raw, now, cost)
+
+
+class _TokenBucket:
+    """Per-identity local state; __slots__ keeps each entry to a few words."""
+
+    __slots__ = ("tokens", "updated_at", "pending", "window", "seen_global")
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated_at = now
+        # Units consumed locally and not yet pushed to Redis
+        self.pending = 0
+        # Redis window index and global count last observed for it
+        self.window = -1
+        self.seen_global = 0
+
+
+class HybridRateLimiter(BaseRateLimiter):
+    """
+    Two-tier limiter: every check is decided from an in-process token bucket,
+    and a background task periodically pushes locally consumed units to a
+    shared per-window counter in Redis. Consumption by other workers learned
+    from that sync is deducted from the local bucket, so the global limit is
+    enforced to within one sync interval. If Redis is unreachable the local
+    tier keeps enforcing on its own (fail open for the global view).
+    """
+
+    def __init__(
+        self,
+        limit: int = 60,
+        period: float = 60.0,
+        client: redis.Redis | None = None,
+        sync_interval: float = 1.0,
+        max_keys: int = 100_000,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.limit = limit
+        self.period = period
+        self.rate = limit / period
+        self.redis = client if client is not None else redis_client
+        self.sync_interval = sync_interval
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: OrderedDict[str, _TokenBucket] = OrderedDict()
+        # Unsynced consumption of buckets evicted from the LRU
+        self._orphaned: dict[str, int] = {}
+        self._task: asyncio.Task | None = None
+
+    def _bucket(self, identity: str, now: float) -> _TokenBucket:
+        bucket = self._buckets.get(identity)
+        if bucket is None:
+            bucket = self._buckets[identity] = _TokenBucket(self.limit, now)
+            if len(self._buckets) > self.max_keys:
+                evicted_identity, evicted = self._buckets.popitem(last=False)
+                if evicted.pending:
+                    self._orphaned[evicted_identity] = (
+                        self._orphaned.get(evicted_identity, 0) + evicted.pending
+                    )
+        else:
+            self._buckets.move_to_end(identity)
+            bucket.tokens = min(self.limit, bucket.tokens + (now - bucket.updated_at) * self.rate)
+            bucket.updated_at = now
+        return bucket
+
+    async def hit(self, identity: str, cost: int = 1) -> RateLimitResult:
+        self._ensure_sync_task()
+        now = self.clock()
+        bucket = self._bucket(identity, now)
+        allowed = bucket.tokens >= cost
+        if allowed:
+            bucket.tokens -= cost
+            bucket.pending += cost
+        return RateLimitResult(
+            allowed=allowed,
+            limit=self.limit,
+            remaining=int(bucket.tokens),
+            reset_after=(self.limit - bucket.tokens) / self.rate,
+            retry_after=0.0 if allowed else (cost - bucket.tokens) / self.rate,
+            detail="Too many requests",
+        )
+
+    def _key(self, identity: str, window: int) -> str:
+        return f"rate_limit:hybrid:{identity}:{window}"
+
+    async def sync(self) -> None:
+        """Push pending consumption to Redis and fold in other workers' usage."""
+        window = int(self.clock() // self.period)
+        pending = [(identity, b, b.pending) for identity, b in self._buckets.items() if b.pending]
+        orphaned, self._orphaned = self._orphaned, {}
+        if not pending and not orphaned:
+            return
+
+        ttl = int(self.period * 2)
+        pipe = self.redis.pipeline(transaction=False)
+        for identity, _, used in pending:
+            pipe.incrby(self._key(identity, window), used)
+            pipe.expire(self._key(identity, window), ttl)
+        for identity, used in orphaned.items():
+            pipe.incrby(self._key(identity, window), used)
+            pipe.expire(self._key(identity, window), ttl)
+        try:
+            replies = await pipe.execute()
+        except (RedisError, OSError) as exc:
+            # Keep the consumption for the next attempt; local limits still apply
+            for identity, used in orphaned.items():
+                self._orphaned[identity] = self._orphaned.get(identity, 0) + used
+            logger.warning("Rate limiter sync failed, enforcing locally: %s", exc)
+            return
+
+        for (identity, bucket, used), total in zip(pending, replies[0::2]):
+            bucket.pending -= used
+            previous = bucket.seen_global if bucket.window == window else 0
+            # Everything added to the shared counter since we last looked,
+            # other than our own contribution, came from other workers
+            others = int(total) - previous - used
+            if others > 0:
+                bucket.tokens -= others
+            bucket.window = window
+            bucket.seen_global = int(total)
+
+    async def _sync_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception:
+                logger.exception("Unexpected error in rate limiter sync")
+
+    def _ensure_sync_task(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._sync_loop())
+
+    async def stop(self) -> None:
+        """Cancel the background task and flush outstanding consumption."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, RuntimeError):
+                pass
+            self._task = None
+        await self.sync()
+
+
+def build_rate_limiter(backend: str, requests_per_minute: int = 60) -> BaseRateLimiter:
+    """Build a process-wide limiter for RATE_LIMIT_BACKEND ("hybrid" or "redis")."""
+    if backend == "hybrid":
+        return HybridRateLimiter(
+            limit=requests_per_minute,
+            period=60,
+            sync_interval=float(os.getenv("RATE_LIMIT_SYNC_INTERVAL", 1.0)),
+        )
+    if backend == "redis":
+        return RateLimiter(
+            requests_per_minute=requests_per_minute,
+            algorithm=os.getenv("RATE_LIMIT_ALGORITHM", FixedWindowAlgorithm.name),
+        )
+    raise ValueError(f"Unknown rate limit backend: {backend}")
+
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "hybrid")
+
+# Create rate limiter instances
+# Requests per identity per minute, applied to every request by the middleware
+rate_limiter = build_rate_limiter(
+    RATE_LIMIT_BACKEND, int(os.getenv("RATE_LIMIT_PER_MINUTE", 60))
+)
+# Cost units per identity per minute, charged by routes declaring rate_limit(cost=...)
+cost_rate_limiter = build_rate_limiter(
+    RATE_LIMIT_BACKEND, int(os.getenv("RATE_LIMIT_COST_PER_MINUTE", 60))
+)
+# Strict budget for unauthenticated, bcrypt- or email-backed auth endpoints
+auth_rate_limiter = build_rate_limiter(
+    RATE_LIMIT_BACKEND, int(os.getenv("RATE_LIMIT_AUTH_PER_MINUTE", 10))
+)
+
+
+def rate_limit_identity(request: Request) -> str:
+    """
+    Key requests by user ID when they carry a valid access token, otherwise
+    by client IP. The result is cached on the request so the JWT is only
+    decoded once between the middleware and route dependencies.
+    """
+    identity = getattr(request.state, "rate_limit_identity", None)
+    if identity is not None:
+        return identity
+
+    identity = f"ip:{request.client.host if request.client else 'unknown'}"
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            subject = decode_access_token(token).get("sub")
+        except HTTPException:
+            subject = None
+        if subject:
+            identity = f"user:{subject}"
+
+    request.state.rate_limit_identity = identity
+    return identity
+
+
+def rate_limit(
+    cost: int = 1,
+    limiter: BaseRateLimiter | None = None,
+    scope: str = "cost",
+):
+    """
+    Declarative per-route limit, used as a route dependency:
+
+        @router.get("/...", dependencies=[Depends(rate_limit(cost=5))])
+
+    Each call charges `cost` units against the caller's budget in `scope`
+    (the shared cost budget by default), so expensive endpoints use it up
+    faster than cheap ones.
+    """
+    async def dependency(request: Request) -> None:
+        if not RATE_LIMIT_ENABLED:
+            return
+        active = limiter if limiter is not None else cost_rate_limiter
+        identity = f"{scope}:{rate_limit_identity(request)}"
+        try:
+            await active.check_rate_limit(request, identity=identity, cost=cost)
+        except (RedisError, OSError) as exc:
+            logger.warning("Rate limiter unavailable, allowing request: %s", exc)
+
+    return dependency
+
+
+async def close_rate_limiters() -> None:
+    """Flush hybrid limiters and release Redis connections on shutdown."""
+    for limiter in (rate_limiter, cost_rate_limiter, auth_rate_limiter):
+        if isinstance(limiter, HybridRateLimiter):
+            await limiter.stop()
+    await redis_pool.disconnect()
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI global limit: every HTTP request is charged against the
+    caller's `requests` budget before it reaches the app. A rejected request
+    is answered with the 429 from here; an allowed one gets the
+    X-RateLimit-* headers added to its `http.response.start` message, so
+    the response body, streaming or not, passes through untouched. A
+    response that already carries rate limit headers, such as a 429 from a
+    route's cost or auth limiter, keeps its own. Fails open when the
+    limiter is unavailable.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: BaseRateLimiter | None = None):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        limiter = self.limiter if self.limiter is not None else rate_limiter
+        try:
+            result = await limiter.check_rate_limit(
+                request, identity=f"requests:{rate_limit_identity(request)}"
             )
+        except HTTPException as e:
+            response = JSONResponse(
+                status_code=e.status_code,
+                content={"detail": e.detail},
+                headers=e.headers,
+            )
+            await response(scope, receive, send)
+            return
+        except (RedisError, OSError) as exc:
+            # Fail open: an unavailable limiter must not take the API down with it
+            logger.warning("Rate limiter unavailable, allowing request: %s", exc)
+            await self.app(scope, receive, send)
+            return
+
+        limit_headers = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in result.headers().items()
+        ]
+        names = {name for name, _ in limit_headers} | {b"retry-after"}
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                if not any(name.lower() in names for name, _ in headers):
+                    message["headers"] = headers + limit_headers
+            await send(message)
 
-# Create rate limiter instance
-rate_limiter = RateLimiter()
-
-# Rate limit middleware
-async def rate_limit_middleware(request: Request, call_next):
-    try:
-        await rate_limiter.check_rate_limit(request)
-        response = await call_next(request)
-        return response
-    except HTTPException as e:
-        return JSONResponse(
-            status_code=e.status_code,
-            content={"detail": e.detail}
-        ) 
\ No newline at end of file
+        await self.app(scope, receive, send_wrapper)
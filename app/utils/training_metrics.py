@@ -0,0 +1,56 @@
+# app/utils/training_metrics.py
+"""
+SQL expressions for the derived training metrics offered by the progress
+endpoints (`metric=`), computed in the database over `weight_kg` so logs in
+different units are comparable and only one row per session is returned.
+
+- Estimated one-rep max (e1RM), by Epley: `w * (1 + reps / 30)`, and by
+  Brzycki: `w * 36 / (37 - reps)`. Both equal `w` for a single rep; Brzycki
+  is undefined from 37 reps.
+- Tonnage (volume load): `w * reps * sets`, summed over a session.
+- Intensity: a session's heaviest weight as a percentage of the best Epley
+  e1RM in the requested range.
+
+A session is all of one exercise's logs on one calendar day (`SESSION_DAY`).
+"""
+from sqlalchemy import Date, Float, case, cast, func
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.models.exercise_log import ExerciseLog
+
+
+class calendar_day(FunctionElement):
+    """The calendar day of a timestamp, as a `Date`."""
+
+    type = Date()
+    name = "calendar_day"
+    inherit_cache = True
+
+
+@compiles(calendar_day)
+def _cast_to_date(element, compiler, **kw):
+    return compiler.process(cast(*element.clauses, Date), **kw)
+
+
+@compiles(calendar_day, "sqlite")
+def _sqlite_date(element, compiler, **kw):
+    # CAST(... AS DATE) has numeric affinity on SQLite and keeps only the year
+    return f"date({compiler.process(element.clauses, **kw)})"
+
+
+_weight = ExerciseLog.weight_kg
+_reps = cast(ExerciseLog.reps, Float)
+
+# A log without sets counts as one set
+SETS_OR_ONE = func.coalesce(ExerciseLog.sets, 1)
+
+# The day a log's session is grouped by; ExerciseLog.date is a timestamp
+SESSION_DAY = calendar_day(ExerciseLog.date)
+
+# Per-log estimates of the one-rep max, in kg
+EPLEY_E1RM = case((ExerciseLog.reps == 1, _weight), else_=_weight * (1.0 + _reps / 30.0))
+BRZYCKI_E1RM = case((ExerciseLog.reps < 37, _weight * 36.0 / (37.0 - _reps)), else_=None)
+
+# Per-log volume load, in kg
+TONNAGE = _weight * ExerciseLog.reps * SETS_OR_ONE
@@ -1,5 +1,9 @@
+from typing import Optional
+
 from app.models.enums import WeightUnit
 
+LBS_PER_KG = 2.20462
+
 def convert_weight(weight: float, from_unit: WeightUnit, to_unit: WeightUnit) -> float:
     """
     Convert weight from one unit to another, handling both Enum members and string values.
@@ -19,9 +23,14 @@ def convert_weight(weight: float, from_unit: WeightUnit, to_unit: WeightUnit) ->
 
     # Perform conversion for supported pairs
     if from_val == "kg" and to_val == "lbs":
-        return weight * 2.20462
+        return weight * LBS_PER_KG
     elif from_val == "lbs" and to_val == "kg":
-        return weight / 2.20462
+        return weight / LBS_PER_KG
     
     # Raise an error for any other combination
-    raise ValueError(f"Unsupported unit conversion: {from_val} to {to_val}") 
\ No newline at end of file
+    raise ValueError(f"Unsupported unit conversion: {from_val} to {to_val}")
+
+
+def to_kg(weight: Optional[float], unit: WeightUnit) -> Optional[float]:
+    """`weight` in kg, as stored in the generated `exercise_logs.weight_kg` column."""
+    return convert_weight(weight, unit, WeightUnit.KG) if weight is not None else None
@@ -0,0 +1,137 @@
+# async_db_benchmark.py
+"""
+Compare a sync endpoint on the psycopg2 engine (run in FastAPI's threadpool)
+against an async endpoint on the asyncpg engine, with hundreds of clients
+in flight at once.
+
+    python benchmarks/async_db_benchmark.py [--clients 500] [--delay 0.01]
+
+Each request runs one `SELECT pg_sleep(delay)` to stand in for a query
+round trip. Both engines get a pool of `--pool-size` connections, so the
+sync variant is bounded by the threadpool (40 threads by default) rather
+than by the database. Needs a reachable Postgres at DATABASE_URL.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("FRONTEND_URL", "http://localhost:3000")
+os.environ.setdefault("ADMIN_URL", "http://localhost:3001")
+
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.session import async_database_url, db_url
+
+QUERY = text("SELECT pg_sleep(:delay)")
+
+
+def build_app(variant: str, delay: float, pool_size: int) -> tuple[FastAPI, object]:
+    app = FastAPI()
+    params = {"delay": delay}
+
+    if variant == "sync":
+        engine = create_engine(db_url, pool_size=pool_size, max_overflow=0, pool_timeout=60)
+        SessionLocal = sessionmaker(bind=engine)
+
+        def get_db():
+            with SessionLocal() as db:
+                yield db
+
+        @app.get("/query")
+        def query(db: Session = Depends(get_db)):
+            db.execute(QUERY, params)
+            return {"status": "ok"}
+
+        return app, engine
+
+    engine = create_async_engine(
+        async_database_url(db_url), pool_size=pool_size, max_overflow=0, pool_timeout=60
+    )
+    AsyncSessionLocal = async_sessionmaker(engine)
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    @app.get("/query")
+    async def query(db: AsyncSession = Depends(get_async_db)):
+        await db.execute(QUERY, params)
+        return {"status": "ok"}
+
+    return app, engine
+
+
+async def drive(app: FastAPI, clients: int, requests_per_client: int) -> tuple[float, list[float]]:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/query", "raw_path": b"/query",
+        "query_string": b"", "root_path": "", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 5000), "server": ("bench", 80),
+    }
+    latencies: list[float] = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"Request failed with {message['status']}")
+
+    async def client(count: int):
+        for _ in range(count):
+            start = time.perf_counter()
+            await app(dict(scope), receive, send)
+            latencies.append(time.perf_counter() - start)
+
+    # Warm up: open pooled connections and build the app
+    await asyncio.gather(*(client(1) for _ in range(min(clients, 50))))
+    latencies.clear()
+    start = time.perf_counter()
+    await asyncio.gather(*(client(requests_per_client) for _ in range(clients)))
+    return time.perf_counter() - start, latencies
+
+
+async def run(variant: str, args) -> tuple[float, list[float]]:
+    app, engine = build_app(variant, args.delay, args.pool_size)
+    try:
+        return await drive(app, args.clients, args.requests)
+    finally:
+        result = engine.dispose()
+        if asyncio.iscoroutine(result):
+            await result
+
+
+def percentile(values: list[float], q: float) -> float:
+    return statistics.quantiles(values, n=100)[int(q) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=10, help="requests per client")
+    parser.add_argument("--delay", type=float, default=0.01, help="seconds per query")
+    parser.add_argument("--pool-size", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients x {args.requests} requests, {args.delay * 1000:.0f} ms per query")
+    print(f"{'variant':<10}{'requests/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    for variant in ("sync", "async"):
+        elapsed, latencies = asyncio.run(run(variant, args))
+        print(
+            f"{variant:<10}{len(latencies) / elapsed:>12.0f}"
+            f"{percentile(latencies, 50) * 1000:>10.1f}{percentile(latencies, 99) * 1000:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# rate_limiter_benchmark.py
+"""
+Compare rate limiting algorithms: latency, Redis round trips, server-side
+commands, keys and memory per client.
+
+    python benchmarks/rate_limiter_benchmark.py            # in-process fakeredis
+    python benchmarks/rate_limiter_benchmark.py --redis    # REDIS_HOST/REDIS_PORT
+
+Server-side command counts and MEMORY USAGE are only reported against a
+real Redis; with fakeredis, memory falls back to raw key + value bytes.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import redis.asyncio as redis
+
+from app.utils.rate_limiter import RateLimiter, build_algorithm
+
+ALGORITHMS = ("fixed_window", "sliding_window", "gcra")
+
+
+async def make_client(use_redis: bool) -> redis.Redis:
+    if use_redis:
+        client = redis.Redis(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", 6379)),
+            db=int(os.getenv("REDIS_BENCH_DB", 15)),
+            decode_responses=True,
+        )
+        await client.flushdb()
+        return client
+    from fakeredis import FakeAsyncRedis
+    return FakeAsyncRedis(decode_responses=True)
+
+
+async def server_commands(client: redis.Redis) -> int | None:
+    """Total commands processed by the server, or None if unsupported."""
+    try:
+        stats = await client.info("commandstats")
+    except Exception:
+        return None
+    return sum(
+        value["calls"] for name, value in stats.items()
+        if name.startswith("cmdstat_") and name not in ("cmdstat_info", "cmdstat_evalsha", "cmdstat_eval", "cmdstat_script|load")
+    )
+
+
+async def bytes_per_key(client: redis.Redis, key: str) -> int:
+    try:
+        return await client.memory_usage(key) or 0
+    except Exception:
+        value = await client.get(key) or ""
+        return len(key) + len(value)
+
+
+async def bench_algorithm(name: str, args: argparse.Namespace) -> dict:
+    client = await make_client(args.redis)
+    # Just above each client's share so nothing is rejected, while keeping
+    # GCRA's TAT keys alive (their TTL scales with the used quota) until measured.
+    per_client = -(-args.requests // args.clients) + 1
+    algorithm = build_algorithm(
+        name,
+        requests_per_minute=per_client,
+        requests_per_hour=per_client,
+        requests_per_day=per_client,
+    )
+    limiter = RateLimiter(client=client, algorithm=algorithm)
+
+    # Count client round trips by wrapping the command dispatcher
+    round_trips = 0
+    execute = client.execute_command
+
+    async def counting_execute(*cmd_args, **kwargs):
+        nonlocal round_trips
+        round_trips += 1
+        return await execute(*cmd_args, **kwargs)
+
+    client.execute_command = counting_execute
+
+    # Warm up: loads the script so EVALSHA hits from here on
+    await limiter.hit("warmup")
+    round_trips = 0
+    before = await server_commands(client)
+
+    start = time.perf_counter()
+    for i in range(args.requests):
+        await limiter.hit(f"client-{i % args.clients}")
+    elapsed = time.perf_counter() - start
+
+    after = await server_commands(client)
+    checks_round_trips = round_trips
+
+    keys = [key for key in await client.keys("rate_limit:*") if "warmup" not in key]
+    total_bytes = 0
+    for key in keys:
+        total_bytes += await bytes_per_key(client, key)
+
+    if args.redis:
+        await client.flushdb()
+    await client.aclose()
+
+    return {
+        "algorithm": name,
+        "us_per_check": elapsed / args.requests * 1e6,
+        "round_trips": checks_round_trips / args.requests,
+        "server_cmds": None if before is None or after is None else (after - before) / args.requests,
+        "keys_per_client": len(keys) / args.clients,
+        "bytes_per_client": total_bytes / args.clients,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--redis", action="store_true", help="use a real Redis instead of fakeredis")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'algorithm':<16}{'us/check':>10}{'RTT/check':>11}{'cmds/check':>12}{'keys/client':>13}{'bytes/client':>14}")
+    for name in ALGORITHMS:
+        row = asyncio.run(bench_algorithm(name, args))
+        cmds = "n/a" if row["server_cmds"] is None else f"{row['server_cmds']:.2f}"
+        print(
+            f"{row['algorithm']:<16}{row['us_per_check']:>10.1f}{row['round_trips']:>11.2f}"
+            f"{cmds:>12}{row['keys_per_client']:>13.2f}{row['bytes_per_client']:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# trend_benchmark.py
+"""
+Compare the trend estimators in app.utils.trend against the hand-rolled
+least-squares slope the progress endpoint used before:
+
+- legacy:     the previous inline OLS sums (slope only, no interval)
+- ols:        ols_trend, slope and t interval
+- theil_sen:  exact median of pairwise slopes up to MAX_PAIRS pairs,
+              a seeded sample of MAX_PAIRS pairs beyond
+- huber:      Huber IRLS from the OLS fit
+
+For each series size, `ms` is the time per fit. `error` is the absolute
+slope error on the same series after one in 50 points (at least one) is
+replaced by a mis-entered 500 kg log, with a true slope of 0.1 kg/day.
+
+    python benchmarks/trend_benchmark.py [--sizes 30 300 3000 10000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.trend import TREND_METHODS
+
+TRUE_SLOPE = 0.1
+
+
+def legacy_slope(x, y) -> float:
+    n = len(x)
+    sum_x = sum(x)
+    sum_y = sum(y)
+    sum_xy = sum(a * b for a, b in zip(x, y))
+    sum_xx = sum(a * a for a in x)
+    denominator = n * sum_xx - sum_x**2
+    return (n * sum_xy - sum_x * sum_y) / denominator if denominator != 0 else 0
+
+
+def series(n: int, seed: int = 0) -> tuple[list, list]:
+    """About three logs a week with normal noise, and a few 500 kg typos."""
+    rng = random.Random(seed)
+    x = sorted(rng.randrange(0, n * 7 // 3 + 1) for _ in range(n))
+    y = [100 + TRUE_SLOPE * day + rng.gauss(0, 2.5) for day in x]
+    for i in rng.sample(range(n), max(1, n // 50)):
+        y[i] = 500.0
+    return x, y
+
+
+def per_call_ms(fn, repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[30, 300, 3000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    variants = {"legacy": legacy_slope}
+    variants.update({name: lambda x, y, fit=fit: fit(x, y).slope for name, fit in TREND_METHODS.items()})
+
+    print(f"{'points':>7}  {'method':<10}{'ms':>10}{'error':>10}")
+    for n in args.sizes:
+        x, y = series(n)
+        baseline = None
+        for name, fit in variants.items():
+            ms = per_call_ms(lambda: fit(x, y), args.repeat)
+            baseline = baseline or ms
+            error = abs(fit(x, y) - TRUE_SLOPE)
+            print(f"{n:>7}  {name:<10}{ms:>10.2f}{error:>10.4f}  ({ms / baseline:.1f}x legacy)")
+
+
+if __name__ == "__main__":
+    main()
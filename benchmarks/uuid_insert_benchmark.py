@@ -0,0 +1,142 @@
+# uuid_insert_benchmark.py
+"""
+Compare insert throughput into a large table keyed by random UUIDv4 against
+time-ordered UUIDv7 primary keys (app.utils.ids.uuid7).
+
+    python benchmarks/uuid_insert_benchmark.py [--rows 10000000] [--inserts 200000]
+
+For each id kind, a table shaped like exercise_logs is prefilled
+server-side with `--rows` rows (older UUIDv7 ids for the v7 table), then
+`--inserts` new rows with ids generated in Python, as the app does, are
+inserted in batches of `--batch-size`. Reported per kind:
+
+- rows/s:     insert throughput
+- WAL MB:     write-ahead log generated; random keys dirty more index pages,
+              which costs full-page images after each checkpoint
+- idx reads:  primary key index blocks read from outside shared buffers
+- pkey MB:    primary key index size afterwards (page splits leave it larger)
+
+Needs a reachable Postgres 13+ at DATABASE_URL, a role allowed to run
+CHECKPOINT, and a few GB of disk for the default 10M rows. The tables are
+dropped afterwards.
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("FRONTEND_URL", "http://localhost:3000")
+os.environ.setdefault("ADMIN_URL", "http://localhost:3001")
+
+from sqlalchemy import create_engine, text
+
+from app.db.session import db_url
+from app.utils.ids import uuid7
+
+# A UUIDv7 from a timestamp, for prefilling: the 48-bit millisecond time
+# over the start of a random UUID, with the version nibble turned from 4 to 7
+UUID7_FUNCTION = """
+CREATE OR REPLACE FUNCTION bench_uuid7(ts timestamptz) RETURNS uuid AS $$
+    SELECT encode(set_bit(set_bit(overlay(uuid_send(gen_random_uuid())
+        PLACING substring(int8send(floor(extract(epoch FROM ts) * 1000)::bigint) FROM 3)
+        FROM 1 FOR 6), 52, 1), 53, 1), 'hex')::uuid
+$$ LANGUAGE sql VOLATILE
+"""
+
+KINDS = {
+    "uuid4": (uuid.uuid4, "gen_random_uuid()"),
+    # One prefilled row per millisecond, ending now
+    "uuid7": (uuid7, "bench_uuid7(now() - (:rows - i) * interval '1 millisecond')"),
+}
+
+
+def prepare(conn, table: str, id_sql: str, rows: int) -> None:
+    conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+    conn.execute(text(
+        f"CREATE TABLE {table} (id uuid PRIMARY KEY, user_id uuid NOT NULL, "
+        "exercise_id uuid NOT NULL, date timestamp NOT NULL, weight float, reps int)"
+    ))
+    conn.execute(text(f"CREATE INDEX {table}_user_id ON {table} (user_id)"))
+    conn.execute(
+        text(
+            f"INSERT INTO {table} SELECT {id_sql}, gen_random_uuid(), gen_random_uuid(), "
+            "now() - i * interval '1 second', 100, 5 FROM generate_series(1, :rows) AS i"
+        ),
+        {"rows": rows},
+    )
+    conn.execute(text(f"VACUUM ANALYZE {table}"))
+    conn.execute(text("CHECKPOINT"))
+
+
+def index_reads(conn, table: str) -> int:
+    return conn.scalar(
+        text("SELECT idx_blks_read FROM pg_statio_user_indexes WHERE indexrelname = :name"),
+        {"name": f"{table}_pkey"},
+    ) or 0
+
+
+def run(engine, kind: str, args) -> None:
+    new_id, id_sql = KINDS[kind]
+    table = f"bench_ids_{kind}"
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        started = time.perf_counter()
+        prepare(conn, table, id_sql, args.rows)
+        prefill = time.perf_counter() - started
+
+        insert = text(
+            f"INSERT INTO {table} (id, user_id, exercise_id, date, weight, reps) "
+            "VALUES (:id, :user_id, :exercise_id, :date, 100, 5)"
+        )
+        user_id, exercise_id = uuid7(), uuid7()
+        wal_before = conn.scalar(text("SELECT pg_current_wal_lsn()"))
+        reads_before = index_reads(conn, table)
+        started = time.perf_counter()
+        for _ in range(args.inserts // args.batch_size):
+            with conn.begin():
+                conn.execute(insert, [
+                    {"id": new_id(), "user_id": user_id, "exercise_id": exercise_id, "date": datetime.now()}
+                    for _ in range(args.batch_size)
+                ])
+        elapsed = time.perf_counter() - started
+        wal = conn.scalar(
+            text("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), :before)"), {"before": wal_before}
+        )
+        reads = index_reads(conn, table) - reads_before
+        pkey = conn.scalar(text(f"SELECT pg_relation_size('{table}_pkey')"))
+        conn.execute(text(f"DROP TABLE {table}"))
+
+    print(
+        f"{kind:<7}{args.inserts / elapsed:>10.0f}{float(wal) / 2**20:>10.1f}"
+        f"{reads:>11}{pkey / 2**20:>9.0f}   (prefill {prefill:.0f}s)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--inserts", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--kind", choices=list(KINDS), action="append")
+    args = parser.parse_args()
+
+    engine = create_engine(db_url)
+    with engine.begin() as conn:
+        conn.execute(text(UUID7_FUNCTION))
+    print(f"{'kind':<7}{'rows/s':>10}{'WAL MB':>10}{'idx reads':>11}{'pkey MB':>9}")
+    try:
+        for kind in args.kind or list(KINDS):
+            run(engine, kind, args)
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("DROP FUNCTION IF EXISTS bench_uuid7(timestamptz)"))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
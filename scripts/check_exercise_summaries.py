@@ -0,0 +1,39 @@
+# check_exercise_summaries.py
+import argparse
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db.session import SessionLocal
+from app.utils.exercise_summary import find_drifted_summaries
+
+def main():
+    """
+    Compare each exercise's stored log summary (count, last logged, best
+    weight) with its logs, and with --repair recalculate the ones that drifted.
+    Exits with status 1 if drift was found and not repaired.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--repair", action="store_true", help="recalculate drifted summaries")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        drifted = find_drifted_summaries(db, repair=args.repair)
+        for exercise_id in drifted:
+            print(exercise_id)
+        action = "Repaired" if args.repair else "Found"
+        print(f"--- {action} {len(drifted)} exercise summary(ies) out of sync. ---")
+    except Exception as e:
+        print(f"--- An error occurred while checking exercise summaries: {e} ---")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+    if drifted and not args.repair:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
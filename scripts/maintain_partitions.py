@@ -0,0 +1,41 @@
+# maintain_partitions.py
+import argparse
+import sys
+import os
+from datetime import datetime
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db.partitions import MONTHS_AHEAD, detach_partitions_before, ensure_partitions
+from app.db.session import engine
+
+def main():
+    """
+    Create the exercise_logs partitions for the coming months and optionally
+    detach old ones. Schedule this periodically (e.g. daily or monthly cron).
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--months-ahead", type=int, default=MONTHS_AHEAD,
+                        help=f"months to create beyond the current one (default {MONTHS_AHEAD})")
+    parser.add_argument("--detach-before", metavar="YYYY-MM",
+                        help="detach monthly partitions that end on or before this month starts")
+    parser.add_argument("--drop", action="store_true",
+                        help="drop detached partitions instead of keeping them for archiving")
+    args = parser.parse_args()
+
+    try:
+        with engine.begin() as conn:
+            created = ensure_partitions(conn, months_ahead=args.months_ahead)
+            print(f"--- Created {len(created)} partition(s): {', '.join(created) or '-'} ---")
+            if args.detach_before:
+                cutoff = datetime.strptime(args.detach_before, "%Y-%m").date()
+                detached = detach_partitions_before(conn, cutoff, drop=args.drop)
+                action = "Dropped" if args.drop else "Detached"
+                print(f"--- {action} {len(detached)} partition(s): {', '.join(detached) or '-'} ---")
+    except Exception as e:
+        print(f"--- An error occurred while maintaining partitions: {e} ---")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
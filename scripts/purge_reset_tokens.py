@@ -0,0 +1,24 @@
+# purge_reset_tokens.py
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db.session import SessionLocal
+from app.utils.password_reset import purge_expired_reset_tokens
+
+def main():
+    """Delete expired password reset tokens. Schedule this periodically (e.g. cron)."""
+    db = SessionLocal()
+    try:
+        removed = purge_expired_reset_tokens(db)
+        print(f"--- Purged {removed} expired password reset token(s). ---")
+    except Exception as e:
+        print(f"--- An error occurred while purging reset tokens: {e} ---")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Unit tests for the response compression middleware in app.core.compression.
+"""
+import asyncio
+import gzip
+import json
+
+import brotli
+import pytest
+import zstandard
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, negotiate_encoding
+
+PAYLOAD = {"data_points": [{"date": f"2026-01-{i % 28 + 1:02d}", "weight": 100.0, "reps": 5} for i in range(200)]}
+
+
+def make_app(minimum_size: int = 1000) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(
+        CompressionMiddleware, minimum_size=minimum_size, immutable_paths=["/openapi.json"]
+    )
+
+    @app.get("/progress")
+    def progress():
+        return PAYLOAD
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((f"line {i}\n" * 50 for i in range(5)), media_type="text/plain")
+
+    return app
+
+
+def get_raw(client: TestClient, path: str, encoding: str):
+    """Send a request and return the response with its undecoded body."""
+    with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br, zstd", "zstd"),
+    ("gzip, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0.5, gzip;q=1.0", "gzip"),
+    ("zstd;q=0, *", "br"),
+    ("identity", None),
+])
+def test_negotiate_encoding(header, expected):
+    """Test that q-values win and ties fall back to server preference."""
+    assert negotiate_encoding(header) == expected
+
+
+@pytest.mark.parametrize("encoding, decompress", [
+    ("zstd", lambda body: zstandard.ZstdDecompressor().decompressobj().decompress(body)),
+    ("br", brotli.decompress),
+    ("gzip", gzip.decompress),
+])
+def test_json_response_is_compressed(encoding, decompress):
+    """Test that large responses are compressed with the negotiated encoding."""
+    response, body = get_raw(TestClient(make_app()), "/progress", encoding)
+    assert response.headers["Content-Encoding"] == encoding
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert int(response.headers["Content-Length"]) == len(body)
+    assert json.loads(decompress(body)) == PAYLOAD
+
+
+def test_small_response_is_not_compressed():
+    """Test that responses under the minimum size are sent as is."""
+    response, body = get_raw(TestClient(make_app()), "/small", "br")
+    assert "Content-Encoding" not in response.headers
+    assert json.loads(body) == {"ok": True}
+
+
+def test_streaming_response_is_compressed_incrementally():
+    """Test that streaming bodies are compressed chunk by chunk."""
+    response, body = get_raw(TestClient(make_app()), "/stream", "br")
+    assert response.headers["Content-Encoding"] == "br"
+    assert "Content-Length" not in response.headers
+    assert brotli.decompress(body).decode() == "".join(f"line {i}\n" * 50 for i in range(5))
+
+
+def test_immutable_payload_is_compressed_once():
+    """Test that the OpenAPI document is compressed once and then served from cache."""
+    client = TestClient(make_app(minimum_size=100))
+    calls = []
+    original = brotli.compress
+
+    def counting_compress(data, **kwargs):
+        calls.append(kwargs)
+        return original(data, **kwargs)
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("app.core.compression.brotli.compress", counting_compress)
+        first = get_raw(client, "/openapi.json", "br")[1]
+        second = get_raw(client, "/openapi.json", "br")[1]
+    assert first == second
+    assert calls == [{"quality": 11}]
+    assert json.loads(brotli.decompress(first))["openapi"]
+
+
+def test_first_streamed_chunk_is_sent_without_waiting_for_the_next():
+    """Test that a streaming response's first chunk is compressed and sent straight away."""
+    sent = []
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": b"first " * 100, "more_body": True})
+        # Nothing may be held back at this point
+        assert [message["type"] for message in sent] == ["http.response.start", "http.response.body"]
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request"}
+
+    scope = {"type": "http", "path": "/stream", "headers": [(b"accept-encoding", b"gzip")]}
+    asyncio.run(CompressionMiddleware(app)(scope, receive, send))
+    assert dict(sent[0]["headers"])[b"content-encoding"] == b"gzip"
+    assert gzip.decompress(b"".join(message["body"] for message in sent[1:])) == b"first " * 100
@@ -1,4 +1,5 @@
 from fastapi.testclient import TestClient
+import msgpack
 import pytest
 from app.core.config import settings
 import random
@@ -177,4 +178,99 @@ def test_create_exercise_log_with_optional_fields(client: TestClient):
     assert data["reps"] is None
     assert data["sets"] is None
     assert data["weight_unit"] == "kg"
-    assert "id" in data 
\ No newline at end of file
+    assert "id" in data 
+def test_log_listings_negotiate_msgpack_and_columnar(client: TestClient):
+    """Test that the log listings honour Accept: application/msgpack and shape=columnar."""
+    headers, exercise_id = setup_user_with_exercise(client)
+    for weight, unit in ((100, "kg"), (110, "lbs")):
+        client.post(
+            f"{settings.API_V1_STR}/exercise-logs/",
+            json={"exercise_id": exercise_id, "weight": weight, "reps": 5, "sets": 3, "weight_unit": unit},
+            headers=headers,
+        )
+    by_exercise = f"{settings.API_V1_STR}/exercise-logs/exercise/{exercise_id}"
+    rows = client.get(by_exercise, headers=headers).json()
+
+    packed = client.get(by_exercise, headers={**headers, "Accept": "application/msgpack"})
+    assert packed.status_code == 200
+    assert packed.headers["content-type"] == "application/msgpack"
+    assert "Accept" in packed.headers["vary"].split(", ")
+    assert msgpack.unpackb(packed.content) == rows
+
+    columnar = client.get(by_exercise, headers=headers, params={"shape": "columnar"})
+    assert columnar.headers["content-type"] == "application/json"
+    assert "Accept" in columnar.headers["vary"].split(", ")
+    columns = columnar.json()
+    assert columns["weight"] == [100, 110]
+    assert columns["weight_unit"] == ["kg", "lbs"]
+    assert columns["id"] == [row["id"] for row in rows]
+
+    # Both together, on the user's full listing
+    both = client.get(
+        f"{settings.API_V1_STR}/exercise-logs/",
+        headers={**headers, "Accept": "application/msgpack"},
+        params={"shape": "columnar"},
+    )
+    assert both.headers["content-type"] == "application/msgpack"
+    assert "Accept" in both.headers["vary"].split(", ")
+    assert sorted(msgpack.unpackb(both.content)["weight"]) == [100, 110]
+
+def test_exercise_summary_follows_log_writes(client: TestClient):
+    """Test that the exercise's summary columns are returned and kept current as logs are written."""
+    headers, exercise_id = setup_user_with_exercise(client)
+    logs_url = f"{settings.API_V1_STR}/exercise-logs/"
+
+    def summary() -> tuple:
+        response = client.get(f"{settings.API_V1_STR}/exercises/{exercise_id}", headers=headers)
+        assert response.status_code == 200, response.text
+        data = response.json()
+        return data["log_count"], data["last_logged_at"], data["best_weight_kg"], data["best_weight_date"]
+
+    assert summary() == (0, None, None, None)
+
+    early = client.post(logs_url, json={
+        "exercise_id": exercise_id, "weight": 100, "reps": 5, "sets": 3,
+        "weight_unit": "kg", "date": "2026-01-01",
+    }, headers=headers)
+    late = client.post(logs_url, json={
+        "exercise_id": exercise_id, "weight": 198.5, "reps": 5, "sets": 3,
+        "weight_unit": "lbs", "date": "2026-01-03",
+    }, headers=headers)
+    assert early.status_code == 201 and late.status_code == 201
+    count, last, best, best_date = summary()
+    assert (count, last[:10], best_date[:10]) == (2, "2026-01-03", "2026-01-01")
+    assert best == pytest.approx(100.0)
+
+    update = client.put(f"{logs_url}{late.json()['id']}", json={"weight": 120, "weight_unit": "kg"}, headers=headers)
+    assert update.status_code == 200, update.text
+    count, last, best, best_date = summary()
+    assert (count, best, best_date[:10]) == (2, pytest.approx(120.0), "2026-01-03")
+
+    delete = client.delete(f"{logs_url}{late.json()['id']}", headers=headers)
+    assert delete.status_code == 204
+    count, last, best, best_date = summary()
+    assert (count, last[:10], best, best_date[:10]) == (1, "2026-01-01", pytest.approx(100.0), "2026-01-01")
+
+    client.delete(f"{logs_url}{early.json()['id']}", headers=headers)
+    assert summary() == (0, None, None, None)
+
+def test_created_log_reports_new_records(client: TestClient):
+    """Test that a created log reports the records it sets, and that a tie only takes one if it is earlier."""
+    headers, exercise_id = setup_user_with_exercise(client)
+
+    def create(weight: float, reps: int, day: str, unit: str = "kg") -> dict:
+        response = client.post(f"{settings.API_V1_STR}/exercise-logs/", json={
+            "exercise_id": exercise_id, "weight": weight, "reps": reps, "sets": 3,
+            "weight_unit": unit, "date": day,
+        }, headers=headers)
+        assert response.status_code == 201, response.text
+        data = response.json()
+        return data["new_pr"], data["new_records"]
+
+    assert create(100, 5, "2026-01-02") == (True, [1, 5])
+    assert create(220.5, 1, "2026-01-03", "lbs") == (True, [1])
+    assert create(80, 12, "2026-01-04") == (True, [10])
+    assert create(90, 3, "2026-01-05") == (False, [])
+    # A tie dated later keeps the existing record; one dated earlier takes it
+    assert create(100, 5, "2026-01-06") == (False, [])
+    assert create(100, 5, "2026-01-01") == (True, [5])
@@ -0,0 +1,74 @@
+"""
+Unit tests for the per-exercise log summary in app.utils.exercise_summary,
+against a SQLite file shared by a sync and an async engine.
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.enums import WeightUnit
+from app.models.exercise import Exercise
+from app.utils.exercise_summary import (
+    find_drifted_summaries,
+    log_added,
+    log_changed,
+    log_removed,
+)
+from log_database import LogWriter, databases, make_log
+
+
+def summary(db: Session, exercise_id) -> tuple:
+    db.expire_all()
+    exercise = db.get(Exercise, exercise_id)
+    return exercise.log_count, exercise.last_logged_at, exercise.best_weight_kg, exercise.best_weight_date
+
+
+def test_summary_follows_adds_edits_and_deletes(databases):
+    """Test that each write keeps the summary equal to a recalculation from the logs."""
+    db, async_maker, (user_id, exercise_id) = databases
+
+    writer = LogWriter(
+        async_maker, log_added, lambda session, log: log_changed(session, log.exercise_id), log_removed
+    )
+
+    def add(day: int, weight, unit=WeightUnit.KG):
+        return writer.add(make_log(exercise_id, user_id, day, weight, unit))[0]
+
+    heavy = add(3, 242.5, WeightUnit.LBS)
+    light = add(5, 100.0)
+    early = add(1, 110.0)
+    unweighted = add(2, None)
+    count, last, best, best_date = summary(db, exercise_id)
+    assert (count, last, best_date) == (4, datetime(2026, 1, 5), datetime(2026, 1, 1))
+    assert best == pytest.approx(110.0, abs=0.01)
+    assert find_drifted_summaries(db) == []
+
+    # Neither the latest nor the best: only the count changes
+    writer.delete(unweighted.id)
+    assert summary(db, exercise_id)[0] == 3
+    # The best and then the latest: recalculated
+    writer.delete(early.id)
+    assert summary(db, exercise_id)[3] == datetime(2026, 1, 3)
+    writer.delete(light.id)
+    assert summary(db, exercise_id)[:2] == (1, datetime(2026, 1, 3))
+
+    writer.edit(heavy.id, weight=50.0, weight_unit=WeightUnit.KG)
+    assert summary(db, exercise_id)[2] == 50.0
+    assert find_drifted_summaries(db) == []
+
+    writer.delete(heavy.id)
+    assert summary(db, exercise_id) == (0, None, None, None)
+
+
+def test_drift_is_found_and_repaired(databases):
+    """Test that the consistency check reports and repairs a stale summary."""
+    db, _, (_, exercise_id) = databases
+    db.execute(update(Exercise).values(log_count=7, best_weight_kg=1.0))
+    db.commit()
+
+    assert find_drifted_summaries(db) == [exercise_id]
+    assert find_drifted_summaries(db, repair=True) == [exercise_id]
+    assert summary(db, exercise_id) == (0, None, None, None)
+    assert find_drifted_summaries(db) == []
@@ -0,0 +1,55 @@
+"""
+Unit tests for the UUIDv7 generator in app.utils.ids.
+"""
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+
+from app.models import Exercise, ExerciseLog, User, Workout
+from app.utils.ids import _uuid7, uuid7_time
+
+
+@pytest.fixture(autouse=True)
+def generator_state():
+    """Keep frozen clocks in one test from leaking into the next."""
+    with patch.multiple("app.utils.ids", _last_ms=0, _counter=0):
+        yield
+
+
+def test_uuid7_layout():
+    """Test that ids carry version 7, the RFC variant and the current time."""
+    value = _uuid7()
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert abs((uuid7_time(value) - datetime.now(timezone.utc)).total_seconds()) < 1
+
+
+def test_uuid7_is_strictly_increasing_within_a_millisecond():
+    """Test that a burst in one frozen millisecond, even past the counter, stays ordered."""
+    with patch("app.utils.ids.time.time_ns", return_value=1_800_000_000_000 * 1_000_000):
+        values = [_uuid7() for _ in range(5000)]
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+
+
+def test_uuid7_survives_clock_stepping_back():
+    """Test that ids keep increasing when the wall clock goes backwards."""
+    with patch("app.utils.ids.time.time_ns", return_value=1_900_000_000_000 * 1_000_000):
+        first = _uuid7()
+    with patch("app.utils.ids.time.time_ns", return_value=1_899_999_999_000 * 1_000_000):
+        second = _uuid7()
+    assert second > first
+
+
+def test_uuid7_time_rejects_other_versions():
+    """Test that only UUIDv7 values have an embedded time."""
+    with pytest.raises(ValueError):
+        uuid7_time(uuid.uuid4())
+
+
+def test_models_default_to_uuid7():
+    """Test that the primary keys of the main models default to uuid7."""
+    for model in (User, Workout, Exercise, ExerciseLog):
+        assert model.__table__.c.id.default.arg(None).version == 7
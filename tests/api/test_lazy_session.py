@@ -0,0 +1,118 @@
+"""
+Unit tests for the lazily opened database sessions in app.db.lazy.
+"""
+import asyncio
+
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, StaticPool
+
+from app.core.metrics import DB_SESSIONS
+from app.core.middleware import RequestContextMiddleware
+from app.db.lazy import LazyAsyncSession, LazySession
+
+
+class CountingFactory:
+    def __init__(self, factory):
+        self.factory = factory
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.factory()
+
+
+def test_unused_session_is_never_created():
+    """Test that a session is only built on first use and closed only if built."""
+    factory = CountingFactory(sessionmaker(bind=create_engine("sqlite://")))
+    unused = LazySession(factory)
+    unused.close()
+    assert factory.calls == 0 and not unused.opened
+
+    used = LazySession(factory)
+    assert used.execute(text("SELECT 1")).scalar() == 1
+    assert used.scalar(text("SELECT 2")) == 2
+    used.close()
+    assert factory.calls == 1
+
+
+def test_async_session_chooses_factory_on_first_await(tmp_path):
+    """Test that coroutine methods route through `choose`, sync access uses the primary."""
+    primary = CountingFactory(async_sessionmaker(create_async_engine("sqlite+aiosqlite://")))
+    chosen = CountingFactory(async_sessionmaker(create_async_engine("sqlite+aiosqlite://")))
+
+    async def choose():
+        return chosen
+
+    async def scenario():
+        db = LazyAsyncSession(primary, choose)
+        assert await db.scalar(text("SELECT 1")) == 1
+        await db.close()
+
+        writer = LazyAsyncSession(primary, choose)
+        writer.info["touched"] = True
+        assert await writer.scalar(text("SELECT 1")) == 1
+        await writer.close()
+
+        await LazyAsyncSession(primary, choose).close()
+
+    asyncio.run(scenario())
+    assert (chosen.calls, primary.calls) == (1, 1)
+
+
+def make_app() -> FastAPI:
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    factory = sessionmaker(bind=engine)
+    async_factory = async_sessionmaker(
+        create_async_engine("sqlite+aiosqlite://", poolclass=NullPool)
+    )
+
+    def get_db():
+        db = LazySession(factory)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        db = LazyAsyncSession(async_factory)
+        try:
+            yield db
+        finally:
+            await db.close()
+
+    def require_token(token: str = ""):
+        if not token:
+            raise HTTPException(status_code=401)
+
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/sync")
+    def read_sync(db=Depends(get_db), _=Depends(require_token)):
+        return {"value": db.scalar(text("SELECT 1"))}
+
+    @app.get("/async")
+    async def read_async(token: str = "", db=Depends(get_async_db)):
+        if not token:
+            raise HTTPException(status_code=401)
+        return {"value": await db.scalar(text("SELECT 1"))}
+
+    return app
+
+
+def test_requests_without_database_use_are_counted():
+    """Test that requests are labelled by whether their session was used."""
+    client = TestClient(make_app())
+    for path in ("/sync", "/async"):
+        unused = DB_SESSIONS.value((path, "false"))
+        used = DB_SESSIONS.value((path, "true"))
+        assert client.get(path).status_code == 401
+        assert client.get(path, params={"token": "t"}).json() == {"value": 1}
+        assert DB_SESSIONS.value((path, "false")) == unused + 1
+        assert DB_SESSIONS.value((path, "true")) == used + 1
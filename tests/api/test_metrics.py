@@ -0,0 +1,182 @@
+"""
+Unit tests for the Prometheus collector in app.core.metrics.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import APIRouter, FastAPI, Response
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app.core.metrics import (
+    CONTENT_TYPE,
+    DB_CONNECT_LATENCY,
+    DB_POOL_CHECKED_OUT,
+    DB_PRE_PINGS,
+    QUERIES_PER_REQUEST,
+    REGISTRY,
+    REQUESTS,
+    Counter,
+    Histogram,
+    Metric,
+    register_pool_metrics,
+    scrape_authorized,
+)
+from app.core.middleware import RequestContextMiddleware
+from app.core.timing import install_query_timing
+
+
+def make_app() -> FastAPI:
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    install_query_timing(engine)
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return {"id": item_id}
+
+    @app.get("/metrics")
+    async def metrics():
+        return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+    return app
+
+
+def test_requests_labelled_by_route_template():
+    """Test that requests are counted per route template, not per raw path."""
+    labels = ("GET", "/items/{item_id}", "200")
+    before = REQUESTS.value(labels)
+    queries_before = QUERIES_PER_REQUEST.count(("/items/{item_id}",))
+    client = TestClient(make_app())
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/nowhere")
+
+    assert REQUESTS.value(labels) == before + 2
+    assert REQUESTS.value(("GET", "<unmatched>", "404")) >= 1
+    assert QUERIES_PER_REQUEST.count(("/items/{item_id}",)) == queries_before + 2
+
+    body = client.get("/metrics").text
+    assert "/items/1" not in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/items/{item_id}",le="+Inf"}' in body
+    assert 'db_queries_per_request_bucket{route="/items/{item_id}",le="2"}' in body
+    assert "http_requests_in_flight 1" in body
+    assert "threadpool_total_tokens 40" in body
+
+
+def test_metric_must_implement_samples():
+    """Test that the Metric base class cannot be instantiated without samples()."""
+    with pytest.raises(TypeError):
+        Metric("incomplete", "No samples.")
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test that bucket counts are rendered cumulatively with sum and count."""
+    histogram = Histogram("latency", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    lines = list(histogram.samples())
+    assert lines == [
+        'latency_bucket{le="0.1"} 2',
+        'latency_bucket{le="1"} 3',
+        'latency_bucket{le="+Inf"} 4',
+        "latency_sum 3.65",
+        "latency_count 4",
+    ]
+
+
+def test_pool_gauges_read_at_scrape_time():
+    """Test that pool gauges reflect connections checked out when scraped."""
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=2)
+    register_pool_metrics(engine, name="scrape_test")
+    with engine.connect():
+        body = REGISTRY.render()
+    assert 'db_pool_checked_out{engine="scrape_test"} 1' in body
+    assert 'db_pool_size{engine="scrape_test"} 2' in body
+    assert 'db_pool_checked_out{engine="scrape_test"} 0' in REGISTRY.render()
+
+
+def test_engines_share_labelled_pool_metrics():
+    """Test that every engine reports into the same db_pool_* families, labelled by engine."""
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=3)
+    other = create_engine("sqlite://", poolclass=QueuePool, pool_size=1)
+    register_pool_metrics(engine, name="replica0")
+    register_pool_metrics(other, name="replica1")
+    with engine.connect(), engine.connect():
+        assert DB_POOL_CHECKED_OUT.value(("replica0",)) == 2
+        assert DB_POOL_CHECKED_OUT.value(("replica1",)) == 0
+        body = REGISTRY.render()
+    assert body.count("# TYPE db_pool_size gauge") == 1
+    assert 'db_pool_size{engine="replica0"} 3' in body
+    assert 'db_pool_size{engine="replica1"} 1' in body
+    assert "db_replica0_pool" not in body
+    assert DB_CONNECT_LATENCY.count(("replica0",)) == 2
+
+
+def test_included_router_routes_use_full_template():
+    """Test that routes from included routers are labelled with their prefix."""
+    router = APIRouter()
+
+    @router.get("/{workout_id}")
+    def read_workout(workout_id: int):
+        return {"id": workout_id}
+
+    app = make_app()
+    app.include_router(router, prefix="/api/v1/workouts")
+    labels = ("GET", "/api/v1/workouts/{workout_id}", "200")
+    before = REQUESTS.value(labels)
+    TestClient(app).get("/api/v1/workouts/7")
+    assert REQUESTS.value(labels) == before + 1
+
+
+def test_thread_updated_metrics_do_not_lose_updates():
+    """Test that metrics updated from pool event threads count every update."""
+    for metric in (DB_PRE_PINGS, DB_CONNECT_LATENCY):
+        assert isinstance(metric._lock, type(threading.Lock()))
+    counter = Counter("pings", "Pings.", ("result",), threadsafe=True)
+    histogram = Histogram("connects", "Connects.", buckets=(0.1,), threadsafe=True)
+
+    def update(_):
+        for _ in range(10_000):
+            counter.inc(("ok",))
+            histogram.observe(0.05)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(update, range(8)))
+    assert counter.value(("ok",)) == 80_000
+    assert histogram.count() == 80_000
+
+
+def test_scrape_requires_the_metrics_token():
+    """Test that only the configured bearer token is accepted for scrapes."""
+    assert scrape_authorized("Bearer s3cret", "s3cret")
+    assert scrape_authorized("bearer s3cret", "s3cret")
+    assert not scrape_authorized("Bearer wrong", "s3cret")
+    assert not scrape_authorized("Basic s3cret", "s3cret")
+    assert not scrape_authorized(None, "s3cret")
+    assert not scrape_authorized("Bearer ", None)
+
+
+def test_metrics_endpoint_is_gated(monkeypatch):
+    """Test that /metrics is hidden without a token and rejects wrong tokens."""
+    from app.core.config import settings
+    from app.main import app
+
+    client = TestClient(app)
+    monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+    assert client.get("/metrics", headers={"Authorization": "Bearer anything"}).status_code == 404
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "s3cret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer nope"}).status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert response.status_code == 200
+    assert "http_requests_total" in response.text
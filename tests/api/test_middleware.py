@@ -0,0 +1,56 @@
+"""
+Unit tests for the pure ASGI request context middleware in app.core.middleware.
+"""
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse, Response
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.middleware import RequestContextMiddleware
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/state")
+    def read_state(request: Request):
+        return {"request_id": request.state.request_id}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b"a", b"b", b"c"]), media_type="text/plain")
+
+    @app.get("/override")
+    def override():
+        return Response(headers={"X-Frame-Options": "SAMEORIGIN"})
+
+    return app
+
+
+def test_request_id_matches_state_and_header():
+    """Test that the header carries the same ID handlers see on request.state."""
+    response = TestClient(make_app()).get("/state")
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"] == response.json()["request_id"]
+
+
+def test_process_time_and_security_headers():
+    """Test that timing and every configured security header are added."""
+    response = TestClient(make_app()).get("/state")
+    assert float(response.headers["X-Process-Time"]) >= 0
+    for header, value in settings.SECURITY_HEADERS.items():
+        assert response.headers[header] == value
+
+
+def test_streaming_response_passes_through():
+    """Test that streaming bodies are delivered intact with headers injected."""
+    response = TestClient(make_app()).get("/stream")
+    assert response.text == "abc"
+    assert "X-Request-ID" in response.headers
+
+
+def test_security_headers_replace_app_values():
+    """Test that configured security headers win over values set by handlers."""
+    response = TestClient(make_app()).get("/override")
+    assert response.headers.get_list("X-Frame-Options") == [settings.SECURITY_HEADERS["X-Frame-Options"]]
@@ -0,0 +1,110 @@
+"""
+Unit tests for the monthly exercise_logs partitions in app.db.partitions.
+"""
+from datetime import date
+from unittest.mock import MagicMock
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from app.db.partitions import (
+    add_months,
+    detach_partitions_before,
+    ensure_partitions,
+    partition_name,
+)
+from app.db.queries import LOGS_IN_RANGE
+from app.models.exercise_log import ExerciseLog
+
+
+# What the catalog returns for exercise_logs: every column but weight_kg
+STORED_COLUMNS = ", ".join(
+    column.name for column in ExerciseLog.__table__.columns if column.computed is None
+)
+
+
+def statements(conn: MagicMock) -> list[str]:
+    return [str(call.args[0]) for call in conn.execute.call_args_list]
+
+
+def test_month_arithmetic_and_names():
+    """Test that months roll over years and partitions are named by month."""
+    assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert partition_name(date(2026, 3, 1)) == "exercise_logs_p2026_03"
+
+
+def test_table_is_partitioned_by_date():
+    """Test that the Postgres DDL partitions by date, which is in the primary key."""
+    ddl = str(CreateTable(ExerciseLog.__table__).compile(dialect=postgresql.dialect()))
+    assert "PARTITION BY RANGE (date)" in ddl
+    assert "PRIMARY KEY (id, date)" in ddl
+    assert ExerciseLog.__mapper__.primary_key == (ExerciseLog.__table__.c.id,)
+
+
+def test_range_query_compares_the_partition_key_directly():
+    """Test that the progress query can be pruned: no cast on `date`."""
+    sql = str(LOGS_IN_RANGE.compile(dialect=postgresql.dialect()))
+    assert "exercise_logs.date >= " in sql and "exercise_logs.date < " in sql
+    assert "CAST" not in sql
+
+
+def test_ensure_partitions_creates_missing_months():
+    """Test that the default partition and each missing month up to the horizon are created."""
+    conn = MagicMock()
+    conn.scalar.return_value = False
+    created = ensure_partitions(conn, months_ahead=2, today=date(2026, 12, 15))
+    assert created == ["exercise_logs_p2026_12", "exercise_logs_p2027_01", "exercise_logs_p2027_02"]
+
+    ddl = statements(conn)
+    assert "PARTITION OF exercise_logs DEFAULT" in ddl[0]
+    assert (
+        "CREATE TABLE exercise_logs_p2027_01 PARTITION OF exercise_logs "
+        "FOR VALUES FROM ('2027-01-01 00:00:00') TO ('2027-02-01 00:00:00')"
+    ) in ddl
+
+
+def test_rows_in_default_partition_are_moved_into_new_month():
+    """Test that a month with rows in the default partition is built, filled and attached."""
+    conn = MagicMock()
+    # The month does not exist, the default partition does and holds rows
+    conn.scalar.side_effect = [False, True, True, STORED_COLUMNS]
+    ensure_partitions(conn, months_ahead=0, today=date(2026, 5, 2))
+
+    ddl = statements(conn)
+    assert "CREATE TABLE exercise_logs_p2026_05 (LIKE exercise_logs" in ddl[1]
+    assert "DELETE FROM exercise_logs_default" in ddl[2]
+    assert "ATTACH PARTITION exercise_logs_p2026_05" in ddl[3]
+
+
+def test_moved_rows_leave_out_generated_columns():
+    """Test that the staging table keeps weight_kg generated and the move never writes it."""
+    conn = MagicMock()
+    conn.scalar.side_effect = [False, True, True, STORED_COLUMNS]
+    ensure_partitions(conn, months_ahead=0, today=date(2026, 5, 2))
+
+    create, move = statements(conn)[1:3]
+    assert "INCLUDING GENERATED" in create
+    assert f"RETURNING {STORED_COLUMNS})" in move
+    assert f"INSERT INTO exercise_logs_p2026_05 ({STORED_COLUMNS}) SELECT {STORED_COLUMNS}" in move
+    assert "weight_kg" not in move and "*" not in move
+    # The column list excludes generated columns, by catalog
+    columns_query = str(conn.scalar.call_args_list[3].args[0])
+    assert "is_generated = 'NEVER'" in columns_query
+
+
+def test_detach_only_months_before_cutoff():
+    """Test that whole months before the cutoff are detached, and dropped on request."""
+    conn = MagicMock()
+    conn.scalars.return_value = [
+        "exercise_logs_p2026_02", "exercise_logs_default", "exercise_logs_p2026_01",
+        "exercise_logs_p2026_03",
+    ]
+    detached = detach_partitions_before(conn, date(2026, 3, 1), drop=True)
+    assert detached == ["exercise_logs_p2026_01", "exercise_logs_p2026_02"]
+    assert statements(conn) == [
+        "ALTER TABLE exercise_logs DETACH PARTITION exercise_logs_p2026_01",
+        "DROP TABLE exercise_logs_p2026_01",
+        "ALTER TABLE exercise_logs DETACH PARTITION exercise_logs_p2026_02",
+        "DROP TABLE exercise_logs_p2026_02",
+    ]
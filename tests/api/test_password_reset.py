@@ -0,0 +1,96 @@
+"""
+Unit tests for the hashed password reset token store in app.utils.password_reset.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.models.password_reset_token import PasswordResetToken
+from app.utils.password_reset import (
+    hash_reset_token,
+    issue_reset_token,
+    consume_reset_token,
+    purge_expired_reset_tokens,
+)
+
+
+@pytest.fixture
+def token_db():
+    """In-memory SQLite session containing only the reset token table."""
+    engine = create_engine("sqlite://")
+    PasswordResetToken.__table__.create(engine)
+    with Session(engine) as db:
+        yield db
+
+
+def test_hash_reset_token_is_sha256_hex():
+    """Test that tokens are stored as a deterministic 64-char digest."""
+    digest = hash_reset_token("abc")
+    assert digest == hash_reset_token("abc")
+    assert len(digest) == 64
+    assert digest != "abc"
+
+
+def test_issue_reset_token_stores_digest_only(token_db):
+    """Test that the raw token is never persisted."""
+    user_id = uuid.uuid4()
+    token = issue_reset_token(token_db, user_id)
+    token_db.commit()
+
+    stored = token_db.scalars(select(PasswordResetToken)).all()
+    assert len(stored) == 1
+    assert stored[0].token_hash == hash_reset_token(token)
+    assert stored[0].user_id == user_id
+
+
+def test_issue_reset_token_invalidates_previous(token_db):
+    """Test that issuing a new token replaces any outstanding one."""
+    user_id = uuid.uuid4()
+    first = issue_reset_token(token_db, user_id)
+    token_db.commit()
+    second = issue_reset_token(token_db, user_id)
+    token_db.commit()
+
+    assert consume_reset_token(token_db, first) is None
+    assert consume_reset_token(token_db, second) == user_id
+
+
+def test_consume_reset_token_is_single_use(token_db):
+    """Test that a token can only be consumed once."""
+    user_id = uuid.uuid4()
+    token = issue_reset_token(token_db, user_id)
+    token_db.commit()
+
+    assert consume_reset_token(token_db, token) == user_id
+    assert consume_reset_token(token_db, token) is None
+    assert consume_reset_token(token_db, "unknown-token") is None
+
+
+def test_consume_reset_token_rejects_expired(token_db):
+    """Test that expired tokens cannot be consumed."""
+    token_db.add(
+        PasswordResetToken(
+            token_hash=hash_reset_token("expired"),
+            user_id=uuid.uuid4(),
+            expires_at=datetime.now(timezone.utc) - timedelta(minutes=1),
+        )
+    )
+    token_db.commit()
+    assert consume_reset_token(token_db, "expired") is None
+
+
+def test_purge_expired_reset_tokens(token_db):
+    """Test that only expired tokens are removed by the purge."""
+    now = datetime.now(timezone.utc)
+    token_db.add_all([
+        PasswordResetToken(token_hash=hash_reset_token("old"), user_id=uuid.uuid4(), expires_at=now - timedelta(hours=2)),
+        PasswordResetToken(token_hash=hash_reset_token("new"), user_id=uuid.uuid4(), expires_at=now + timedelta(hours=1)),
+    ])
+    token_db.commit()
+
+    assert purge_expired_reset_tokens(token_db, now=now) == 1
+    remaining = token_db.scalars(select(PasswordResetToken.token_hash)).all()
+    assert remaining == [hash_reset_token("new")]
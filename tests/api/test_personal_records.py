@@ -0,0 +1,101 @@
+"""
+Unit tests for the incrementally maintained personal records in
+app.utils.personal_records, against a SQLite file shared by a sync and an
+async engine.
+"""
+import uuid
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.enums import WeightUnit
+from app.models.exercise import Exercise
+from app.models.personal_record import PersonalRecord
+from app.models.user import User
+from app.models.workout import Workout
+from app.utils.personal_records import record_added, record_removed, records_changed
+from log_database import LogWriter, databases, make_log
+
+
+def record_writer(async_maker) -> LogWriter:
+    return LogWriter(
+        async_maker,
+        record_added,
+        lambda session, log: records_changed(session, log.user_id, log.exercise_id),
+        record_removed,
+    )
+
+
+def records(db: Session) -> dict:
+    db.expire_all()
+    return {
+        record.rep_max: (round(record.weight_kg, 2), record.achieved_at, record.log_id)
+        for record in db.scalars(select(PersonalRecord))
+    }
+
+
+def test_records_follow_adds_edits_and_deletes(databases):
+    """Test that each write reports the records it set and keeps the table equal to a recalculation."""
+    db, async_maker, (user_id, exercise_id) = databases
+
+    writer = record_writer(async_maker)
+
+    def add(day: int, weight, reps: int, unit=WeightUnit.KG):
+        return writer.add(make_log(exercise_id, user_id, day, weight, unit, reps))
+
+    first, new = add(1, 100.0, 5)
+    assert new == [1, 5]
+    _, new = add(2, 100.0, 5)
+    assert new == []  # a tie keeps the earlier record
+    heavy, new = add(3, 264.5, 1, WeightUnit.LBS)
+    assert new == [1]
+    tens, new = add(4, 80.0, 12)
+    assert new == [10]
+    assert add(5, None, 20)[1] == []
+
+    assert records(db) == {
+        1: (119.98, datetime(2026, 1, 3), heavy.id),
+        5: (100.0, datetime(2026, 1, 1), first.id),
+        10: (80.0, datetime(2026, 1, 4), tens.id),
+    }
+
+    writer.delete(first.id)
+    assert records(db)[5][1] == datetime(2026, 1, 2)
+    writer.edit(tens.id, reps=8)
+    assert 10 not in records(db)
+    assert records(db)[5][:2] == (100.0, datetime(2026, 1, 2))
+    writer.delete(heavy.id)
+    assert records(db)[1][:2] == (100.0, datetime(2026, 1, 2))
+
+    # A backdated tie takes the record over, as a recalculation would
+    backdated, new = add(1, 100.0, 5)
+    assert new == [1, 5]
+    assert records(db)[5] == (100.0, datetime(2026, 1, 1), backdated.id)
+    writer.edit(backdated.id, sets=4)
+    assert records(db)[5][2] == backdated.id
+
+
+def test_records_are_deleted_with_their_exercise_and_user(databases):
+    """Test that the cascading foreign keys clean up records of deleted exercises and users."""
+    db, async_maker, (user_id, exercise_id) = databases
+    writer = record_writer(async_maker)
+    engine = db.get_bind()
+
+    with Session(engine) as session:
+        workout = session.scalar(select(Workout))
+        other = Exercise(id=uuid.uuid4(), name="Press", workout=workout, user_id=user_id)
+        session.add(other)
+        session.commit()
+        other_id = other.id
+    writer.add(make_log(exercise_id, user_id, 1, 100.0, reps=10))
+    writer.add(make_log(other_id, user_id, 1, 100.0, reps=10))
+
+    with Session(engine) as session:
+        session.delete(session.get(Exercise, exercise_id))
+        session.commit()
+        assert {record.exercise_id for record in session.scalars(select(PersonalRecord))} == {other_id}
+
+        session.delete(session.get(User, user_id))
+        session.commit()
+        assert session.scalars(select(PersonalRecord)).all() == []
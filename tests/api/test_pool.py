@@ -0,0 +1,88 @@
+"""
+Unit tests for the connection pool configuration in app.db.pool.
+"""
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool, QueuePool
+
+from app.core.metrics import DB_PRE_PINGS
+from app.db.pool import engine_options, install_idle_pre_ping
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_pooled_options_follow_settings():
+    """Test that pooled mode sizes the pool and leaves pinging to the idle policy."""
+    with patch("app.db.pool.settings.DB_POOL_MODE", "pooled"), \
+            patch("app.db.pool.settings.DB_POOL_SIZE", 20), \
+            patch("app.db.pool.settings.DB_POOL_RECYCLE", 600):
+        options = engine_options()
+        with patch("app.db.pool.settings.DB_POOL_PRE_PING_IDLE", 0):
+            always_ping = engine_options()
+    assert options["pool_size"] == 20
+    assert options["pool_recycle"] == 600
+    assert options["pool_pre_ping"] is False
+    assert always_ping["pool_pre_ping"] is True
+
+
+def test_serverless_mode_uses_null_pool():
+    """Test that serverless mode keeps no connections between sessions."""
+    with patch("app.db.pool.settings.DB_POOL_MODE", "serverless"):
+        assert engine_options() == {"poolclass": NullPool}
+        assert engine_options(asyncpg=True) == {"poolclass": NullPool}
+
+
+def test_pgbouncer_mode_disables_prepared_statements():
+    """Test that pgbouncer mode turns off asyncpg statement caching and reuse of names."""
+    with patch("app.db.pool.settings.DB_POOL_MODE", "pgbouncer"):
+        options = engine_options(asyncpg=True)
+        assert "connect_args" not in engine_options()
+    connect_args = options["connect_args"]
+    assert options["poolclass"] is NullPool
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    name_func = connect_args["prepared_statement_name_func"]
+    assert name_func() != name_func()
+
+
+def test_only_idle_connections_are_pinged():
+    """Test that a checkout pings the connection only after the idle threshold."""
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=1)
+    install_idle_pre_ping(engine, idle=60, name="idle-test")
+    clock = Clock()
+    ok = ("idle-test", "ok")
+    with patch("app.db.pool.time.monotonic", clock):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        clock.now += 10
+        with engine.connect():
+            pass
+        assert DB_PRE_PINGS.value(ok) == 0
+        clock.now += 61
+        with engine.connect():
+            pass
+    assert DB_PRE_PINGS.value(ok) == 1
+
+
+def test_failed_ping_replaces_connection():
+    """Test that an idle connection failing its ping is swapped for a new one."""
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=1)
+    install_idle_pre_ping(engine, idle=60, name="failover-test")
+    clock = Clock()
+    with patch("app.db.pool.time.monotonic", clock):
+        with engine.connect() as conn:
+            first = conn.connection.dbapi_connection
+        clock.now += 120
+        with patch.object(engine.dialect, "do_ping", side_effect=[OSError("server closed")]):
+            with engine.connect() as conn:
+                assert conn.execute(text("SELECT 1")).scalar() == 1
+                second = conn.connection.dbapi_connection
+    assert second is not first
+    assert DB_PRE_PINGS.value(("failover-test", "failed")) == 1
@@ -0,0 +1,112 @@
+"""
+Unit tests for on-demand request profiling in app.core.profiling.
+"""
+import asyncio
+import json
+import time
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.middleware import RequestContextMiddleware
+from app.core.profiling import SamplingProfiler, is_admin_request, requested_profile_format
+from app.core.security import create_access_token
+from app.models.enums import UserRole
+
+
+def busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def make_app(is_admin: bool) -> FastAPI:
+    async def authorizer(scope):
+        return is_admin
+
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware, profile_authorizer=authorizer)
+
+    @app.get("/progress")
+    def progress():
+        busy(0.05)
+        return {"ok": True}
+
+    return app
+
+
+def test_requested_profile_format():
+    """Test that the header and query flag select a profile format."""
+    assert requested_profile_format({"query_string": b"", "headers": []}) is None
+    assert requested_profile_format({"query_string": b"profile=1", "headers": []}) == "speedscope"
+    assert requested_profile_format(
+        {"query_string": b"", "headers": [(b"x-profile", b"collapsed")]}
+    ) == "collapsed"
+    assert requested_profile_format({"query_string": b"profile=bogus", "headers": []}) is None
+
+
+def test_admin_request_is_profiled_to_speedscope(tmp_path):
+    """Test that an admin's flagged request is saved under its X-Request-ID."""
+    with patch("app.core.middleware.settings.PROFILE_DIR", str(tmp_path)):
+        response = TestClient(make_app(is_admin=True)).get("/progress?profile=1")
+    request_id = response.headers["X-Request-ID"]
+    assert response.headers["X-Profile"] == f"{request_id}.speedscope.json"
+
+    profile = json.loads((tmp_path / f"{request_id}.speedscope.json").read_text())
+    frame_names = {frame["name"] for frame in profile["shared"]["frames"]}
+    assert "busy" in frame_names
+    assert profile["profiles"] and profile["profiles"][0]["type"] == "sampled"
+
+
+def test_non_admin_request_is_not_profiled(tmp_path):
+    """Test that the trigger is ignored for callers who are not admins."""
+    with patch("app.core.middleware.settings.PROFILE_DIR", str(tmp_path)):
+        response = TestClient(make_app(is_admin=False)).get(
+            "/progress", headers={"X-Profile": "1"}
+        )
+    assert response.status_code == 200
+    assert "X-Profile" not in response.headers
+    assert not list(tmp_path.iterdir())
+
+
+def bearer_scope(token: str) -> dict:
+    return {"headers": [(b"authorization", f"Bearer {token}".encode())]}
+
+
+def test_tokens_without_admin_claim_never_open_a_session():
+    """Test that only tokens claiming the admin role are checked in the database."""
+    session_factory = MagicMock()
+    user_token = create_access_token(uuid.uuid4(), role=UserRole.USER.value)
+    legacy_token = create_access_token(uuid.uuid4())
+    with patch("app.core.profiling.AsyncSessionLocal", session_factory):
+        for scope in (bearer_scope(user_token), bearer_scope(legacy_token), bearer_scope("junk")):
+            assert asyncio.run(is_admin_request(scope)) is False
+    session_factory.assert_not_called()
+
+
+def test_admin_claim_is_confirmed_in_the_database():
+    """Test that an admin claim is only trusted if the user is still an admin."""
+    token = create_access_token(uuid.uuid4(), role=UserRole.ADMIN.value)
+
+    def session_factory(role):
+        session = MagicMock()
+        session.__aenter__.return_value.scalar = AsyncMock(return_value=role)
+        return MagicMock(return_value=session)
+
+    for role, expected in ((UserRole.ADMIN, True), (UserRole.USER, False)):
+        with patch("app.core.profiling.AsyncSessionLocal", session_factory(role)) as factory:
+            assert asyncio.run(is_admin_request(bearer_scope(token))) is expected
+        factory.assert_called_once()
+
+
+def test_collapsed_output():
+    """Test that collapsed stacks are rooted at the thread name."""
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    busy(0.03)
+    profiler.stop()
+    lines = profiler.to_collapsed().splitlines()
+    assert any("busy (test_profiling.py:" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
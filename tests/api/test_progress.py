@@ -1,9 +1,14 @@
 from fastapi.testclient import TestClient
+import msgpack
 import pytest
 from app.core.config import settings
 import random
 import string
-from datetime import date, timedelta
+from datetime import date, datetime, time, timedelta
+from uuid import UUID
+
+from app.models.enums import WeightUnit
+from app.models.exercise_log import ExerciseLog
 
 # --- Sync Helper Functions ---
 
@@ -152,4 +157,236 @@ def test_no_progress_data_found(client: TestClient):
     response = client.get(f"{settings.API_V1_STR}/progress/exercise/{exercise_id}", headers=headers, params={"target_unit": "kg"})
 
     assert response.status_code == 404
-    assert response.json() == {"detail": "No logs found for this exercise in the given date range."} 
\ No newline at end of file
+    assert response.json() == {"detail": "No logs found for this exercise in the given date range."} 
+
+@pytest.mark.parametrize("method", ["theil_sen", "huber"])
+def test_robust_trend_methods_report_confidence_interval(client: TestClient, method: str):
+    """Test that the robust trend methods return the slope with its confidence interval."""
+    test_data = setup_user_with_progress_data(client)
+    response = client.get(
+        f"{settings.API_V1_STR}/progress/exercise/{test_data['exercise_id']}",
+        headers=test_data["headers"],
+        params={"target_unit": "kg", "trend_method": method},
+    )
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["trend_method"] == method
+    # The weight falls by 2 kg per day over the ten logs
+    assert data["trend"] == pytest.approx(-2.0)
+    assert data["trend_ci_low"] <= data["trend"] <= data["trend_ci_high"]
+    assert data["trend_ci_low"] == pytest.approx(-2.0, abs=1e-6)
+    assert data["trend_ci_high"] == pytest.approx(-2.0, abs=1e-6)
+
+
+def test_theil_sen_trend_resists_an_outlier(client: TestClient):
+    """Test that one mis-entered log moves the OLS trend but not the Theil-Sen one."""
+    test_data = setup_user_with_progress_data(client)
+    outlier = {
+        "exercise_id": test_data["exercise_id"], "weight": 500, "reps": 10, "sets": 3,
+        "date": (date.today() - timedelta(days=10)).isoformat(), "weight_unit": "kg",
+    }
+    assert client.post(
+        f"{settings.API_V1_STR}/exercise-logs/", json=outlier, headers=test_data["headers"]
+    ).status_code == 201
+
+    trends = {}
+    for method in ("ols", "theil_sen"):
+        response = client.get(
+            f"{settings.API_V1_STR}/progress/exercise/{test_data['exercise_id']}",
+            headers=test_data["headers"],
+            params={"target_unit": "kg", "trend_method": method},
+        )
+        assert response.status_code == 200, response.text
+        trends[method] = response.json()
+    assert trends["ols"]["trend"] < -10
+    assert trends["theil_sen"]["trend"] == pytest.approx(-2.0)
+    assert trends["theil_sen"]["trend_ci_low"] <= -2.0 <= trends["theil_sen"]["trend_ci_high"]
+
+
+def test_large_trend_fits_run_in_the_threadpool(client: TestClient, monkeypatch):
+    """Test that trends from many points are fitted off the event loop."""
+    from app.api.v1.endpoints import progress
+
+    offloaded = []
+
+    async def record_run_in_threadpool(func, *args):
+        offloaded.append(func)
+        return func(*args)
+
+    test_data = setup_user_with_progress_data(client)
+    monkeypatch.setattr(progress, "THREAD_MINIMUM_POINTS", 10)
+    monkeypatch.setattr(progress, "run_in_threadpool", record_run_in_threadpool)
+    url = f"{settings.API_V1_STR}/progress/exercise/{test_data['exercise_id']}"
+    params = {"target_unit": "kg", "trend_method": "huber"}
+
+    response = client.get(url, headers=test_data["headers"], params=params)
+    assert response.status_code == 200, response.text
+    assert offloaded == [progress.fit_trend]
+    assert response.json()["trend"] == pytest.approx(-2.0)
+
+    # Fewer points than the threshold are fitted inline
+    params["start_date"] = (date.today() - timedelta(days=4)).isoformat()
+    assert client.get(url, headers=test_data["headers"], params=params).status_code == 200
+    assert len(offloaded) == 1
+
+
+def setup_user_with_session_logs(client: TestClient, db_session) -> dict:
+    """
+    Create an exercise with two sessions: yesterday, two logs created through
+    the API, and today, one API log plus one inserted with a time of day.
+    """
+    headers = create_user_and_get_headers(client)
+    workout_res = client.post(f"{settings.API_V1_STR}/workouts/", json={"name": "Sessions"}, headers=headers)
+    exercise_res = client.post(
+        f"{settings.API_V1_STR}/exercises/",
+        json={"name": f"Bench {random_string(5)}", "workout_id": workout_res.json()["id"]},
+        headers=headers,
+    )
+    assert exercise_res.status_code == 201, exercise_res.text
+    exercise_id = exercise_res.json()["id"]
+    today = date.today()
+    for day, weight, reps, sets in (
+        (today - timedelta(days=1), 100, 5, 3),
+        (today - timedelta(days=1), 80, 10, 2),
+        (today, 110, 3, 1),
+    ):
+        log_res = client.post(
+            f"{settings.API_V1_STR}/exercise-logs/",
+            json={
+                "exercise_id": exercise_id, "weight": weight, "reps": reps, "sets": sets,
+                "date": day.isoformat(), "weight_unit": "kg",
+            },
+            headers=headers,
+        )
+        assert log_res.status_code == 201, log_res.text
+
+    # The API stores dates at midnight; imported logs can carry a time of day
+    user_id = client.get(f"{settings.API_V1_STR}/users/me", headers=headers).json()["id"]
+    db_session.add(ExerciseLog(
+        exercise_id=UUID(exercise_id), user_id=UUID(user_id), date=datetime.combine(today, time(18, 30)),
+        weight=90, weight_unit=WeightUnit.KG, reps=8, sets=2,
+    ))
+    db_session.commit()
+    return {"headers": headers, "exercise_id": exercise_id}
+
+
+@pytest.mark.parametrize("metric, expected", [
+    ("e1rm_epley", [100 * (1 + 5 / 30), 110 * (1 + 3 / 30)]),
+    ("e1rm_brzycki", [100 * 36 / 32, 110 * 36 / 34]),
+    ("tonnage", [100 * 5 * 3 + 80 * 10 * 2, 110 * 3 * 1 + 90 * 8 * 2]),
+    ("intensity", [100 * 100 / 121, 100 * 110 / 121]),
+])
+def test_session_metrics_by_day(client: TestClient, db_session, metric: str, expected: list):
+    """Test that each session metric is charted with one point per calendar day."""
+    test_data = setup_user_with_session_logs(client, db_session)
+    response = client.get(
+        f"{settings.API_V1_STR}/progress/exercise/{test_data['exercise_id']}",
+        headers=test_data["headers"],
+        params={"target_unit": "kg", "metric": metric},
+    )
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["metric"] == metric
+    today = date.today()
+    # Today's API log and the 18:30 log form a single session
+    assert [point["date"] for point in data["data_points"]] == [
+        (today - timedelta(days=1)).isoformat(), today.isoformat(),
+    ]
+    assert [point["value"] for point in data["data_points"]] == pytest.approx(expected)
+    assert data["personal_best"] == pytest.approx(max(expected))
+    last = data["data_points"][-1]
+    assert (last["weight"], last["reps"], last["sets"]) == (pytest.approx(110), 3 + 8 * 2, 1 + 2)
+
+
+def test_invalid_metric_is_rejected(client: TestClient):
+    """Test that an unknown metric is a validation error."""
+    test_data = setup_user_with_progress_data(client)
+    response = client.get(
+        f"{settings.API_V1_STR}/progress/exercise/{test_data['exercise_id']}",
+        headers=test_data["headers"],
+        params={"target_unit": "kg", "metric": "volume"},
+    )
+    assert response.status_code == 422
+
+
+def test_progress_negotiates_msgpack_and_columnar(client: TestClient):
+    """Test that progress responses honour Accept: application/msgpack and shape=columnar."""
+    test_data = setup_user_with_progress_data(client)
+    url = f"{settings.API_V1_STR}/progress/exercise/{test_data['exercise_id']}"
+    params = {"target_unit": "kg"}
+    progress = client.get(url, headers=test_data["headers"], params=params).json()
+
+    packed = client.get(url, headers={**test_data["headers"], "Accept": "application/msgpack"}, params=params)
+    assert packed.status_code == 200, packed.text
+    assert packed.headers["content-type"] == "application/msgpack"
+    assert "Accept" in packed.headers["vary"].split(", ")
+    assert msgpack.unpackb(packed.content) == progress
+
+    columnar = client.get(url, headers=test_data["headers"], params={**params, "shape": "columnar"})
+    assert columnar.status_code == 200, columnar.text
+    assert columnar.headers["content-type"] == "application/json"
+    assert "Accept" in columnar.headers["vary"].split(", ")
+    data = columnar.json()
+    points = data.pop("data_points")
+    assert points["date"] == [point["date"] for point in progress["data_points"]]
+    assert points["weight"] == [point["weight"] for point in progress["data_points"]]
+    assert data == {key: value for key, value in progress.items() if key != "data_points"}
+
+    # Workout progress: a list of columnar progress responses in MessagePack
+    workout = client.get(
+        f"{settings.API_V1_STR}/progress/workout/{test_data['workout_id']}",
+        headers={**test_data["headers"], "Accept": "application/msgpack"},
+        params={**params, "shape": "columnar"},
+    )
+    assert workout.headers["content-type"] == "application/msgpack"
+    [exercise] = msgpack.unpackb(workout.content)
+    assert exercise["data_points"]["date"] == points["date"]
+
+
+def test_personal_records_endpoint(client: TestClient):
+    """Test that personal records are listed per exercise, converted and filterable by exercise."""
+    test_data = setup_user_with_progress_data(client)
+    headers, exercise_id = test_data["headers"], test_data["exercise_id"]
+    url = f"{settings.API_V1_STR}/progress/records"
+    other_res = client.post(
+        f"{settings.API_V1_STR}/exercises/",
+        json={"name": f"Other {random_string(5)}", "workout_id": test_data["workout_id"]},
+        headers=headers,
+    )
+    other_id = other_res.json()["id"]
+    log_res = client.post(f"{settings.API_V1_STR}/exercise-logs/", json={
+        "exercise_id": other_id, "weight": 40, "reps": 3, "sets": 1, "weight_unit": "kg",
+    }, headers=headers)
+    assert log_res.json()["new_records"] == [1]
+
+    response = client.get(url, headers=headers, params={"target_unit": "kg"})
+    assert response.status_code == 200, response.text
+    by_exercise = {}
+    for record in response.json():
+        by_exercise.setdefault(record["exercise_id"], []).append(record)
+    assert set(by_exercise) == {exercise_id, other_id}
+    # The heaviest log, 68 kg x 10 nine days ago, holds every rep max
+    heaviest = (date.today() - timedelta(days=9)).isoformat()
+    records = by_exercise[exercise_id]
+    assert [record["rep_max"] for record in records] == [1, 5, 10]
+    assert all(record["weight"] == pytest.approx(68) for record in records)
+    assert all(record["achieved_at"][:10] == heaviest for record in records)
+    assert len({record["log_id"] for record in records}) == 1
+    [other] = by_exercise[other_id]
+    assert (other["rep_max"], other["weight"], other["log_id"]) == (1, pytest.approx(40), log_res.json()["id"])
+
+    filtered = client.get(url, headers=headers, params={"target_unit": "lbs", "exercise_id": exercise_id})
+    assert filtered.status_code == 200, filtered.text
+    assert [record["rep_max"] for record in filtered.json()] == [1, 5, 10]
+    assert all(record["exercise_id"] == exercise_id for record in filtered.json())
+    assert all(record["weight_unit"] == "lbs" for record in filtered.json())
+    assert filtered.json()[0]["weight"] == pytest.approx(68 * 2.20462, abs=0.01)
+
+    # Another user has no records, even when asking for this exercise
+    other_headers = create_user_and_get_headers(client)
+    assert client.get(url, headers=other_headers, params={"target_unit": "kg"}).json() == []
+    assert client.get(
+        url, headers=other_headers, params={"target_unit": "kg", "exercise_id": exercise_id}
+    ).json() == []
@@ -0,0 +1,153 @@
+"""
+Unit tests for the prebuilt statements in app.db.queries.
+"""
+import uuid
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.engine.default import CACHE_HIT
+from sqlalchemy.orm import Session
+
+from app.db.queries import (
+    LOGS_IN_RANGE,
+    OWNED_EXERCISE,
+    OWNED_EXERCISE_ID,
+    SESSION_METRICS,
+    USER_LOGS_PAGE,
+    USER_WORKOUTS,
+    log_range,
+)
+from app.models.base import Base
+from app.models.enums import WeightUnit
+from app.models.exercise import Exercise
+from app.models.exercise_log import ExerciseLog
+from app.models.user import User
+from log_database import make_log, seed_exercise
+
+
+@pytest.fixture
+def db():
+    """In-memory SQLite session with two users, each owning one exercise with logs."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        for email in ("a@example.com", "b@example.com"):
+            exercise = seed_exercise(session, email)
+            session.add_all(
+                make_log(exercise.id, exercise.user_id, day, 100.0 + day) for day in range(1, 6)
+            )
+        session.commit()
+        yield session
+
+
+def owner_and_exercise(db: Session):
+    return db.execute(select(Exercise.user_id, Exercise.id).order_by(Exercise.name)).first()
+
+
+def test_ownership_checks_only_match_the_owner(db):
+    """Test that the ownership statements filter by both bound ids."""
+    user_id, exercise_id = owner_and_exercise(db)
+    other = db.scalar(select(User.id).where(User.id != user_id))
+    params = {"exercise_id": exercise_id, "user_id": user_id}
+
+    assert db.scalar(OWNED_EXERCISE_ID, params) == exercise_id
+    assert db.scalars(OWNED_EXERCISE, params).one().id == exercise_id
+    assert db.scalar(OWNED_EXERCISE_ID, {**params, "user_id": other}) is None
+    assert db.scalars(OWNED_EXERCISE, {**params, "user_id": other}).first() is None
+
+
+def test_statements_take_paging_and_date_range_parameters(db):
+    """Test that offset/limit and the inclusive date range are bound per execution."""
+    user_id, exercise_id = owner_and_exercise(db)
+
+    page = db.execute(USER_LOGS_PAGE, {"user_id": user_id, "skip": 1, "limit": 2}).all()
+    assert [row.date.day for row in page] == [2, 3]
+    rest = db.execute(USER_LOGS_PAGE, {"user_id": user_id, "skip": 3, "limit": 10}).all()
+    assert [row.date.day for row in rest] == [4, 5]
+
+    logs = db.scalars(LOGS_IN_RANGE, {
+        "exercise_id": exercise_id,
+        "user_id": user_id,
+        **log_range(date(2026, 1, 2), date(2026, 1, 4)),
+    }).all()
+    assert [log.date.day for log in logs] == [2, 3, 4]
+
+    workouts = db.scalars(USER_WORKOUTS, {"user_id": user_id}).all()
+    assert [len(workout.exercises) for workout in workouts] == [1]
+
+
+def test_repeated_execution_reuses_compiled_statement(db):
+    """Test that executing a prebuilt statement again hits the compiled cache."""
+    user_id, exercise_id = owner_and_exercise(db)
+    conn = db.connection()
+    first = conn.execute(OWNED_EXERCISE_ID, {"exercise_id": exercise_id, "user_id": user_id})
+    second = conn.execute(OWNED_EXERCISE_ID, {"exercise_id": uuid.uuid4(), "user_id": user_id})
+    assert first.scalar() == exercise_id and second.scalar() is None
+    assert second.context.cache_hit is CACHE_HIT
+    assert first.context.compiled is second.context.compiled
+
+
+def test_weight_kg_is_generated_across_units(db):
+    """Test that weight_kg is stored in kg whatever the logged unit, for SQL aggregates."""
+    user_id, exercise_id = owner_and_exercise(db)
+    log = make_log(exercise_id, user_id, datetime(2026, 1, 6), 242.5, WeightUnit.LBS)
+    db.add(log)
+    db.commit()
+    assert log.weight_kg == pytest.approx(110.0, abs=0.01)
+
+    best = db.scalar(
+        select(func.max(ExerciseLog.weight_kg)).where(ExerciseLog.exercise_id == exercise_id)
+    )
+    assert best == pytest.approx(110.0, abs=0.01)
+
+
+def test_session_metrics_are_computed_per_day_in_kg(db):
+    """Test that e1RM, tonnage and intensity are aggregated per session over weight_kg."""
+    user_id, exercise_id = owner_and_exercise(db)
+    db.add_all([
+        make_log(exercise_id, user_id, datetime(2026, 1, 5), 264.5, WeightUnit.LBS, reps=1, sets=1),
+        make_log(exercise_id, user_id, datetime(2026, 1, 5), 50.0, reps=40, sets=None),
+    ])
+    db.commit()
+
+    sessions = db.execute(
+        SESSION_METRICS,
+        {"exercise_id": exercise_id, "user_id": user_id, **log_range(date(2026, 1, 1), date(2026, 1, 5))},
+    ).all()
+    assert [session.date.day for session in sessions] == [1, 2, 3, 4, 5]
+    first, last = sessions[0], sessions[-1]
+    # 101 kg x 5 reps x 3 sets
+    assert (first.reps, first.sets, first.tonnage) == (15, 3, 1515.0)
+    assert first.e1rm_epley == pytest.approx(101 * (1 + 5 / 30))
+    assert first.e1rm_brzycki == pytest.approx(101 * 36 / 32)
+    # The best log of the day: a single rep is its own e1RM, and Brzycki
+    # ignores the 40-rep set
+    assert last.top_kg == pytest.approx(119.98, abs=0.01)
+    assert last.e1rm_epley == pytest.approx(105 * (1 + 5 / 30))
+    assert last.e1rm_brzycki == pytest.approx(119.98, abs=0.01)
+    assert (last.reps, last.sets) == (15 + 1 + 40, 3 + 1 + 1)
+    assert last.tonnage == pytest.approx(105 * 15 + 119.98 + 50 * 40, abs=0.01)
+    best_e1rm = max(session.e1rm_epley for session in sessions)
+    assert last.intensity == pytest.approx(100 * last.top_kg / best_e1rm)
+
+
+def test_session_metrics_group_logs_by_calendar_day(db):
+    """Test that logs on the same day at different times form one session."""
+    user_id, exercise_id = owner_and_exercise(db)
+    db.add_all([
+        make_log(exercise_id, user_id, datetime(2026, 2, 3, 7, 15), 100.0, sets=2),
+        make_log(exercise_id, user_id, datetime(2026, 2, 3, 18, 40), 110.0, reps=3, sets=1),
+    ])
+    db.commit()
+
+    sessions = db.execute(
+        SESSION_METRICS,
+        {"exercise_id": exercise_id, "user_id": user_id, **log_range(date(2026, 2, 3), date(2026, 2, 3))},
+    ).all()
+    assert len(sessions) == 1
+    session = sessions[0]
+    assert session.date == date(2026, 2, 3)
+    assert session.top_kg == pytest.approx(110.0)
+    assert (session.reps, session.sets) == (5 * 2 + 3, 3)
+    assert session.tonnage == pytest.approx(100 * 5 * 2 + 110 * 3)
@@ -0,0 +1,86 @@
+"""
+Unit tests for the per-request query audit in app.core.query_audit.
+"""
+import logging
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.core.middleware import RequestContextMiddleware
+from app.core.query_audit import (
+    assert_max_queries,
+    count_queries,
+    fingerprint,
+    install_query_audit,
+)
+
+
+def make_engine():
+    return create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+
+
+def make_app(engine) -> FastAPI:
+    install_query_audit(engine)
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/workouts/{workout_id}")
+    def read_workout_exercises(workout_id: int):
+        with engine.connect() as conn:
+            for exercise_id in range(8):
+                conn.execute(text("SELECT :id AS id"), {"id": exercise_id})
+        return {"id": workout_id}
+
+    return app
+
+
+def test_fingerprint_ignores_values():
+    """Test that statements differing only in values share a fingerprint."""
+    assert fingerprint("SELECT * FROM logs WHERE id = %(id_1)s") == fingerprint(
+        "SELECT  *  FROM logs\n WHERE id = %(id_2)s"
+    )
+    assert fingerprint("SELECT 1 FROM t WHERE name = 'a'") == "SELECT ? FROM t WHERE name = ?"
+    assert fingerprint("SELECT x FROM t WHERE id IN (%(p_1)s, %(p_2)s, %(p_3)s)") == fingerprint(
+        "SELECT x FROM t WHERE id IN (%(p_1)s)"
+    )
+    assert fingerprint("SELECT x::uuid FROM t") == "SELECT x::uuid FROM t"
+
+
+def test_repeated_statements_are_logged_with_endpoint(caplog):
+    """Test that dev mode flags a fingerprint repeated past the threshold."""
+    client = TestClient(make_app(make_engine()))
+    with patch("app.core.query_audit.settings.QUERY_AUDIT_MODE", "dev"), \
+            caplog.at_level(logging.WARNING, logger="app.query_audit"):
+        client.get("/workouts/1")
+    records = [r for r in caplog.records if r.name == "app.query_audit"]
+    assert len(records) == 1
+    assert records[0].endpoint == "read_workout_exercises"
+    assert records[0].route == "/workouts/{workout_id}"
+    assert records[0].executions == 8
+
+
+def test_audit_off_by_default(caplog):
+    """Test that nothing is recorded when auditing is disabled."""
+    client = TestClient(make_app(make_engine()))
+    with caplog.at_level(logging.WARNING, logger="app.query_audit"):
+        client.get("/workouts/1")
+    assert not [r for r in caplog.records if r.name == "app.query_audit"]
+
+
+def test_query_budget():
+    """Test that exceeding a query budget fails with the top fingerprints."""
+    engine = make_engine()
+    with count_queries(engine) as audit, engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert audit.total == 1
+
+    with pytest.raises(AssertionError, match="Executed 3 queries, budget is 2"):
+        with assert_max_queries(2, engine), engine.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("SELECT 1"))
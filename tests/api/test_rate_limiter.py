@@ -1,32 +1,369 @@
 """
 Unit tests for rate limiting utility in app.utils.rate_limiter.
 """
+import asyncio
+import uuid
 import pytest
-from unittest.mock import patch, MagicMock
-from app.utils.rate_limiter import RateLimiter
-from fastapi import HTTPException
+from unittest.mock import MagicMock, patch
+from fakeredis import FakeAsyncRedis, FakeServer
+from app.utils.rate_limiter import (
+    RateLimiter,
+    HybridRateLimiter,
+    RateLimitResult,
+    FixedWindowAlgorithm,
+    GCRAAlgorithm,
+    SlidingWindowCounterAlgorithm,
+    build_algorithm,
+    rate_limit,
+    rate_limit_identity,
+    RateLimitMiddleware,
+)
+from app.core.metrics import RATE_LIMIT_REJECTIONS
+from app.core.security import create_access_token
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+
+def make_request(host: str = '127.0.0.1') -> MagicMock:
+    mock_request = MagicMock()
+    mock_request.client.host = host
+    return mock_request
+
+
+def run_requests(limiter_kwargs: dict, count: int, host: str = '127.0.0.1'):
+    """Send `count` requests through a fresh limiter backed by fakeredis."""
+    async def _run():
+        client = FakeAsyncRedis(decode_responses=True)
+        limiter = RateLimiter(client=client, **limiter_kwargs)
+        for _ in range(count):
+            await limiter.check_rate_limit(make_request(host))
+        return client
+    return asyncio.run(_run())
+
 
 def test_check_rate_limit_allows_within_limits():
     """Test that requests within limits do not raise an exception."""
-    limiter = RateLimiter(requests_per_minute=2, requests_per_hour=5, requests_per_day=10)
-    mock_request = MagicMock()
-    mock_request.client.host = '127.0.0.1'
-    with patch('app.utils.rate_limiter.redis_client') as mock_redis:
-        mock_redis.incr.return_value = 1
-        mock_redis.expire.return_value = None
-        # Should not raise
-        import asyncio
-        asyncio.run(limiter.check_rate_limit(mock_request))
-
-@pytest.mark.parametrize('minute, hour, day', [(3, 1, 1), (1, 6, 1), (1, 1, 11)])
-def test_check_rate_limit_raises(minute, hour, day):
+    # Should not raise
+    run_requests(dict(requests_per_minute=2, requests_per_hour=5, requests_per_day=10), 2)
+
+
+@pytest.mark.parametrize('limits, count, window', [
+    (dict(requests_per_minute=2, requests_per_hour=5, requests_per_day=10), 3, 'minute'),
+    (dict(requests_per_minute=10, requests_per_hour=2, requests_per_day=10), 3, 'hour'),
+    (dict(requests_per_minute=10, requests_per_hour=10, requests_per_day=2), 3, 'day'),
+])
+def test_check_rate_limit_raises(limits, count, window):
     """Test that exceeding any limit raises HTTPException."""
-    limiter = RateLimiter(requests_per_minute=2, requests_per_hour=5, requests_per_day=10)
-    mock_request = MagicMock()
-    mock_request.client.host = '127.0.0.1'
-    with patch('app.utils.rate_limiter.redis_client') as mock_redis:
-        mock_redis.incr.side_effect = [minute, hour, day]
-        mock_redis.expire.return_value = None
-        import asyncio
-        with pytest.raises(HTTPException):
-            asyncio.run(limiter.check_rate_limit(mock_request)) 
\ No newline at end of file
+    with pytest.raises(HTTPException) as exc_info:
+        run_requests(limits, count)
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.detail == f"Too many requests per {window}"
+
+
+def test_check_rate_limit_sets_expiry_once():
+    """Test that all window counters are created with a TTL in one call."""
+    async def _run():
+        client = FakeAsyncRedis(decode_responses=True)
+        limiter = RateLimiter(client=client)
+        await limiter.check_rate_limit(make_request())
+        keys = sorted(await client.keys('rate_limit:*'))
+        ttls = [await client.ttl(key) for key in keys]
+        return keys, ttls
+    keys, ttls = asyncio.run(_run())
+    assert len(keys) == 3
+    assert all(ttl > 0 for ttl in ttls)
+
+
+def test_check_rate_limit_is_per_client():
+    """Test that separate clients have independent counters."""
+    async def _run():
+        client = FakeAsyncRedis(decode_responses=True)
+        limiter = RateLimiter(client=client, requests_per_minute=1)
+        await limiter.check_rate_limit(make_request('10.0.0.1'))
+        await limiter.check_rate_limit(make_request('10.0.0.2'))
+    asyncio.run(_run())
+
+
+class FakeClock:
+    """Manually advanced clock for deterministic window tests."""
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def run_hits(algorithm, schedule, identity='client'):
+    """Run hits at the given clock offsets (seconds) and return the results."""
+    async def _run():
+        clock = FakeClock()
+        start = clock.now
+        limiter = RateLimiter(client=FakeAsyncRedis(decode_responses=True), algorithm=algorithm, clock=clock)
+        results = []
+        for offset in schedule:
+            clock.now = start + offset
+            results.append(await limiter.hit(identity))
+        return results
+    return asyncio.run(_run())
+
+
+def test_gcra_allows_burst_then_rejects():
+    """Test that GCRA admits the full quota from idle and then rejects."""
+    results = run_hits(GCRAAlgorithm(limit=5, period=60), [0] * 6)
+    assert [r.allowed for r in results] == [True] * 5 + [False]
+    assert [r.remaining for r in results[:5]] == [4, 3, 2, 1, 0]
+    # One emission interval (60s / 5) until the next request is admitted
+    assert results[-1].retry_after == pytest.approx(12, abs=0.01)
+
+
+def test_gcra_replenishes_at_emission_rate():
+    """Test that GCRA admits one request per emission interval once exhausted."""
+    results = run_hits(GCRAAlgorithm(limit=5, period=60), [0] * 5 + [11, 12.01])
+    assert [r.allowed for r in results] == [True] * 5 + [False, True]
+
+
+def test_gcra_uses_single_key():
+    """Test that GCRA keeps O(1) state: one key per client."""
+    async def _run():
+        client = FakeAsyncRedis(decode_responses=True)
+        limiter = RateLimiter(client=client, algorithm='gcra')
+        for _ in range(3):
+            await limiter.hit('client')
+        return await client.keys('*')
+    assert len(asyncio.run(_run())) == 1
+
+
+def test_sliding_window_prevents_edge_burst():
+    """Test that the sliding window does not allow 2x the limit across a window edge."""
+    # 4 requests at the very end of one window, 4 just after the boundary
+    results = run_hits(SlidingWindowCounterAlgorithm(limit=4, window=60), [59.5] * 4 + [60.5] * 4)
+    assert sum(r.allowed for r in results) == 4
+    assert results[-1].retry_after > 0
+
+
+def test_fixed_window_reports_tightest_window():
+    """Test that the fixed window result reflects the most constrained window."""
+    results = run_hits(FixedWindowAlgorithm(requests_per_minute=10, requests_per_hour=3), [0, 1])
+    assert results[-1].limit == 3
+    assert results[-1].remaining == 1
+
+
+def test_rate_limit_result_headers():
+    """Test X-RateLimit-* and Retry-After header rendering."""
+    allowed = RateLimitResult(allowed=True, limit=10, remaining=3, reset_after=4.2)
+    assert allowed.headers() == {
+        "X-RateLimit-Limit": "10",
+        "X-RateLimit-Remaining": "3",
+        "X-RateLimit-Reset": "5",
+    }
+    rejected = RateLimitResult(allowed=False, limit=10, remaining=-1, reset_after=30, retry_after=0.2)
+    headers = rejected.headers()
+    assert headers["X-RateLimit-Remaining"] == "0"
+    assert headers["Retry-After"] == "1"
+
+
+def test_rejection_carries_headers():
+    """Test that the 429 raised by check_rate_limit includes Retry-After."""
+    with pytest.raises(HTTPException) as exc_info:
+        run_requests(dict(algorithm='gcra', requests_per_minute=1), 2)
+    assert "Retry-After" in exc_info.value.headers
+
+
+def test_build_algorithm_rejects_unknown_name():
+    """Test that an unknown algorithm name is reported."""
+    with pytest.raises(ValueError):
+        build_algorithm('leaky')
+
+
+def test_hybrid_enforces_locally_without_redis_calls():
+    """Test that the hybrid limiter decides from its local bucket."""
+    async def _run():
+        client = FakeAsyncRedis(decode_responses=True)
+        limiter = HybridRateLimiter(limit=3, period=60, client=client, clock=FakeClock())
+        results = [await limiter.hit('client') for _ in range(4)]
+        keys = await client.keys('*')
+        await limiter.stop()
+        return results, keys
+    results, keys = asyncio.run(_run())
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert results[-1].retry_after == pytest.approx(20)
+    # Nothing is written until the background sync runs
+    assert keys == []
+
+
+def test_hybrid_sync_accounts_for_other_workers():
+    """Test that consumption by another worker is deducted after a sync."""
+    async def _run():
+        server = FakeServer()
+        clock = FakeClock()
+        worker_a = HybridRateLimiter(limit=10, period=60, client=FakeAsyncRedis(server=server, decode_responses=True), clock=clock)
+        worker_b = HybridRateLimiter(limit=10, period=60, client=FakeAsyncRedis(server=server, decode_responses=True), clock=clock)
+        for _ in range(6):
+            await worker_a.hit('client')
+        await worker_a.sync()
+        await worker_b.hit('client')
+        await worker_b.sync()
+        # Worker B has now seen A's six requests plus its own
+        results = [await worker_b.hit('client') for _ in range(4)]
+        await worker_a.stop()
+        await worker_b.stop()
+        return results
+    results = asyncio.run(_run())
+    assert [r.allowed for r in results] == [True, True, True, False]
+
+
+def test_hybrid_fails_open_when_redis_is_down():
+    """Test that the local tier keeps working when Redis is unreachable."""
+    async def _run():
+        server = FakeServer()
+        server.connected = False
+        limiter = HybridRateLimiter(limit=2, period=60, client=FakeAsyncRedis(server=server), clock=FakeClock())
+        first = await limiter.hit('client')
+        await limiter.sync()  # must not raise
+        second = await limiter.hit('client')
+        third = await limiter.hit('client')
+        await limiter.stop()
+        return first, second, third, limiter._buckets['client'].pending
+    first, second, third, pending = asyncio.run(_run())
+    assert first.allowed and second.allowed and not third.allowed
+    # Unsynced usage is kept for when Redis comes back
+    assert pending == 2
+
+
+def test_hybrid_bounds_number_of_tracked_keys():
+    """Test that the local bucket table is an LRU of bounded size."""
+    async def _run():
+        limiter = HybridRateLimiter(limit=5, client=FakeAsyncRedis(), max_keys=2, clock=FakeClock())
+        for identity in ('a', 'b', 'c'):
+            await limiter.hit(identity)
+        buckets = list(limiter._buckets)
+        orphaned = dict(limiter._orphaned)
+        await limiter.stop()
+        return buckets, orphaned
+    buckets, orphaned = asyncio.run(_run())
+    assert buckets == ['b', 'c']
+    assert orphaned == {'a': 1}
+
+
+def test_middleware_fails_open_when_redis_is_down():
+    """Test that the middleware lets requests through if the limiter errors."""
+    server = FakeServer()
+    server.connected = False
+    limiter = RateLimiter(client=FakeAsyncRedis(server=server))
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+
+    @app.get("/ok")
+    def ok():
+        return {"ok": True}
+
+    with patch('app.utils.rate_limiter.RATE_LIMIT_ENABLED', True):
+        response = TestClient(app).get("/ok")
+    assert response.status_code == 200
+    assert "X-RateLimit-Limit" not in response.headers
+
+
+def test_middleware_rejects_before_the_app_and_streams_through():
+    """Test that the ASGI middleware answers 429 itself and adds limit headers to streamed responses."""
+    limiter = HybridRateLimiter(limit=2, period=60, client=FakeAsyncRedis(), clock=FakeClock())
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    calls = []
+
+    @app.get("/stream")
+    def stream():
+        calls.append(1)
+        return StreamingResponse((f"chunk {i}\n" for i in range(3)), media_type="text/plain")
+
+    with patch('app.utils.rate_limiter.RATE_LIMIT_ENABLED', True):
+        client = TestClient(app)
+        first = client.get("/stream")
+        assert client.get("/stream").status_code == 200
+        rejected = client.get("/stream")
+    assert first.text == "chunk 0\nchunk 1\nchunk 2\n"
+    assert first.headers["X-RateLimit-Limit"] == "2"
+    assert first.headers["X-RateLimit-Remaining"] == "1"
+    assert rejected.status_code == 429
+    assert "Retry-After" in rejected.headers
+    assert len(calls) == 2
+
+
+def test_middleware_keeps_route_limiter_headers_on_429():
+    """Test that a cost-limited 429 keeps its own Remaining and Retry-After values."""
+    clock = FakeClock()
+    global_limiter = HybridRateLimiter(limit=60, period=60, client=FakeAsyncRedis(), clock=clock)
+    cost_limiter = HybridRateLimiter(limit=10, period=60, client=FakeAsyncRedis(), clock=clock)
+    app = make_app(cost_limiter)
+    app.add_middleware(RateLimitMiddleware, limiter=global_limiter)
+
+    with patch('app.utils.rate_limiter.RATE_LIMIT_ENABLED', True):
+        client = TestClient(app)
+        allowed = client.get("/expensive")
+        assert client.get("/expensive").status_code == 200
+        rejected = client.get("/expensive")
+    # Allowed responses carry the global budget
+    assert allowed.headers["X-RateLimit-Limit"] == "60"
+    assert allowed.headers["X-RateLimit-Remaining"] == "59"
+    # The rejection reports the exhausted cost budget: 5 units at 10 per minute
+    assert rejected.status_code == 429
+    assert rejected.headers["X-RateLimit-Limit"] == "10"
+    assert rejected.headers["X-RateLimit-Remaining"] == "0"
+    assert rejected.headers["Retry-After"] == "30"
+    assert rejected.headers.get_list("X-RateLimit-Remaining") == ["0"]
+
+
+def make_app(limiter):
+    """Minimal app with a cheap and an expensive route sharing one cost budget."""
+    app = FastAPI()
+
+    @app.get("/cheap", dependencies=[Depends(rate_limit(cost=1, limiter=limiter))])
+    def cheap():
+        return {"ok": True}
+
+    @app.get("/expensive", dependencies=[Depends(rate_limit(cost=5, limiter=limiter))])
+    def expensive():
+        return {"ok": True}
+
+    return app
+
+
+def test_rate_limit_dependency_charges_route_cost():
+    """Test that expensive routes consume more of the budget."""
+    limiter = HybridRateLimiter(limit=10, period=60, client=FakeAsyncRedis(), clock=FakeClock())
+    rejections = RATE_LIMIT_REJECTIONS.value(("cost",))
+    with patch('app.utils.rate_limiter.RATE_LIMIT_ENABLED', True):
+        client = TestClient(make_app(limiter))
+        assert client.get("/expensive").status_code == 200
+        assert client.get("/expensive").status_code == 200
+        response = client.get("/cheap")
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+    assert RATE_LIMIT_REJECTIONS.value(("cost",)) == rejections + 1
+
+
+def test_rate_limit_dependency_keys_on_user_id():
+    """Test that authenticated callers get their own budget regardless of IP."""
+    limiter = HybridRateLimiter(limit=5, period=60, client=FakeAsyncRedis(), clock=FakeClock())
+    user_a = {"Authorization": f"Bearer {create_access_token(uuid.uuid4())}"}
+    user_b = {"Authorization": f"Bearer {create_access_token(uuid.uuid4())}"}
+    with patch('app.utils.rate_limiter.RATE_LIMIT_ENABLED', True):
+        client = TestClient(make_app(limiter))
+        assert client.get("/expensive", headers=user_a).status_code == 200
+        assert client.get("/expensive", headers=user_a).status_code == 429
+        assert client.get("/expensive", headers=user_b).status_code == 200
+        # Anonymous callers share the IP budget
+        assert client.get("/expensive").status_code == 200
+
+
+def test_rate_limit_identity_prefers_valid_token():
+    """Test identity resolution from bearer tokens, falling back to IP."""
+    user_id = uuid.uuid4()
+
+    def identity_for(headers):
+        scope = {"type": "http", "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()], "client": ("10.0.0.9", 1234)}
+        return rate_limit_identity(Request(scope))
+
+    assert identity_for({"Authorization": f"Bearer {create_access_token(user_id)}"}) == f"user:{user_id}"
+    assert identity_for({"Authorization": "Bearer not-a-jwt"}) == "ip:10.0.0.9"
+    assert identity_for({}) == "ip:10.0.0.9"
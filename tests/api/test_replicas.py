@@ -0,0 +1,140 @@
+"""
+Unit tests for read-replica routing in app.db.replicas, with SQLite files
+standing in for the primary and replica databases.
+"""
+import asyncio
+import sqlite3
+import uuid
+
+from fakeredis import FakeAsyncRedis, FakeServer
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.security import create_access_token
+from app.db.replicas import PrimaryPins, Replica, ReplicaRouter
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_database(path, name: str) -> None:
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE source (name TEXT)")
+        conn.execute("INSERT INTO source VALUES (?)", (name,))
+
+
+def make_engine(path):
+    # Unpooled: each TestClient request may run on a new event loop
+    return create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+
+
+def make_router(tmp_path, replicas: int = 2, clock: Clock | None = None):
+    make_database(tmp_path / "primary.db", "primary")
+    primary = async_sessionmaker(make_engine(tmp_path / "primary.db"))
+    members = []
+    for index in range(replicas):
+        path = tmp_path / f"replica{index}.db"
+        make_database(path, f"replica{index}")
+        members.append(Replica(f"replica{index}", make_engine(path)))
+    pins = PrimaryPins(5.0, clock=clock or Clock())
+    return ReplicaRouter(members, pins), primary
+
+
+def make_app(router: ReplicaRouter, primary) -> FastAPI:
+    app = FastAPI()
+
+    async def get_db(request: Request):
+        async with router.session(request, primary) as db:
+            yield db
+
+    @app.get("/source")
+    async def read_source(db=Depends(get_db)):
+        return {"source": await db.scalar(text("SELECT name FROM source"))}
+
+    @app.post("/source")
+    async def write_source(db=Depends(get_db)):
+        return {"source": await db.scalar(text("SELECT name FROM source"))}
+
+    return app
+
+
+def auth(user_id: uuid.UUID) -> dict:
+    return {"Authorization": f"Bearer {create_access_token(user_id)}"}
+
+
+def test_reads_rotate_across_replicas_and_writes_use_primary(tmp_path):
+    """Test that GETs are spread round-robin over replicas and POSTs hit the primary."""
+    client = TestClient(make_app(*make_router(tmp_path)))
+    sources = [client.get("/source").json()["source"] for _ in range(4)]
+    assert sources == ["replica0", "replica1", "replica0", "replica1"]
+    assert client.post("/source").json()["source"] == "primary"
+
+
+def test_writer_is_pinned_to_primary_for_window(tmp_path):
+    """Test that a user who wrote reads from the primary until the pin expires."""
+    clock = Clock()
+    client = TestClient(make_app(*make_router(tmp_path, clock=clock)))
+    writer, reader = uuid.uuid4(), uuid.uuid4()
+
+    client.post("/source", headers=auth(writer))
+    assert client.get("/source", headers=auth(writer)).json()["source"] == "primary"
+    assert client.get("/source", headers=auth(reader)).json()["source"].startswith("replica")
+
+    clock.now += 6
+    assert client.get("/source", headers=auth(writer)).json()["source"].startswith("replica")
+
+
+def test_unhealthy_replica_is_skipped_until_check_passes(tmp_path):
+    """Test that health checks take a failing replica out of rotation and back."""
+    router, primary = make_router(tmp_path, replicas=1)
+    missing = tmp_path / "missing" / "replica1.db"
+    router.replicas.append(Replica("replica1", make_engine(missing)))
+    client = TestClient(make_app(router, primary))
+
+    asyncio.run(router.check_health())
+    assert [replica.healthy for replica in router.replicas] == [True, False]
+    assert {client.get("/source").json()["source"] for _ in range(3)} == {"replica0"}
+
+    missing.parent.mkdir()
+    make_database(missing, "replica1")
+    asyncio.run(router.check_health())
+    assert {client.get("/source").json()["source"] for _ in range(2)} == {"replica0", "replica1"}
+
+
+def test_reads_fall_back_to_primary_without_healthy_replicas(tmp_path):
+    """Test that reads go to the primary when every replica is down."""
+    router, primary = make_router(tmp_path)
+    for replica in router.replicas:
+        replica.healthy = False
+    client = TestClient(make_app(router, primary))
+    assert client.get("/source").json()["source"] == "primary"
+
+
+def test_pins_are_shared_through_redis():
+    """Test that a pin set by one worker is honoured by another."""
+    server = FakeServer()
+    first = PrimaryPins(5.0, client=FakeAsyncRedis(server=server))
+    second = PrimaryPins(5.0, client=FakeAsyncRedis(server=server))
+    user_id = uuid.uuid4()
+
+    async def scenario():
+        await first.pin(user_id)
+        return await second.is_pinned(user_id), await second.is_pinned(uuid.uuid4())
+
+    assert asyncio.run(scenario()) == (True, False)
+
+
+def test_pins_fail_closed_when_redis_is_down():
+    """Test that users are routed to the primary if pins cannot be read."""
+    server = FakeServer()
+    server.connected = False
+    pins = PrimaryPins(5.0, client=FakeAsyncRedis(server=server))
+    assert asyncio.run(pins.is_pinned(uuid.uuid4())) is True
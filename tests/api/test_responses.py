@@ -0,0 +1,108 @@
+"""
+Unit tests for the orjson response helpers in app.core.responses.
+"""
+import json
+import uuid
+from datetime import date, datetime
+
+import msgpack
+import pytest
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.api.v1.endpoints.progress import progress_content
+from app.core.responses import ORJSONResponse, ResponseFormat, prefers_msgpack, rows_response
+from app.db.queries import LOG_READ_COLUMNS
+from app.models.enums import WeightUnit
+from app.models.exercise_log import ExerciseLog
+from app.schemas.exercise_log import ExerciseLogRead
+from app.schemas.progress import ChartDataPoint, ExerciseProgress
+
+
+@pytest.fixture
+def log_db():
+    """In-memory SQLite session containing only the exercise log table."""
+    engine = create_engine("sqlite://")
+    ExerciseLog.__table__.create(engine)
+    with Session(engine) as db:
+        exercise_id, user_id = uuid.uuid4(), uuid.uuid4()
+        for i in range(3):
+            db.add(ExerciseLog(
+                exercise_id=exercise_id,
+                user_id=user_id,
+                date=datetime(2026, 1, i + 1, 7, 30, 15, 123456),
+                weight=None if i == 2 else 100.5 + i,
+                weight_unit=WeightUnit.KG if i else WeightUnit.LBS,
+                reps=5,
+                sets=3,
+            ))
+        db.commit()
+        yield db
+
+
+def test_rows_response_matches_response_model_output(log_db):
+    """Test that serialising rows gives the same bytes as validating ORM objects."""
+    adapter = TypeAdapter(list[ExerciseLogRead])
+    objects = log_db.scalars(select(ExerciseLog)).all()
+    expected = adapter.dump_json(adapter.validate_python(objects, from_attributes=True))
+
+    response = rows_response(log_db.execute(select(*LOG_READ_COLUMNS)))
+    assert response.body == expected
+    assert response.media_type == "application/json"
+
+
+def test_orjson_response_renders_plain_data():
+    """Test that UUIDs, datetimes and enums render like pydantic would."""
+    value = uuid.uuid4()
+    response = ORJSONResponse({"id": value, "unit": WeightUnit.KG, 1: datetime(2026, 1, 1)})
+    assert response.body == f'{{"id":"{value}","unit":"kg","1":"2026-01-01T00:00:00"}}'.encode()
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("application/msgpack", True),
+    ("application/x-msgpack, application/json;q=0.5", True),
+    ("application/json, application/msgpack", False),
+    ("*/*", False),
+    ("application/msgpack;q=0.2, */*", False),
+    ("", False),
+])
+def test_prefers_msgpack(accept, expected):
+    """Test that MessagePack is only chosen when explicitly ranked above JSON."""
+    assert prefers_msgpack(accept) is expected
+
+
+def test_rows_response_columnar_msgpack(log_db):
+    """Test that rows can be returned as MessagePack, one array per column."""
+    response = rows_response(
+        log_db.execute(select(*LOG_READ_COLUMNS).order_by(ExerciseLog.date)),
+        ResponseFormat(msgpack=True, columnar=True),
+    )
+    assert response.media_type == "application/msgpack"
+    assert response.headers["Vary"] == "Accept"
+    content = msgpack.unpackb(response.body)
+    assert list(content) == list(ExerciseLogRead.model_fields)
+    assert content["weight"] == [100.5, 101.5, None]
+    assert content["weight_unit"] == ["lbs", "kg", "kg"]
+    assert content["date"][0] == "2026-01-01T07:30:15.123456"
+
+
+def test_progress_content_columnar_is_smaller():
+    """Test that columnar chart data keeps values and drops repeated keys."""
+    points = [
+        ChartDataPoint(date=date(2026, 1, i + 1), weight=100 + i, weight_unit="kg", reps=5, sets=3)
+        for i in range(20)
+    ]
+    progress = ExerciseProgress(
+        exercise_id=uuid.uuid4(), exercise_name="Squat", data_points=points, target_unit="kg"
+    )
+    rows = ORJSONResponse(progress_content(progress, columnar=False)).body
+    columnar = ORJSONResponse(progress_content(progress, columnar=True)).body
+
+    data_points = json.loads(columnar)["data_points"]
+    assert data_points["weight"] == [100 + i for i in range(20)]
+    assert data_points["date"][0] == "2026-01-01"
+    assert len(columnar) < len(rows) / 2
+    assert len(ResponseFormat(msgpack=True, columnar=True).render(
+        progress_content(progress, columnar=True)
+    ).body) < len(columnar)
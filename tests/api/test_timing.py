@@ -0,0 +1,76 @@
+"""
+Unit tests for per-request Server-Timing instrumentation in app.core.timing.
+"""
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core.middleware import RequestContextMiddleware
+from app.core.timing import TimedRoute, install_query_timing, timed, current_timings
+
+
+def parse_server_timing(header: str) -> dict:
+    """Map metric name to (duration ms, description)."""
+    metrics = {}
+    for part in header.split(","):
+        fields = [f.strip() for f in part.split(";")]
+        dur = next(float(f[4:]) for f in fields if f.startswith("dur="))
+        desc = next((f[5:].strip('"') for f in fields if f.startswith("desc=")), None)
+        metrics[fields[0]] = (dur, desc)
+    return metrics
+
+
+def make_app() -> FastAPI:
+    engine = create_engine("sqlite://")
+    install_query_timing(engine)
+
+    def fake_auth():
+        with timed("auth"):
+            return "user"
+
+    router = APIRouter(route_class=TimedRoute)
+
+    @router.get("/work")
+    def work(user: str = Depends(fake_auth)):
+        with engine.connect() as conn:
+            conn.execute(text("select 1"))
+            conn.execute(text("select 2"))
+        with timed("compute"):
+            total = sum(range(1000))
+        return {"total": total}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(RequestContextMiddleware)
+    return app
+
+
+def test_server_timing_header_breakdown():
+    """Test that DB, auth, compute and render phases are all reported."""
+    response = TestClient(make_app()).get("/work")
+    assert response.status_code == 200
+    metrics = parse_server_timing(response.headers["Server-Timing"])
+    assert set(metrics) == {"db", "auth", "compute", "render", "total"}
+    assert metrics["db"][1] == "2 queries"
+    assert metrics["db"][0] > 0
+    assert metrics["compute"][0] > 0
+    assert metrics["total"][0] >= metrics["db"][0]
+
+
+def test_timed_is_noop_outside_requests():
+    """Test that instrumentation can be used outside of a request."""
+    assert current_timings() is None
+    with timed("compute"):
+        pass
+
+
+def test_timing_log_record(caplog):
+    """Test that one structured log record with timing fields is emitted."""
+    with caplog.at_level("INFO", logger="app.timing"):
+        TestClient(make_app()).get("/work")
+    records = [r for r in caplog.records if r.name == "app.timing"]
+    assert len(records) == 1
+    assert records[0].db_count == 2
+    assert records[0].status_code == 200
+    for field in ("db", "auth", "compute", "render", "total", "request_id"):
+        assert hasattr(records[0], field)
@@ -0,0 +1,89 @@
+"""
+Unit tests for the trend estimators in app.utils.trend.
+"""
+import random
+
+import pytest
+
+from app.utils.trend import (
+    fit_trend,
+    pairwise_slopes,
+    t_quantile,
+    theil_sen_trend,
+)
+
+
+def noisy_line(n: int, slope: float = 0.5, seed: int = 1):
+    rng = random.Random(seed)
+    x = [float(i) for i in range(n)]
+    return x, [100 + slope * xi + rng.gauss(0, 2) for xi in x]
+
+
+def test_t_quantile_matches_tables():
+    """Test that the t quantiles used for intervals match published values."""
+    assert t_quantile(0.975, 1) == pytest.approx(12.706, abs=1e-3)
+    assert t_quantile(0.975, 9) == pytest.approx(2.262, abs=1e-3)
+    assert t_quantile(0.95, 30) == pytest.approx(1.697, abs=1e-3)
+    assert t_quantile(0.025, 9) == pytest.approx(-2.262, abs=1e-3)
+
+
+def test_ols_matches_the_previous_hand_rolled_slope():
+    """Test that the default method returns the same slope the endpoint computed before."""
+    x, y = noisy_line(30)
+    n = len(x)
+    sum_x, sum_y = sum(x), sum(y)
+    expected = (n * sum(a * b for a, b in zip(x, y)) - sum_x * sum_y) / (
+        n * sum(a * a for a in x) - sum_x**2
+    )
+    trend = fit_trend(x, y)
+    assert trend.slope == pytest.approx(expected)
+    assert trend.ci_low < trend.slope < trend.ci_high
+
+
+@pytest.mark.parametrize("method", ["ols", "theil_sen", "huber"])
+def test_interval_covers_the_true_slope(method):
+    """Test that each method's interval contains the slope the data was drawn from."""
+    trend = fit_trend(*noisy_line(60), method)
+    assert trend.ci_low < 0.5 < trend.ci_high
+    assert trend.slope == pytest.approx(0.5, abs=0.05)
+
+
+@pytest.mark.parametrize("method", ["theil_sen", "huber"])
+def test_robust_methods_ignore_a_mis_entered_log(method):
+    """Test that one 500 kg entry barely moves the robust slopes, unlike OLS."""
+    x, y = noisy_line(60)
+    clean = fit_trend(x, y, method)
+    y[50] = 500.0
+    robust = fit_trend(x, y, method)
+    assert robust.slope == pytest.approx(clean.slope, abs=0.01)
+    assert robust.ci_high - robust.ci_low < 0.1
+    assert abs(fit_trend(x, y, "ols").slope - clean.slope) > 0.1
+
+
+def test_theil_sen_samples_pairs_beyond_the_limit():
+    """Test that the sampled median slope is close to the exact one and reproducible."""
+    x, y = noisy_line(400, slope=0.1)
+    exact = theil_sen_trend(x, y, max_pairs=10**6)
+    sampled = theil_sen_trend(x, y, max_pairs=5000)
+    assert len(pairwise_slopes(x, y, max_pairs=5000)) == 5000
+    assert sampled.slope == pytest.approx(exact.slope, abs=0.002)
+    assert sampled == theil_sen_trend(x, y, max_pairs=5000)
+
+
+def test_same_day_points_are_not_paired():
+    """Test that points sharing an x value contribute no pairwise slope."""
+    assert pairwise_slopes([0, 0, 1], [1, 5, 3]) == [-2.0, 2.0]
+
+
+@pytest.mark.parametrize("method", ["ols", "theil_sen", "huber"])
+def test_degenerate_series_have_no_interval(method):
+    """Test that a single point or a single day gives a flat trend without an interval."""
+    for x, y in (([0], [100.0]), ([3, 3], [100.0, 102.0])):
+        trend = fit_trend(x, y, method)
+        assert (trend.slope, trend.ci_low, trend.ci_high) == (0.0, None, None)
+
+
+def test_unknown_method_is_rejected():
+    """Test that an unsupported method name raises ValueError."""
+    with pytest.raises(ValueError):
+        fit_trend([0, 1], [1, 2], "lasso")
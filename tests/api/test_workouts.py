@@ -50,14 +50,16 @@ def test_create_workout(client: TestClient):
     assert "id" in data
     assert "user_id" in data
 
-def test_get_user_workouts(client: TestClient):
+def test_get_user_workouts(client: TestClient, query_budget):
     """Test retrieving all workouts for a user."""
     auth_headers = get_authenticated_headers(client)
     # Create a couple of workouts for this user
     client.post(f"{settings.API_V1_STR}/workouts/", json={"name": "Cardio Day"}, headers=auth_headers)
     client.post(f"{settings.API_V1_STR}/workouts/", json={"name": "Weight Day"}, headers=auth_headers)
 
-    response = client.get(f"{settings.API_V1_STR}/workouts/", headers=auth_headers)
+    # Current user, workouts and their exercises, regardless of workout count
+    with query_budget(3):
+        response = client.get(f"{settings.API_V1_STR}/workouts/", headers=auth_headers)
     
     assert response.status_code == 200
     data = response.json()
@@ -1,12 +1,22 @@
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 from typing import Generator
 import os
 
+# The API tests log in and hit endpoints far faster than any real client;
+# rate limiting itself is covered by tests/api/test_rate_limiter.py.
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+# Query budget fixture and marker (tests/query_budget.py)
+pytest_plugins = ["query_budget"]
+
 from app.main import app
-from app.db.session import get_db
+from app.db.session import async_database_url, get_async_db, get_db
 from app.core.config import settings
 from app.utils.reset_database import reset_database
 
@@ -16,6 +26,13 @@ SQLALCHEMY_DATABASE_URL = str(settings.DATABASE_URL)
 engine = create_engine(SQLALCHEMY_DATABASE_URL)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async endpoints get their own connection per session: asyncpg connections
+# are bound to an event loop, and TestClient may start a new one per request
+async_engine = create_async_engine(
+    async_database_url(make_url(SQLALCHEMY_DATABASE_URL)), poolclass=NullPool
+)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 @pytest.fixture(scope="session", autouse=True)
 def setup_database():
     """
@@ -40,12 +57,18 @@ def db_session() -> Generator[Session, None, None]:
 def client(db_session: Session) -> Generator[TestClient, None, None]:
     """
     Yields a TestClient for making API requests.
-    Overrides the `get_db` dependency to use the test database session.
+    Overrides the `get_db` dependency to use the test database session, and
+    `get_async_db` to use unpooled async sessions on the same database.
     """
     def override_get_db():
         yield db_session
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     
     with TestClient(app) as test_client:
         yield test_client
@@ -0,0 +1,127 @@
+"""
+SQLite helpers shared by the unit tests of the log-derived tables and the
+prebuilt queries: seeded owners, a file database shared by a sync session and
+an async sessionmaker, and log writes that run the hooks the endpoints run.
+"""
+import asyncio
+import uuid
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.models.base import Base
+from app.models.enums import Gender, WeightUnit
+from app.models.exercise import Exercise
+from app.models.exercise_log import ExerciseLog
+from app.models.user import User
+from app.models.workout import Workout
+
+
+def seed_exercise(session: Session, email: str = "a@example.com") -> Exercise:
+    """Add a user owning a "Legs" workout with a "Squat" exercise, and flush them."""
+    user = User(
+        id=uuid.uuid4(),
+        email=email,
+        password="x",
+        first_name="a",
+        last_name="b",
+        birthday=date(1990, 1, 1),
+        gender=list(Gender)[0],
+    )
+    workout = Workout(name="Legs", user=user)
+    exercise = Exercise(id=uuid.uuid4(), name="Squat", workout=workout, user_id=user.id)
+    session.add_all([user, workout, exercise])
+    session.flush()
+    return exercise
+
+
+def make_log(
+    exercise_id,
+    user_id,
+    when: int | datetime,
+    weight: float | None,
+    unit: WeightUnit = WeightUnit.KG,
+    reps: int = 5,
+    sets: int | None = 3,
+) -> ExerciseLog:
+    """A log of the exercise, on `when` or on that day of January 2026."""
+    return ExerciseLog(
+        exercise_id=exercise_id,
+        user_id=user_id,
+        date=when if isinstance(when, datetime) else datetime(2026, 1, when),
+        weight=weight,
+        weight_unit=unit,
+        reps=reps,
+        sets=sets,
+    )
+
+
+@pytest.fixture
+def databases(tmp_path):
+    """A sync session and an async sessionmaker on one database with a single exercise."""
+    path = tmp_path / "logs.db"
+    engine = create_engine(f"sqlite:///{path}")
+    event.listen(engine, "connect", lambda conn, _: conn.execute("PRAGMA foreign_keys=ON"))
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        exercise = seed_exercise(db)
+        ids = (exercise.user_id, exercise.id)
+        db.commit()
+    async_maker = async_sessionmaker(
+        create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool),
+        expire_on_commit=False,
+    )
+    with Session(engine) as db:
+        yield db, async_maker, ids
+    engine.dispose()
+
+
+class LogWriter:
+    """
+    Writes logs in their own async sessions, calling the maintenance hooks
+    an endpoint calls before it commits: `added(session, log)` and
+    `removed(session, log)` with the log, `changed(session, log)` with the
+    edited log.
+    """
+
+    def __init__(self, async_maker: async_sessionmaker, added, changed, removed):
+        self.async_maker = async_maker
+        self.added = added
+        self.changed = changed
+        self.removed = removed
+
+    def add(self, log: ExerciseLog):
+        """Insert the log and return it with what the `added` hook returned."""
+        async def write():
+            async with self.async_maker() as session:
+                session.add(log)
+                result = await self.added(session, log)
+                await session.commit()
+                return log, result
+
+        return asyncio.run(write())
+
+    def edit(self, log_id, **values) -> None:
+        async def write():
+            async with self.async_maker() as session:
+                log = await session.get(ExerciseLog, log_id)
+                for field, value in values.items():
+                    setattr(log, field, value)
+                await self.changed(session, log)
+                await session.commit()
+
+        asyncio.run(write())
+
+    def delete(self, log_id) -> None:
+        async def write():
+            async with self.async_maker() as session:
+                log = await session.get(ExerciseLog, log_id)
+                await session.delete(log)
+                await self.removed(session, log)
+                await session.commit()
+
+        asyncio.run(write())
@@ -0,0 +1,40 @@
+"""
+Pytest plugin for asserting per-test SQL query budgets.
+
+Either wrap the calls under test:
+
+    def test_list(client, query_budget):
+        with query_budget(3):
+            client.get("/api/v1/workouts/")
+
+or cap the whole test with a marker:
+
+    @pytest.mark.max_queries(10)
+    def test_list(client):
+        ...
+"""
+import pytest
+
+from app.core.query_audit import assert_max_queries
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "max_queries(n): fail if the test executes more than n SQL statements"
+    )
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("max_queries")
+    if marker is None:
+        return (yield)
+    # A failing test propagates its own error; the budget is only checked on success
+    with assert_max_queries(marker.args[0]):
+        return (yield)
+
+
+@pytest.fixture
+def query_budget():
+    """Context manager factory: `with query_budget(n): ...`."""
+    return assert_max_queries